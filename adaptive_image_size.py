@@ -0,0 +1,67 @@
+from inference_backends import MODEL_STRIDE
+
+
+class AdaptiveImageSize:
+    """
+    Sahnedeki kişi sayısına göre modelin giriş çözünürlüğünü (imgsz) seçer.
+
+    Sahne boşken en küçük boyut kullanılır: yalnızca birinin girip girmediğine bakılır. Kişi
+    görülünce orta boyuta, kişi sayısı crowd_threshold'a ulaşınca (küçük ve birbirine yakın kutular)
+    en büyük boyuta çıkılır. Büyütme hemen yapılır; küçültme ise daha küçük boyutun patience
+    ardışık tespit karesi boyunca yeterli olması beklenerek yapılır, böylece boyut kareden kareye
+    gidip gelmez. Modelin işlediği piksel sayısı boyutun karesiyle orantılıdır (320: 640'ın 1/4'ü).
+    """
+
+    def __init__(self, sizes=(320, 480, 640), crowd_threshold=6, patience=15):
+        """
+        Args:
+            sizes (tuple): Kullanılabilecek giriş boyutları (model adımının katına yuvarlanır).
+            crowd_threshold (int): En büyük boyuta geçilecek kişi sayısı.
+            patience (int): Küçültmeden önce beklenecek ardışık tespit karesi sayısı.
+        """
+        self.sizes = sorted({max(MODEL_STRIDE, -(-int(size) // MODEL_STRIDE) * MODEL_STRIDE) for size in sizes})
+        self.crowd_threshold = max(1, int(crowd_threshold))
+        self.patience = max(1, int(patience))
+        self.reset()
+
+    def reset(self):
+        # Başlangıçta en büyük boyut: ilk karelerde sahnedeki herkes kaçırılmadan görülür
+        self._index = len(self.sizes) - 1
+        self._lower_streak = 0
+
+    @property
+    def imgsz(self):
+        return self.sizes[self._index]
+
+    def _target_index(self, person_count):
+        if person_count == 0:
+            return 0
+        if person_count >= self.crowd_threshold:
+            return len(self.sizes) - 1
+        return len(self.sizes) // 2
+
+    def update(self, person_count):
+        """
+        Tespit karesindeki kişi sayısıyla sonraki tespit karesinin giriş boyutunu günceller.
+
+        Returns:
+            int: Sonraki tespitte kullanılacak imgsz.
+        """
+        target = self._target_index(person_count)
+        if target > self._index:
+            self._index = target
+            self._lower_streak = 0
+        elif target < self._index:
+            self._lower_streak += 1
+            if self._lower_streak >= self.patience:
+                self._index -= 1
+                self._lower_streak = 0
+        else:
+            self._lower_streak = 0
+        return self.imgsz
+
+    def config(self):
+        """
+        Tespit önbelleği anahtarında kullanılan ayar özeti.
+        """
+        return {'sizes': self.sizes, 'crowd_threshold': self.crowd_threshold, 'patience': self.patience}
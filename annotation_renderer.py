@@ -0,0 +1,82 @@
+import time
+
+import cv2
+from detections import as_detections
+from profiler import profiler
+
+# Çizim renkleri (BGR)
+BOX_COLOR = (255, 128, 0)
+LINE_COLOR = (0, 255, 255)
+ENTRY_COLOR = (0, 255, 0)
+EXIT_COLOR = (0, 0, 255)
+
+
+def draw_tracked_objects(frame, tracked_objects):
+    """
+    Takip edilen nesnelerin kutularını ve ID'lerini kare üzerine (yerinde) çizer.
+    """
+    detections = as_detections(tracked_objects)
+    for (x1, y1, x2, y2), track_id in zip(detections.boxes.astype(int).tolist(), detections.ids.tolist()):
+        cv2.rectangle(frame, (x1, y1), (x2, y2), BOX_COLOR, 2)
+        cv2.putText(frame, f"id:{track_id}", (x1, max(0, y1 - 5)), cv2.FONT_HERSHEY_SIMPLEX, 0.6, BOX_COLOR, 2)
+    return frame
+
+
+class AnnotationRenderer:
+    """
+    Analiz sonuçlarını görüntü üzerine çizen, isteğe bağlı ve hız sınırlanabilir sınıf.
+
+    Analiz döngüsü yalnızca yapısal tespitlerle çalışır; görüntü ancak birisi
+    izleyecekse (pencere, Streamlit önizlemesi) ve hız sınırı izin veriyorsa çizilir.
+    """
+
+    def __init__(self, max_fps=None):
+        """
+        Args:
+            max_fps (float | None): Saniyede en fazla kaç kare çizileceği.
+                None: sınırsız (her kare), 0: çizim tamamen kapalı.
+        """
+        self.max_fps = max_fps
+        self._min_interval = (1.0 / max_fps) if max_fps else 0.0
+        self._last_render_time = None
+
+    @property
+    def enabled(self):
+        return self.max_fps is None or self.max_fps > 0
+
+    def should_render(self):
+        """
+        Hız sınırına göre bu karenin çizilip çizilmeyeceğine karar verir.
+        """
+        if not self.enabled:
+            return False
+        now = time.perf_counter()
+        if self._last_render_time is not None and now - self._last_render_time < self._min_interval:
+            return False
+        self._last_render_time = now
+        return True
+
+    def render(self, frame, tracked_objects, counter=None):
+        """
+        Kutuları, ID'leri ve (verilmişse) sayım çizgisi ile sayaçları kare üzerine çizer.
+        Kare yerinde değiştirilir; kopya oluşturulmaz.
+
+        Args:
+            frame (np.ndarray): Üzerine çizilecek kare.
+            tracked_objects (Detections | list of dicts): Takip edilen nesneler.
+            counter (EntryExitCounter | None): Çizgi konumları ve sayaç değerleri için sayaç nesnesi.
+
+        Returns:
+            np.ndarray: Çizim yapılmış kare.
+        """
+        with profiler.stage('annotate'):
+            draw_tracked_objects(frame, tracked_objects)
+
+            if counter is not None:
+                # Sanal sayım çizgileri (yatay çizgi kare genişliğine kırpılarak çizilir)
+                cv2.polylines(frame, [line.drawing_points(frame.shape) for line in counter.lines], False, LINE_COLOR, 2)
+                # Sayaçlar
+                cv2.putText(frame, f"Giris: {counter.entries}", (50, 80), cv2.FONT_HERSHEY_SIMPLEX, 1.5, ENTRY_COLOR, 3)
+                cv2.putText(frame, f"Cikis: {counter.exits}", (50, 140), cv2.FONT_HERSHEY_SIMPLEX, 1.5, EXIT_COLOR, 3)
+
+        return frame
@@ -3,12 +3,22 @@ import cv2
 import tempfile
 import pandas as pd
 import json
+import time
 from video_stream_manager import VideoStreamManager
 from person_detect_and_tracking_engine import PersonTrackingEngine
 from density_map_generator import DensityMapGenerator
-from entry_exit_counter import EntryExitCounter
+from entry_exit_counter import CountingLine, EntryExitCounter
 from report_generator import ReportGenerator
 from data_manager import DataManager
+from annotation_renderer import AnnotationRenderer
+from detection_cache import DetectionCache
+from region_of_interest import RegionOfInterest
+from adaptive_image_size import AdaptiveImageSize
+from motion_gate import MotionGate
+from zone_analytics import ZoneAnalyzer
+from inference_backends import BACKEND_ONNX, BACKEND_ONNX_INT8, BACKEND_OPENVINO, BACKEND_TORCH
+from model_registry import model_registry
+from profiler import profiler
 
 st.set_page_config(layout="wide", page_title="Gerçek Zamanlı Alan Analizi")
 
@@ -20,13 +30,29 @@ Analiz sonuçlarını canlı olarak takip edebilir, geçmiş verileri görüntü
 
 # --- Veritabanı Yöneticisini Başlatma ---
 # @st.cache_resource, Streamlit'in objeyi önbelleğe almasını ve tekrar tekrar oluşturmamasını sağlar.
+# buffered=True: olaylar kare döngüsünü bekletmeden arka planda toplu olarak yazılır.
 @st.cache_resource
 def get_db_manager():
-    return DataManager()
+    return DataManager(buffered=True)
 
 db_manager = get_db_manager()
 
 
+@st.cache_resource
+def get_detection_cache():
+    return DetectionCache()
+
+
+# Model süreç başına bir kez yüklenip ısıtılır ve tüm oturumlarca paylaşılır. Yükleme arka planda
+# başlatılır; kullanıcı video seçerken model hazırlanır, "Analizi Başlat" modeli diskten okumayı beklemez.
+@st.cache_resource
+def get_model_registry():
+    model_registry.preload(PersonTrackingEngine.DEFAULT_MODEL_PATH, background=True)
+    return model_registry
+
+get_model_registry()
+
+
 # --- AYARLAR BÖLÜMÜ (KENAR ÇUBUĞU) ---
 st.sidebar.header("Uygulama Durumu ve Ayarlar")
 
@@ -43,6 +69,20 @@ line_position_percentage = st.sidebar.slider(
     min_value=0, max_value=100, value=50,
     help="Çizginin videonun dikey eksenindeki konumunu yüzde olarak ayarlayın."
 )
+extra_lines_text = st.sidebar.text_area(
+    "Ek Sayım Çizgileri",
+    value="",
+    placeholder="100,400 600,400 900,250",
+    help="Her satıra bir çizgi: piksel köşeleri 'x1,y1 x2,y2 ...' (kırık çizgi olabilir). Çizginin çiziliş "
+         "yönünün solundan sağına geçiş giriş sayılır. Tespit şeridi yalnızca yatay çizgiyi kapsar."
+)
+zones_text = st.sidebar.text_area(
+    "Bölgeler (Doluluk ve Kalış Süresi)",
+    value="",
+    placeholder="0,0.6 0.4,0.6 0.4,1 0,1",
+    help="Her satıra bir bölge (kuyruk alanı, kasa önü vb.): köşeler kare boyutunun kesri 'x1,y1 x2,y2 x3,y3'. "
+         "Bölge başına anlık kişi sayısı ve kalış süresi dağılımı raporlanır."
+)
 
 st.sidebar.subheader("Yoğunluk Haritası Ayarları")
 blur_kernel_size = st.sidebar.slider(
@@ -55,31 +95,164 @@ clipping_percentile = st.sidebar.slider(
     min_value=90, max_value=100, value=98,
     help="Haritanın kontrastını ayarlar. Düşük değerler daha fazla alanı 'sıcak' (kırmızı) gösterir."
 )
+live_heatmap_interval = st.sidebar.slider(
+    "Canlı Isı Haritası Yenileme (sn)",
+    min_value=0, max_value=60, value=5,
+    help="Analiz sürerken ısı haritasının kaç saniyede bir güncelleneceği. 0: canlı harita kapalı."
+)
+HEATMAP_TIME_WINDOWS = {
+    "Tüm oturum": {"mode": DensityMapGenerator.MODE_CUMULATIVE},
+    "Son 1 dakika": {"mode": DensityMapGenerator.MODE_WINDOW, "window_seconds": 60},
+    "Son 5 dakika": {"mode": DensityMapGenerator.MODE_WINDOW, "window_seconds": 5 * 60},
+    "Son 15 dakika": {"mode": DensityMapGenerator.MODE_WINDOW, "window_seconds": 15 * 60},
+    "Son 60 dakika": {"mode": DensityMapGenerator.MODE_WINDOW, "window_seconds": 60 * 60},
+    "Üstel sönüm (yarı ömür 5 dakika)": {"mode": DensityMapGenerator.MODE_DECAY, "half_life_seconds": 5 * 60},
+}
+heatmap_time_window = st.sidebar.selectbox(
+    "Isı Haritası Zaman Penceresi",
+    options=list(HEATMAP_TIME_WINDOWS.keys()),
+    help="Haritanın tüm oturumu mu, yalnızca son dakikaları mı göstereceğini seçin. "
+         "Sönüm modunda eski yoğunluk zamanla silikleşir."
+)
+heatmap_cell_size = st.sidebar.select_slider(
+    "Izgara Hücre Boyutu (piksel)",
+    options=[1, 2, 4, 8, 16], value=4,
+    help="Isı haritasının biriktirildiği hücre boyutu. Büyük değerler belleği ve hesaplama süresini azaltır."
+)
+
+st.sidebar.subheader("Performans Ayarları")
+prefetch_buffer_size = st.sidebar.slider(
+    "Kare Ön Yükleme Tamponu (Kare)",
+    min_value=1, max_value=64, value=8,
+    help="Arka planda önceden çözülüp bekletilecek en fazla kare sayısı."
+)
+preview_fps = st.sidebar.slider(
+    "Önizleme Hızı (FPS)",
+    min_value=0, max_value=30, value=5,
+    help="Canlı önizlemenin saniyede en fazla kaç kez güncelleneceği. 0: önizleme kapalı."
+)
+detect_interval = st.sidebar.slider(
+    "Tespit Aralığı (Kare)",
+    min_value=1, max_value=10, value=1,
+    help="Tam tespitin kaç karede bir yapılacağı. Aradaki karelerde izler son hızlarına göre ilerletilir."
+)
+INFERENCE_BACKEND_LABELS = {
+    "PyTorch": BACKEND_TORCH,
+    "ONNX Runtime (CPU)": BACKEND_ONNX,
+    "ONNX Runtime INT8 (CPU)": BACKEND_ONNX_INT8,
+    "OpenVINO (CPU)": BACKEND_OPENVINO,
+}
+inference_backend = INFERENCE_BACKEND_LABELS[st.sidebar.selectbox(
+    "Çıkarım Arka Ucu",
+    options=list(INFERENCE_BACKEND_LABELS),
+    help="GPU olmayan sunucularda ONNX Runtime veya OpenVINO genellikle PyTorch'tan hızlıdır. "
+         "Model ilk kullanımda seçilen biçime aktarılır ve sonraki analizlerde diskten okunur."
+)]
+inference_threads = st.sidebar.slider(
+    "Çıkarım Thread Sayısı",
+    min_value=0, max_value=32, value=0,
+    help="Model çıkarımında kullanılacak CPU thread sayısı. 0: arka ucun varsayılanı."
+) or None
+roi_band_percentage = st.sidebar.slider(
+    "Tespit Şeridi Yüksekliği (%)",
+    min_value=0, max_value=50, value=0,
+    help="Model yalnızca sayım çizgisinin altında ve üstünde kare yüksekliğinin bu yüzdesi kadar şeritte çalışır; "
+         "işlenen piksel sayısı azalır. 0: karenin tamamı."
+)
+adaptive_imgsz_enabled = st.sidebar.checkbox(
+    "Uyarlanır Giriş Çözünürlüğü",
+    value=False,
+    help="Sahne boşken model düşük çözünürlükte (320), kalabalıkta yüksek çözünürlükte (640) çalışır."
+)
+motion_gate_enabled = st.sidebar.checkbox(
+    "Hareket Yoksa Tespiti Atla",
+    value=False,
+    help="Sahne son işlenen kareden beri değişmediyse YOLO çalıştırılmaz ve son takip sonuçları kullanılır. "
+         "Boş koridorlarda ve yoğun olmayan saatlerde CPU kullanımını büyük ölçüde azaltır."
+)
+use_detection_cache = st.sidebar.checkbox(
+    "Tespit Önbelleğini Kullan",
+    value=True,
+    help="Aynı video aynı model ve tespit aralığıyla tekrar analiz edilirse tespitler YOLO'dan geçirilmeden "
+         "önbellekten okunur. Çizgi konumu ve ısı haritası ayarlarını değiştirmek önbelleği geçersiz kılmaz."
+)
+profiling_enabled = st.sidebar.checkbox(
+    "Aşama Sürelerini Ölç (Profil)",
+    value=profiler.enabled,
+    help="Kare çözme, model, sayaç, ısı haritası ve veritabanı adımlarının p50/p95/p99 sürelerini raporlar."
+)
 
 
 # --- Geçmiş Analizler Bölümü ---
+SESSIONS_PAGE_SIZE = 50
+EVENTS_PAGE_SIZE = 500
+
 st.header("Geçmiş Analiz Oturumları")
 try:
-    all_sessions = db_manager.get_all_sessions()
-    if all_sessions:
-        df_sessions = pd.DataFrame(all_sessions, columns=['Oturum ID', 'Başlangıç Zamanı', 'Video Adı', 'Toplam Giriş',
-                                                          'Toplam Çıkış'])
+    total_sessions = db_manager.count_sessions()
+    if total_sessions:
+        # Oturumlar sayfa sayfa getirilir; tüm tablo tek seferde yüklenmez
+        total_session_pages = -(-total_sessions // SESSIONS_PAGE_SIZE)
+        session_page = 1
+        if total_session_pages > 1:
+            session_page = st.number_input(f"Sayfa (toplam {total_session_pages} sayfa, {total_sessions} oturum)",
+                                           min_value=1, max_value=total_session_pages, value=1)
+        page_sessions = db_manager.get_sessions_page(page_size=SESSIONS_PAGE_SIZE, page=session_page - 1)
+        df_sessions = pd.DataFrame(page_sessions, columns=['Oturum ID', 'Başlangıç Zamanı', 'Video Adı', 'Toplam Giriş',
+                                                           'Toplam Çıkış'])
         st.dataframe(df_sessions, use_container_width=True)
 
+        # Trafik akışı ve doluluk eğrileri ham olaylardan değil, özet (rollup) tablosundan okunur
+        st.subheader("Trafik Akışı")
+        flow_resolutions = {
+            "15 dakika": (DataManager.ROLLUP_MINUTE, 15 * 60_000),
+            "Saatlik": (DataManager.ROLLUP_HOUR, None),
+            "Günlük": (DataManager.ROLLUP_DAY, None),
+        }
+        col_resolution, col_days = st.columns(2)
+        flow_resolution = col_resolution.selectbox("Çözünürlük", options=list(flow_resolutions), index=1)
+        flow_days = col_days.number_input("Son kaç gün", min_value=1, max_value=366, value=7)
+        granularity, bucket_ms = flow_resolutions[flow_resolution]
+        flow_start_ms = int(time.time() * 1000) - flow_days * 86_400_000
+        occupancy = db_manager.get_occupancy(granularity, start_ms=flow_start_ms, bucket_ms=bucket_ms)
+        if occupancy:
+            df_flow = pd.DataFrame(occupancy, columns=['Zaman', 'Giriş', 'Çıkış', 'İçerideki Kişi'])
+            df_flow['Zaman'] = pd.to_datetime(df_flow['Zaman'].map(DataManager.format_timestamp))
+            st.line_chart(df_flow.set_index('Zaman'))
+        else:
+            st.info("Seçilen aralıkta kaydedilmiş bir olay bulunmuyor.")
+
         # YENİ: Geçmiş bir oturumun detaylarını görmek için seçim kutusu
         st.subheader("Geçmiş Oturum Detaylarını Görüntüle")
-        session_ids = ["Lütfen bir oturum seçin..."] + [str(s[0]) for s in all_sessions]
+        session_ids = ["Lütfen bir oturum seçin..."] + [str(s[0]) for s in page_sessions]
         selected_session_id = st.selectbox("İncelemek istediğiniz Oturum ID'sini seçin:", options=session_ids)
 
         # YENİ: Seçilen oturumun olay dökümünü veritabanından getir ve göster
         if selected_session_id and selected_session_id != "Lütfen bir oturum seçin...":
             try:
                 session_id_int = int(selected_session_id)
-                events = db_manager.get_events_by_session(session_id_int)
-                if events:
+                total_events = db_manager.count_events(session_id_int)
+                if total_events:
+                    # Olaylar keyset sayfalama ile getirilir; her sayfanın başlangıç imleci oturum durumunda tutulur
+                    cursors_key = f"event_page_cursors_{session_id_int}"
+                    if cursors_key not in st.session_state:
+                        st.session_state[cursors_key] = [None]
+                    page_cursors = st.session_state[cursors_key]
+
+                    events, next_cursor = db_manager.get_events_page(session_id_int, page_size=EVENTS_PAGE_SIZE,
+                                                                     after=page_cursors[-1])
                     df_events = pd.DataFrame(events, columns=['Zaman Damgası', 'Olay Tipi'])
-                    st.write(f"**Oturum ID {session_id_int} için Olay Dökümü:**")
+                    st.write(f"**Oturum ID {session_id_int} için Olay Dökümü** "
+                             f"(sayfa {len(page_cursors)}, toplam {total_events} olay):")
                     st.dataframe(df_events, use_container_width=True)
+
+                    col_prev, col_next = st.columns(2)
+                    if col_prev.button("◀ Önceki sayfa", disabled=len(page_cursors) == 1):
+                        page_cursors.pop()
+                        st.rerun()
+                    if col_next.button("Sonraki sayfa ▶", disabled=next_cursor is None):
+                        page_cursors.append(next_cursor)
+                        st.rerun()
                 else:
                     st.info(f"Oturum ID {session_id_int} için kaydedilmiş bir olay bulunmuyor.")
             except ValueError:
@@ -97,6 +270,20 @@ st.divider()
 # --- Analiz Butonu ve İşlemleri ---
 if uploaded_file is not None:
     if st.sidebar.button('Analizi Başlat', type="primary"):
+        if profiling_enabled:
+            profiler.reset()
+            profiler.enable()
+        else:
+            profiler.disable()
+
+        try:
+            extra_lines = [CountingLine.parse(text) for text in extra_lines_text.splitlines() if text.strip()]
+            zones = [RegionOfInterest.parse_polygon(text) for text in zones_text.splitlines() if text.strip()]
+            if zones:
+                ZoneAnalyzer.validate_zones(zones)
+        except ValueError as e:
+            st.error(str(e))
+            st.stop()
 
         session_id = db_manager.create_new_session(video_name=uploaded_file.name)
         if session_id is None:
@@ -107,59 +294,166 @@ if uploaded_file is not None:
         tfile.write(uploaded_file.read())
         video_source = tfile.name
 
-        stream_manager = VideoStreamManager(source=video_source)
+        roi = None
+        if roi_band_percentage > 0:
+            roi = RegionOfInterest.band(line_position_percentage / 100, roi_band_percentage / 100)
+        adaptive_imgsz = AdaptiveImageSize() if adaptive_imgsz_enabled else None
+        motion_gate = MotionGate() if motion_gate_enabled else None
+
+        detection_cache = get_detection_cache() if use_detection_cache else None
+        cache_key = None
+        cached_detections = None
+        if detection_cache is not None:
+            with st.spinner('Tespit önbelleği kontrol ediliyor...'):
+                cache_key = detection_cache.make_key(video_source, PersonTrackingEngine.DEFAULT_MODEL_PATH,
+                                                     **PersonTrackingEngine.output_config(detect_interval,
+                                                                                          inference_backend,
+                                                                                          roi, adaptive_imgsz,
+                                                                                          motion_gate))
+                cached_detections = detection_cache.load(cache_key)
+
+        # Önbellekten oynatmada yalnızca ilk kare (arka plan ve boyut için) okunur; model yüklenmez
+        stream_manager = VideoStreamManager(source=video_source, prefetch=cached_detections is None,
+                                            buffer_size=prefetch_buffer_size)
         stream_manager.start_stream()
 
-        tracking_engine = PersonTrackingEngine()
+        tracking_engine = None
+        if cached_detections is None:
+            with st.spinner('Model hazırlanıyor...'):
+                tracking_engine = PersonTrackingEngine(detect_interval=detect_interval, render=False,
+                                                       backend=inference_backend, num_threads=inference_threads,
+                                                       roi=roi, adaptive_imgsz=adaptive_imgsz,
+                                                       motion_gate=motion_gate)
+        renderer = AnnotationRenderer(max_fps=preview_fps)
         ret, first_frame = stream_manager.get_frame()
 
         if not ret:
             st.error("Video dosyasından ilk kare okunamadı. Dosya bozuk olabilir.")
+            if tracking_engine is not None:
+                tracking_engine.close()
             st.stop()
 
         line_y_pixel = int(first_frame.shape[0] * (line_position_percentage / 100))
         density_generator = DensityMapGenerator(frame_shape=first_frame.shape, blur_kernel_size=blur_kernel_size,
-                                                clipping_percentile=clipping_percentile)
-        counter = EntryExitCounter(line_y_position=line_y_pixel)
+                                                clipping_percentile=clipping_percentile,
+                                                cell_size=heatmap_cell_size,
+                                                incremental=live_heatmap_interval > 0,
+                                                **HEATMAP_TIME_WINDOWS[heatmap_time_window])
+        counter = EntryExitCounter(line_y_position=line_y_pixel, lines=extra_lines)
+        zone_analyzer = ZoneAnalyzer(first_frame.shape, zones) if zones else None
 
         stream_manager.stop_stream()
-        stream_manager.start_stream()
 
         stframe = st.empty()
-        st.sidebar.success("Analiz başladı. Sonuçlar aşağıda gösterilmektedir.")
+        live_heatmap_frame = st.empty()
+        last_live_heatmap_time = time.perf_counter()
         progress_bar = st.sidebar.progress(0, text="Video işleniyor...")
-        total_frames = int(stream_manager.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        # Zaman pencereli ısı haritası için video zamanı kullanılır (FPS bilinmiyorsa gerçek zaman)
+        if cached_detections is not None:
+            st.sidebar.success("Tespitler önbellekten okunuyor; video yeniden işlenmiyor.")
+            total_frames = len(cached_detections)
+            video_fps = cached_detections.fps
+            recorder = None
+        else:
+            stream_manager.start_stream()
+            st.sidebar.success("Analiz başladı. Sonuçlar aşağıda gösterilmektedir.")
+            total_frames = int(stream_manager.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            video_fps = stream_manager.cap.get(cv2.CAP_PROP_FPS)
+            recorder = None
+            if detection_cache is not None:
+                recorder = detection_cache.recorder(cache_key, frame_shape=first_frame.shape, fps=video_fps)
+
+        def tracked_frames():
+            """
+            (kare, tespitler) üretir. Önbellekten oynatmada kare çözülmez ve kare None olur.
+            """
+            if cached_detections is not None:
+                for cached in cached_detections:
+                    yield None, cached
+                return
+            # Analiz yarıda kesilse de (Streamlit betiği yeniden çalıştırdığında) model kayda geri verilir
+            try:
+                while True:
+                    with profiler.stage('decode'):
+                        ret, frame = stream_manager.get_frame()
+                    if not ret:
+                        return
+                    _, _, frame_detections = tracking_engine.process_frame(frame)
+                    if recorder is not None:
+                        recorder.append(frame_detections)
+                    yield frame, frame_detections
+            finally:
+                tracking_engine.close()
 
         frame_count = 0
-        while ret:
-            ret, frame = stream_manager.get_frame()
-            if not ret:
-                break
-
+        last_progress_percent = -1
+        for frame, detections in tracked_frames():
             frame_count += 1
-            annotated_frame, person_count, tracked_objects = tracking_engine.process_frame(frame.copy())
-            points = [obj['center'] for obj in tracked_objects if 'center' in obj]
-            density_generator.add_points(points)
-
-            new_events = counter.update(tracked_objects)
-            for event in new_events:
-                db_manager.log_event(session_id, event)
-
-            line_y = counter.line_y
-            cv2.line(annotated_frame, (0, line_y), (frame.shape[1], line_y), (0, 255, 255), 2)
-            cv2.putText(annotated_frame, f"Giris: {counter.entries}", (50, 80), cv2.FONT_HERSHEY_SIMPLEX, 1.5,
-                        (0, 255, 0), 3)
-            cv2.putText(annotated_frame, f"Cikis: {counter.exits}", (50, 140), cv2.FONT_HERSHEY_SIMPLEX, 1.5,
-                        (0, 0, 255), 3)
-
-            stframe.image(annotated_frame, channels="BGR", use_container_width=True)
-
-            if total_frames > 0:
-                progress_bar.progress(frame_count / total_frames,
+            video_time = frame_count / video_fps if video_fps > 0 else None
+            with profiler.stage('heatmap_add'):
+                density_generator.add_points(detections.centers, timestamp=video_time)
+
+            with profiler.stage('counter_update'):
+                new_events = counter.update(detections)
+            for event, line_id in zip(new_events, counter.last_event_line_ids):
+                db_manager.log_event(session_id, event, line_id=line_id)
+            if zone_analyzer is not None:
+                with profiler.stage('zone_update'):
+                    zone_analyzer.update(detections, timestamp=video_time)
+
+            if frame is not None and renderer.should_render():
+                annotated_frame = renderer.render(frame, detections, counter)
+                if roi is not None:
+                    roi.draw(annotated_frame)
+                if zone_analyzer is not None:
+                    zone_analyzer.draw(annotated_frame)
+                stframe.image(annotated_frame, channels="BGR", use_container_width=True)
+
+            if live_heatmap_interval > 0 and time.perf_counter() - last_live_heatmap_time >= live_heatmap_interval:
+                last_live_heatmap_time = time.perf_counter()
+                live_heatmap_image = density_generator.generate_live_heatmap_image()
+                live_heatmap_frame.image(cv2.addWeighted(first_frame, 0.2, live_heatmap_image, 0.8, 0), channels="BGR",
+                                         caption="Canlı yoğunluk haritası", use_container_width=True)
+
+            # İlerleme çubuğu yalnızca yüzde değiştiğinde güncellenir (önbellekten oynatmada kare başına
+            # arayüz mesajı göndermek döngünün kendisinden yavaştır)
+            progress_percent = frame_count * 100 // total_frames if total_frames > 0 else -1
+            if progress_percent != last_progress_percent:
+                last_progress_percent = progress_percent
+                progress_bar.progress(min(1.0, frame_count / total_frames),
                                       text=f"Video işleniyor... ({frame_count}/{total_frames})")
 
         progress_bar.success("Analiz tamamlandı!")
-        stream_manager.stop_stream()
+        # Kuyrukta bekleyen olayların geçmiş oturumlar tablosuna yansıması için
+        db_manager.flush()
+        if cached_detections is None:
+            decode_stats = stream_manager.get_stats()
+            stream_manager.stop_stream()
+            st.sidebar.caption(
+                f"Kare çözme: ort. {decode_stats['avg_decode_ms']:.1f} ms, "
+                f"bekleme {decode_stats['consumer_wait_ms']:.0f} ms, "
+                f"atılan kare {decode_stats['dropped_frames']}"
+            )
+            if motion_gate is not None:
+                st.sidebar.caption(f"Hareket olmadığı için {motion_gate.skipped}/{motion_gate.frames} karede "
+                                   f"tespit atlandı (%{motion_gate.skip_ratio * 100:.1f}).")
+            # Video sonuna kadar işlendiği için kayıt tamdır; sonraki analizler önbellekten oynatılır
+            if recorder is not None and len(recorder):
+                recorder.finish()
+        if profiler.enabled:
+            with st.sidebar.expander("Aşama Süreleri (ms)"):
+                st.dataframe(
+                    {stage: {key: value * 1000 if key not in ('count', 'total') else value
+                             for key, value in stats.items()}
+                     for stage, stats in sorted(profiler.snapshot().items())},
+                    use_container_width=True
+                )
+
+        zone_stats = None
+        if zone_analyzer is not None:
+            # Video sonunda bölgede kalanların ziyaretleri de kalış süresi dağılımına katılır
+            zone_analyzer.close_open_visits()
+            zone_stats = zone_analyzer.zone_stats()
 
         final_heatmap_image = density_generator.generate_heatmap_image()
         final_result_image = cv2.addWeighted(first_frame, 0.2, final_heatmap_image, 0.8, 0)
@@ -184,12 +478,24 @@ if uploaded_file is not None:
             col1, col2 = st.columns(2)
             col1.metric("Toplam Giriş Yapan Kişi Sayısı", counter.entries)
             col2.metric("Toplam Çıkış Yapan Kişi Sayısı", counter.exits)
+            if len(counter.lines) > 1:
+                st.dataframe(pd.DataFrame(counter.line_counts()).set_index('line_id')
+                             .rename(columns={'name': 'Çizgi', 'entries': 'Giriş', 'exits': 'Çıkış'}),
+                             use_container_width=True)
+            if zone_stats:
+                st.subheader("Bölge Doluluk ve Kalış Süreleri")
+                st.dataframe(pd.DataFrame(zone_stats).drop(columns='occupancy').set_index('zone_id')
+                             .rename(columns={'name': 'Bölge', 'entries': 'Giriş', 'visits': 'Ziyaret',
+                                              'mean_dwell': 'Ort. Kalış (s)', 'p50_dwell': 'p50 (s)',
+                                              'p90_dwell': 'p90 (s)', 'max_dwell': 'En Fazla (s)'}),
+                             use_container_width=True)
             st.divider()
 
             st.subheader("Raporları İndir")
             json_data = {
                 "session_id": session_id,
-                "summary": {"total_entries": counter.entries, "total_exits": counter.exits},
+                "summary": {"total_entries": counter.entries, "total_exits": counter.exits,
+                            "lines": counter.line_counts(), "zones": zone_stats},
                 "logs": {"entries": counter.entry_logs, "exits": counter.exit_logs}
             }
             json_string = json.dumps(json_data, indent=4, ensure_ascii=False)
@@ -0,0 +1,132 @@
+# benchmarks/backend_comparison.py
+#
+# Çıkarım arka uçlarını (PyTorch, ONNX Runtime, INT8 ONNX, OpenVINO) paketle gelen videolar üzerinde
+# karşılaştırır: yalnızca process_frame süresinden hesaplanan fps, kare başına gecikme (ortalama/p95)
+# ve PyTorch çıktısına göre doğruluk (IoU >= 0.5 ile eşleşen kutulardan duyarlılık/kesinlik, eşleşen
+# kutuların ortalama IoU'su) ile giriş/çıkış sayıları. Kurulu olmayan arka uçlar atlanır.
+#
+# Kullanım:
+#   python benchmarks/backend_comparison.py --max-frames 200
+#   python benchmarks/backend_comparison.py --backends torch onnx --threads 4 --videos video/ornek.mp4
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entry_exit_counter import EntryExitCounter
+from inference_backends import BACKEND_TORCH, BACKENDS
+from person_detect_and_tracking_engine import PersonTrackingEngine
+from video_stream_manager import VideoStreamManager
+
+
+def box_iou(boxes_a, boxes_b):
+    """
+    (N, 4) ve (M, 4) kutular arasındaki IoU matrisi (N, M).
+    """
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    intersection = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+    area_a = np.prod(boxes_a[:, 2:] - boxes_a[:, :2], axis=1)
+    area_b = np.prod(boxes_b[:, 2:] - boxes_b[:, :2], axis=1)
+    return intersection / np.maximum(area_a[:, None] + area_b[None, :] - intersection, 1e-9)
+
+
+def match_boxes(reference, candidate, threshold=0.5):
+    """
+    Açgözlü (greedy) eşleştirme. Returns: (eşleşme sayısı, eşleşen IoU'ların toplamı)
+    """
+    if not len(reference) or not len(candidate):
+        return 0, 0.0
+    iou = box_iou(reference, candidate)
+    matches, iou_sum = 0, 0.0
+    while True:
+        row, col = np.unravel_index(np.argmax(iou), iou.shape)
+        if iou[row, col] < threshold:
+            break
+        matches += 1
+        iou_sum += iou[row, col]
+        iou[row, :] = -1
+        iou[:, col] = -1
+    return matches, iou_sum
+
+
+def run_backend(backend, model_path, video, max_frames, num_threads):
+    engine = PersonTrackingEngine(model_path=model_path, render=False, backend=backend, num_threads=num_threads)
+    stream_manager = VideoStreamManager(source=video)
+    stream_manager.start_stream()
+    counter = None
+    boxes_per_frame = []
+    latencies = []
+    while len(latencies) < max_frames:
+        ret, frame = stream_manager.get_frame()
+        if not ret:
+            break
+        if counter is None:
+            counter = EntryExitCounter(line_y_position=frame.shape[0] // 2)
+        start = time.perf_counter()
+        _, _, detections = engine.process_frame(frame)
+        latencies.append(time.perf_counter() - start)
+        boxes_per_frame.append(detections.boxes.copy())
+        counter.update(detections)
+    stream_manager.stop_stream()
+    engine.close()
+    latencies = np.asarray(latencies)
+    return {
+        'fps': len(latencies) / latencies.sum() if latencies.sum() > 0 else 0.0,
+        'mean_ms': latencies.mean() * 1000,
+        'p95_ms': np.percentile(latencies, 95) * 1000,
+        'boxes': boxes_per_frame,
+        'entries': counter.entries if counter else 0,
+        'exits': counter.exits if counter else 0,
+    }
+
+
+def accuracy_against(reference, candidate):
+    reference_total = sum(len(boxes) for boxes in reference['boxes'])
+    candidate_total = sum(len(boxes) for boxes in candidate['boxes'])
+    matches, iou_sum = 0, 0.0
+    for reference_boxes, candidate_boxes in zip(reference['boxes'], candidate['boxes']):
+        frame_matches, frame_iou = match_boxes(reference_boxes, candidate_boxes)
+        matches += frame_matches
+        iou_sum += frame_iou
+    recall = matches / reference_total if reference_total else 1.0
+    precision = matches / candidate_total if candidate_total else 1.0
+    return recall, precision, iou_sum / matches if matches else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Çıkarım arka uçlarının hız ve doğruluk karşılaştırması.")
+    parser.add_argument("--model", default=os.path.join('Model', 'yolov8m.pt'))
+    parser.add_argument("--videos", nargs='+', default=[os.path.join('video', 'giris_cikis.mp4'),
+                                                        os.path.join('video', 'ornek.mp4')])
+    parser.add_argument("--backends", nargs='+', default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--max-frames", type=int, default=200, help="Video başına işlenecek kare sayısı")
+    parser.add_argument("--threads", type=int, default=None, help="Çıkarım thread sayısı")
+    args = parser.parse_args()
+
+    backends = [BACKEND_TORCH] + [backend for backend in args.backends if backend != BACKEND_TORCH]
+    for video in args.videos:
+        print(f"\n--- {video} ---")
+        print(f"{'Arka uç':<12}{'FPS':>8}{'Ort. (ms)':>11}{'p95 (ms)':>10}{'Duyarlılık':>12}{'Kesinlik':>10}"
+              f"{'Ort. IoU':>10}{'Giriş':>7}{'Çıkış':>7}")
+        reference = None
+        for backend in backends:
+            try:
+                result = run_backend(backend, args.model, video, args.max_frames, args.threads)
+            except (ImportError, RuntimeError, OSError) as e:
+                print(f"{backend:<12}  atlandı: {e}")
+                continue
+            if backend == BACKEND_TORCH:
+                reference = result
+            recall, precision, mean_iou = accuracy_against(reference, result) if reference else (0, 0, 0)
+            print(f"{backend:<12}{result['fps']:>8.2f}{result['mean_ms']:>11.1f}{result['p95_ms']:>10.1f}"
+                  f"{recall:>12.3f}{precision:>10.3f}{mean_iou:>10.3f}{result['entries']:>7}{result['exits']:>7}")
+
+
+if __name__ == "__main__":
+    main()
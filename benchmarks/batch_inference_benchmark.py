@@ -0,0 +1,73 @@
+# benchmarks/batch_inference_benchmark.py
+#
+# PersonTrackingEngine.process_batch için farklı batch boyutlarında saniyedeki kare
+# sayısını (FPS) ölçer.
+#
+# Kullanım:
+#   python benchmarks/batch_inference_benchmark.py --video video/giris_cikis.mp4 --max-batch 16
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from video_stream_manager import VideoStreamManager
+from person_detect_and_tracking_engine import PersonTrackingEngine
+
+
+def load_frames(video_path, max_frames):
+    """
+    Çözme süresini ölçüme katmamak için kareleri önceden belleğe alır.
+    """
+    stream_manager = VideoStreamManager(source=video_path)
+    if not stream_manager.start_stream():
+        return []
+    frames = []
+    while max_frames <= 0 or len(frames) < max_frames:
+        ret, frame = stream_manager.get_frame()
+        if not ret:
+            break
+        frames.append(frame)
+    stream_manager.stop_stream()
+    return frames
+
+
+def run_benchmark(frames, model_path, batch_size):
+    # Her ölçüm için yeni motor: takipçi durumu bir önceki koşudan etkilenmesin
+    engine = PersonTrackingEngine(model_path=model_path, batch_size=batch_size, render=False)
+    # Isınma (warm-up): ilk çağrının tembel başlatma maliyetini ölçüme katma
+    engine.model.predict(frames[0], classes=0, verbose=False)
+
+    start = time.perf_counter()
+    outputs = engine.process_batch(frames)
+    elapsed = time.perf_counter() - start
+    total_detections = sum(person_count for _, person_count, _ in outputs)
+    return len(frames) / elapsed, total_detections
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch çıkarım FPS ölçümü")
+    parser.add_argument("--video", default="video/giris_cikis.mp4")
+    parser.add_argument("--model", default="Model/yolov8m.pt")
+    parser.add_argument("--max-batch", type=int, default=16)
+    parser.add_argument("--max-frames", type=int, default=0, help="0: videonun tamamı")
+    args = parser.parse_args()
+
+    frames = load_frames(args.video, args.max_frames)
+    if not frames:
+        print(f"Video okunamadı: {args.video}")
+        return
+
+    print(f"{len(frames)} kare, model: {args.model}")
+    print(f"{'batch':>6} {'fps':>8} {'hız':>6} {'tespit':>8}")
+    baseline_fps = None
+    for batch_size in range(1, args.max_batch + 1):
+        fps, total_detections = run_benchmark(frames, args.model, batch_size)
+        baseline_fps = baseline_fps or fps
+        print(f"{batch_size:>6} {fps:>8.2f} {fps / baseline_fps:>5.2f}x {total_detections:>8}")
+
+
+if __name__ == "__main__":
+    main()
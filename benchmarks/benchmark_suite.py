@@ -0,0 +1,351 @@
+# benchmarks/benchmark_suite.py
+#
+# Tekrarlanabilir performans takımı: tüm hattı (kare çözme, tespit/takip, sayım, ısı haritası)
+# paketle gelen videolar üzerinde, CPU'ya bağlı bileşenleri (EntryExitCounter, DensityMapGenerator)
+# ise sabit tohumlu sentetik tespitlerle çalıştırır. Her senaryo ayrı bir süreçte koşar; böylece
+# tepe bellek (peak RSS) ölçümü senaryolar arasında karışmaz.
+#
+# Sonuçlar (fps, kurulum süresi, aşama gecikmeleri p50/p95, tepe RSS, giriş/çıkış sayıları) JSON
+# dosyasına yazılır ve kayıtlı bir temel (baseline) ile karşılaştırılır. Video senaryolarında fps yalnızca
+# kare döngüsünden hesaplanır; model yükleme/ısıtma ayrı bir ölçü (setup_seconds) olarak tutulur.
+# fps'teki düşüş, kurulum süresindeki, aşama gecikmelerindeki ve bellekteki artış eşiği (%) aşarsa,
+# giriş/çıkış sayıları değişirse ya da temelde çalışan bir senaryo artık hata veriyorsa çıkış kodu 1 olur.
+#
+# Kullanım:
+#   python benchmarks/benchmark_suite.py --save-baseline                  # temeli oluştur
+#   python benchmarks/benchmark_suite.py --threshold 10                   # temel ile karşılaştır
+#   python benchmarks/benchmark_suite.py --only synthetic --repeat 3
+#   python benchmarks/benchmark_suite.py --max-frames 300 --output sonuc.json
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing as mp
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+DEFAULT_VIDEOS = (os.path.join('video', 'giris_cikis.mp4'), os.path.join('video', 'ornek.mp4'))
+DEFAULT_BASELINE = os.path.join(ROOT_DIR, 'benchmarks', 'baseline.json')
+DEFAULT_OUTPUT = os.path.join(ROOT_DIR, 'benchmarks', 'results.json')
+
+# Karşılaştırılan ölçüler: (anahtar, daha büyük değer iyi mi?)
+COMPARED_METRICS = (('fps', True), ('setup_seconds', False), ('peak_rss_mb', False))
+COMPARED_STAGE_QUANTILE = 'p50'
+# Bu süreden kısa aşamalar (ms) ölçüm gürültüsü baskın olduğu için karşılaştırılmaz
+MIN_COMPARED_STAGE_MS = 0.05
+
+
+def _peak_rss_mb():
+    """
+    Bu sürecin tepe bellek kullanımı (MB). resource modülü olmayan platformlarda (Windows) None.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux'ta KB, macOS'ta bayt döner
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _stage_latencies(snapshot):
+    return {stage: {'mean_ms': stats['mean'] * 1000, 'p50_ms': stats['p50'] * 1000,
+                    'p95_ms': stats['p95'] * 1000, 'count': stats['count']}
+            for stage, stats in sorted(snapshot.items())}
+
+
+# --- Senaryolar (her biri ayrı bir süreçte çalışır) ---
+
+def run_video_case(video_path, options):
+    """
+    cli.analyze_source ile tüm hattı veritabanı/rapor yazmadan çalıştırır.
+
+    fps yalnızca kare döngüsünün süresinden (loop_seconds) hesaplanır; akışın açılması ve modelin
+    yüklenip ısıtılması setup_seconds olarak ayrıca raporlanır.
+    """
+    from profiler import profiler
+    import cli
+
+    profiler.enable()
+    argv = [video_path, '--model', options['model'], '--detect-interval', str(options['detect_interval']),
+            '--no-db', '--no-report']
+    if options['max_frames'] is not None:
+        argv += ['--max-frames', str(options['max_frames'])]
+    args = cli.build_parser().parse_args(argv)
+
+    summary = cli.analyze_source(cli.parse_source(video_path), args)
+    if summary is None:
+        raise RuntimeError(f"Video açılamadı: {video_path}")
+    return {
+        'frames': summary['frames'],
+        'seconds': summary['loop_seconds'],
+        'fps': summary['frames'] / summary['loop_seconds'] if summary['loop_seconds'] > 0 else 0.0,
+        'setup_seconds': summary['stage_seconds']['setup'],
+        'entries': summary['entries'],
+        'exits': summary['exits'],
+        'stages': _stage_latencies(profiler.snapshot()),
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+
+def _synthetic_tracks(num_frames, people, frame_shape, seed):
+    """
+    Sabit tohumla, kareyi dikey olarak boydan boya geçen insanlar üretir. Her kişi rastgele bir
+    karede girer, sabit hızla aşağı ya da yukarı yürür ve kareden çıkınca kaybolur.
+    """
+    from detections import Detections
+
+    height, width = frame_shape[:2]
+    rng = np.random.default_rng(seed)
+    start_frames = rng.integers(0, max(1, num_frames - 60), size=people)
+    speeds = rng.uniform(4, 12, size=people) * rng.choice([-1, 1], size=people)
+    xs = rng.uniform(40, width - 40, size=people)
+    start_ys = np.where(speeds > 0, 0.0, float(height - 1))
+
+    frames = []
+    for frame_index in range(num_frames):
+        age = frame_index - start_frames
+        ys = start_ys + age * speeds
+        visible = (age >= 0) & (ys >= 0) & (ys < height)
+        ids = np.flatnonzero(visible) + 1
+        centers = np.stack([xs[visible], ys[visible]], axis=1)
+        boxes = np.concatenate([centers - 20, centers + 20], axis=1)
+        frames.append(Detections(ids, boxes, centers))
+    return frames
+
+
+def run_synthetic_counter_case(options):
+    from entry_exit_counter import EntryExitCounter
+    from profiler import profiler
+
+    profiler.enable()
+    frame_shape = (options['height'], options['width'], 3)
+    frames = _synthetic_tracks(options['synthetic_frames'], options['synthetic_people'], frame_shape, seed=0)
+    counter = EntryExitCounter(line_y_position=frame_shape[0] // 2)
+
+    start = time.perf_counter()
+    for detections in frames:
+        with profiler.stage('counter_update'):
+            counter.update(detections)
+    elapsed = time.perf_counter() - start
+    return {
+        'frames': len(frames),
+        'seconds': elapsed,
+        'fps': len(frames) / elapsed if elapsed > 0 else 0.0,
+        'entries': counter.entries,
+        'exits': counter.exits,
+        'stages': _stage_latencies(profiler.snapshot()),
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+
+def run_synthetic_heatmap_case(options):
+    from density_map_generator import DensityMapGenerator
+    from profiler import profiler
+
+    profiler.enable()
+    frame_shape = (options['height'], options['width'], 3)
+    frames = _synthetic_tracks(options['synthetic_frames'], options['synthetic_people'], frame_shape, seed=1)
+    generator = DensityMapGenerator(frame_shape, blur_kernel_size=61, clipping_percentile=98, cell_size=8,
+                                    incremental=True)
+
+    start = time.perf_counter()
+    for frame_index, detections in enumerate(frames):
+        with profiler.stage('heatmap_add'):
+            generator.add_points(detections.centers)
+        # Arayüzdeki canlı haritaya benzer şekilde her 30 karede bir görüntü üretilir
+        if frame_index % 30 == 0:
+            with profiler.stage('heatmap_render'):
+                generator.generate_live_heatmap_image()
+    with profiler.stage('heatmap_final'):
+        generator.generate_heatmap_image()
+    elapsed = time.perf_counter() - start
+    return {
+        'frames': len(frames),
+        'seconds': elapsed,
+        'fps': len(frames) / elapsed if elapsed > 0 else 0.0,
+        'stages': _stage_latencies(profiler.snapshot()),
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+
+def build_cases(args):
+    """
+    Returns:
+        list: (senaryo_adı, fonksiyon, argümanlar) üçlüleri.
+    """
+    options = {
+        'model': args.model,
+        'detect_interval': args.detect_interval,
+        'max_frames': args.max_frames,
+        'synthetic_frames': args.synthetic_frames,
+        'synthetic_people': args.synthetic_people,
+        'width': args.width,
+        'height': args.height,
+    }
+    cases = []
+    if args.only in (None, 'video'):
+        for video in args.videos:
+            video_path = video if os.path.isabs(video) else os.path.join(ROOT_DIR, video)
+            name = f"video:{os.path.splitext(os.path.basename(video))[0]}"
+            cases.append((name, run_video_case, (video_path, options)))
+    if args.only in (None, 'synthetic'):
+        cases.append(('synthetic:counter', run_synthetic_counter_case, (options,)))
+        cases.append(('synthetic:heatmap', run_synthetic_heatmap_case, (options,)))
+    return cases
+
+
+def run_case(func, func_args, repeat):
+    """
+    Senaryoyu her seferinde temiz bir süreçte `repeat` kez çalıştırır ve fps'i medyan olan koşuyu döndürür.
+    """
+    runs = []
+    for _ in range(repeat):
+        with ProcessPoolExecutor(max_workers=1, mp_context=mp.get_context('spawn')) as executor:
+            runs.append(executor.submit(func, *func_args).result())
+    runs.sort(key=lambda run: run['fps'])
+    result = runs[len(runs) // 2]
+    result['fps_runs'] = [run['fps'] for run in runs]
+    return result
+
+
+def environment_info():
+    return {
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+    }
+
+
+def compare_with_baseline(results, baseline, threshold):
+    """
+    Sonuçları temel ile karşılaştırır.
+
+    Returns:
+        list: Gerileme açıklamaları (boşsa gerileme yok).
+    """
+    regressions = []
+    limit = threshold / 100
+    for name, current in results['cases'].items():
+        reference = baseline['cases'].get(name)
+        if reference is None or 'error' in reference:
+            continue
+        # Temelde çalışan bir senaryonun artık çalışmaması (örn. model dosyası eksik) gerilemedir
+        if 'error' in current:
+            regressions.append(f"{name}: temelde çalışıyordu, şimdi hata veriyor ({current['error']})")
+            continue
+
+        for metric, higher_is_better in COMPARED_METRICS:
+            new_value, old_value = current.get(metric), reference.get(metric)
+            if not new_value or not old_value:
+                continue
+            change = (new_value - old_value) / old_value
+            if (higher_is_better and change < -limit) or (not higher_is_better and change > limit):
+                regressions.append(f"{name}: {metric} {old_value:.2f} -> {new_value:.2f} ({change * 100:+.1f}%)")
+
+        for stage, stats in current['stages'].items():
+            reference_stats = reference.get('stages', {}).get(stage)
+            key = f"{COMPARED_STAGE_QUANTILE}_ms"
+            if reference_stats is None or reference_stats[key] < MIN_COMPARED_STAGE_MS:
+                continue
+            change = (stats[key] - reference_stats[key]) / reference_stats[key]
+            if change > limit:
+                regressions.append(f"{name}: {stage} {key} {reference_stats[key]:.3f} -> {stats[key]:.3f} "
+                                   f"({change * 100:+.1f}%)")
+
+        # Sayım sonuçları performanstan bağımsızdır; değişmeleri doğruluk gerilemesidir
+        for metric in ('entries', 'exits'):
+            if metric in reference and current.get(metric) != reference[metric]:
+                regressions.append(f"{name}: {metric} {reference[metric]} -> {current.get(metric)} (sayım değişti)")
+    return regressions
+
+
+def print_results(results):
+    print(f"\n{'Senaryo':<24}{'Kare':>8}{'FPS':>10}{'Kurulum (s)':>13}{'Tepe RSS (MB)':>15}{'Giriş':>7}{'Çıkış':>7}")
+    for name, result in results['cases'].items():
+        if 'error' in result:
+            print(f"{name:<24}  HATA: {result['error']}")
+            continue
+        rss = f"{result['peak_rss_mb']:.0f}" if result['peak_rss_mb'] is not None else '-'
+        setup = f"{result['setup_seconds']:.2f}" if 'setup_seconds' in result else '-'
+        print(f"{name:<24}{result['frames']:>8}{result['fps']:>10.1f}{setup:>13}{rss:>15}"
+              f"{result.get('entries', '-'):>7}{result.get('exits', '-'):>7}")
+        for stage, stats in result['stages'].items():
+            print(f"    {stage:<20}p50 {stats['p50_ms']:8.3f} ms   p95 {stats['p95_ms']:8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Paketle gelen videolar ve sentetik tespitlerle performans takımı.")
+    parser.add_argument("--videos", nargs='+', default=list(DEFAULT_VIDEOS), help="Hat senaryoları için videolar")
+    parser.add_argument("--only", choices=('video', 'synthetic'), default=None, help="Yalnızca bir senaryo grubu")
+    parser.add_argument("--model", default=os.path.join(ROOT_DIR, 'Model', 'yolov8m.pt'))
+    parser.add_argument("--detect-interval", type=int, default=1)
+    parser.add_argument("--max-frames", type=int, default=None, help="Video başına en fazla işlenecek kare")
+    parser.add_argument("--synthetic-frames", type=int, default=3000)
+    parser.add_argument("--synthetic-people", type=int, default=400)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--repeat", type=int, default=1, help="Senaryo başına koşu sayısı (medyan fps alınır)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Sonuç JSON dosyası")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Karşılaştırılacak temel JSON dosyası")
+    parser.add_argument("--save-baseline", action='store_true', help="Sonuçları yeni temel olarak kaydet")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Gerileme eşiği (yüzde)")
+    args = parser.parse_args()
+
+    results = {
+        'created_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'environment': environment_info(),
+        'options': {key: getattr(args, key) for key in ('videos', 'model', 'detect_interval', 'max_frames',
+                                                        'synthetic_frames', 'synthetic_people', 'width', 'height')},
+        'cases': {},
+    }
+    for name, func, func_args in build_cases(args):
+        print(f"Çalışıyor: {name}")
+        try:
+            results['cases'][name] = run_case(func, func_args, max(1, args.repeat))
+        except Exception as e:
+            results['cases'][name] = {'error': str(e)}
+
+    print_results(results)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=4)
+    print(f"\nSonuçlar kaydedildi: {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=4)
+        print(f"Temel kaydedildi: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("Temel dosyası yok; karşılaştırma yapılmadı (--save-baseline ile oluşturun).")
+        return 0
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('environment') != results['environment']:
+        print("Uyarı: temel farklı bir ortamda ölçülmüş; karşılaştırma yanıltıcı olabilir.")
+    if baseline.get('options') != results['options']:
+        print("Uyarı: temel farklı ayarlarla ölçülmüş; sayım ve hız karşılaştırmaları geçersiz olabilir.")
+
+    regressions = compare_with_baseline(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} gerileme bulundu (eşik %{args.threshold:g}):")
+        for regression in regressions:
+            print(f"  - {regression}")
+        return 1
+    print(f"\nGerileme yok (eşik %{args.threshold:g}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
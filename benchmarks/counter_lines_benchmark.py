@@ -0,0 +1,106 @@
+# benchmarks/counter_lines_benchmark.py
+#
+# Çok çizgili EntryExitCounter'ın ölçeklenmesini ölçer: iz sayısı (ör. 200) ve sayım çizgisi sayısı
+# (ör. 1-20, her biri 3 parçalı kırık çizgi) arttıkça kare başına update süresi. Ayrıca tek yatay
+# çizgide, sonuçların nesne başına Python döngüsüyle yazılmış eski kuralla (önceki y < çizgi <= şimdiki y:
+# giriş, önceki y > çizgi >= şimdiki y: çıkış, iz başına bir kez; kaybolan iz hemen silinir) birebir aynı
+# olduğu doğrulanır.
+#
+# Kullanım:
+#   python benchmarks/counter_lines_benchmark.py
+#   python benchmarks/counter_lines_benchmark.py --tracks 50 200 400 --lines 1 5 20 --frames 500
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from detections import Detections
+from entry_exit_counter import CountingLine, EntryExitCounter
+
+FRAME_WIDTH, FRAME_HEIGHT = 1920, 1080
+
+
+def random_walk_frames(num_frames, num_tracks, seed=0):
+    """
+    Kare boyunca rastgele yürüyen izler; her karede izlerin ~%5'i görünmez olur (ID kaybı/yeniden görünme).
+    """
+    rng = np.random.default_rng(seed)
+    positions = rng.uniform([0, 0], [FRAME_WIDTH, FRAME_HEIGHT], size=(num_tracks, 2))
+    velocities = rng.uniform(-12, 12, size=(num_tracks, 2))
+    frames = []
+    for _ in range(num_frames):
+        positions = np.clip(positions + velocities + rng.normal(0, 2, size=positions.shape),
+                            0, [FRAME_WIDTH - 1, FRAME_HEIGHT - 1])
+        visible = rng.random(num_tracks) > 0.05
+        ids = np.flatnonzero(visible) + 1
+        centers = positions[visible].astype(np.int32)
+        frames.append(Detections(ids, np.concatenate([centers - 20, centers + 20], axis=1), centers))
+    return frames
+
+
+def polyline_lines(count, seed=1):
+    rng = np.random.default_rng(seed)
+    return [CountingLine(rng.uniform([0, 0], [FRAME_WIDTH, FRAME_HEIGHT], size=(4, 2))) for _ in range(count)]
+
+
+def reference_horizontal_events(frames, line_y):
+    """
+    Tek yatay çizgi için nesne başına döngüyle yazılmış referans sayım.
+    """
+    previous = {}
+    counted = set()
+    events = []
+    for detections in frames:
+        current = {}
+        frame_events = []
+        for track_id, (_, y) in zip(detections.ids.tolist(), detections.centers.tolist()):
+            current[track_id] = y
+            if track_id in previous and track_id not in counted:
+                if previous[track_id] < line_y <= y:
+                    frame_events.append('Giriş')
+                    counted.add(track_id)
+                elif previous[track_id] > line_y >= y:
+                    frame_events.append('Çıkış')
+                    counted.add(track_id)
+        counted &= set(current)
+        previous = current
+        events.append(frame_events)
+    return events
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Çok çizgili sayacın iz/çizgi sayısına göre ölçeklenmesi.")
+    parser.add_argument("--tracks", type=int, nargs='+', default=[20, 200])
+    parser.add_argument("--lines", type=int, nargs='+', default=[1, 5, 20])
+    parser.add_argument("--frames", type=int, default=300)
+    args = parser.parse_args()
+
+    # Tek yatay çizgide referansla birebir karşılaştırma
+    frames = random_walk_frames(args.frames, max(args.tracks))
+    counter = EntryExitCounter(line_y_position=FRAME_HEIGHT // 2, lost_track_grace=0)
+    matches = all(counter.update(detections) == expected
+                  for detections, expected in zip(frames, reference_horizontal_events(frames, FRAME_HEIGHT // 2)))
+    print(f"Yatay çizgi referansla aynı: {'evet' if matches else 'HAYIR'} "
+          f"({counter.entries} giriş, {counter.exits} çıkış)\n")
+
+    print(f"{'İz':>6}{'Çizgi':>7}{'Parça':>7}{'update (µs/kare)':>19}{'Olay':>8}")
+    for num_tracks in args.tracks:
+        frames = random_walk_frames(args.frames, num_tracks)
+        for num_lines in args.lines:
+            counter = EntryExitCounter(lines=polyline_lines(num_lines))
+            start = time.perf_counter()
+            for detections in frames:
+                counter.update(detections)
+            elapsed = time.perf_counter() - start
+            segments = sum(len(line.points) - 1 for line in counter.lines)
+            print(f"{num_tracks:>6}{num_lines:>7}{segments:>7}{elapsed / len(frames) * 1e6:>19.1f}"
+                  f"{counter.entries + counter.exits:>8}")
+
+
+if __name__ == "__main__":
+    main()
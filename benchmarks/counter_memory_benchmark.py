@@ -0,0 +1,73 @@
+# benchmarks/counter_memory_benchmark.py
+#
+# EntryExitCounter'ın uzun (7/24) çalışmada belleğinin sabit kaldığını doğrular. Sentetik bir akışta
+# aynı anda --concurrent kişi kareyi yukarıdan aşağı (veya tersi) geçer; geçişini bitiren kişi yeni bir
+# takip ID'siyle yeniden başlar (BoT-SORT gibi ID'ler hiç tekrar kullanılmaz) ve her karede izlerin bir
+# kısmı görünmez olur. Belirli aralıklarla tracemalloc ile ölçülen Python belleği, iz deposunun kapasitesi,
+# dolu slot sayısı ve bellekte tutulan log sayısı yazdırılır. --unbounded-logs ile logların sınırsız
+# tutulduğu eski davranış karşılaştırılabilir.
+#
+# Kullanım:
+#   python benchmarks/counter_memory_benchmark.py --frames 100000
+#   python benchmarks/counter_memory_benchmark.py --frames 50000 --concurrent 200 --unbounded-logs
+
+import argparse
+import os
+import sys
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from detections import Detections
+from entry_exit_counter import EntryExitCounter
+
+FRAME_WIDTH, FRAME_HEIGHT = 1920, 1080
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sayacın uzun çalışmada bellek kullanımı.")
+    parser.add_argument("--frames", type=int, default=100000, help="İşlenecek kare sayısı (25 FPS'te 100000 ~ 1.1 saat)")
+    parser.add_argument("--concurrent", type=int, default=40, help="Aynı anda karedeki kişi sayısı")
+    parser.add_argument("--dropout", type=float, default=0.03, help="Bir izin bir karede görünmeme olasılığı")
+    parser.add_argument("--checkpoints", type=int, default=10, help="Ölçüm noktası sayısı")
+    parser.add_argument("--unbounded-logs", action='store_true', help="Logları sınırsız tut (eski davranış)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    counter = EntryExitCounter(line_y_position=FRAME_HEIGHT // 2, max_logs=None if args.unbounded_logs else 1000)
+    ids = np.arange(args.concurrent, dtype=np.int64)
+    next_id = args.concurrent
+    x = rng.uniform(0, FRAME_WIDTH, args.concurrent)
+    y = rng.uniform(0, FRAME_HEIGHT, args.concurrent)
+    speed = rng.choice([-1, 1], args.concurrent) * rng.uniform(6, 12, args.concurrent)
+
+    tracemalloc.start()
+    checkpoint_every = max(1, args.frames // args.checkpoints)
+    print(f"{'Kare':>10}{'Bellek (KB)':>13}{'Kapasite':>10}{'İz':>6}{'Log':>8}{'Olay':>9}")
+    for frame_index in range(1, args.frames + 1):
+        y += speed
+        # Kareden çıkan kişi yeni ID ile karşı kenardan yeniden girer
+        finished = (y < 0) | (y >= FRAME_HEIGHT)
+        if finished.any():
+            count = int(finished.sum())
+            ids[finished] = np.arange(next_id, next_id + count)
+            next_id += count
+            y[finished] = np.where(speed[finished] > 0, 0, FRAME_HEIGHT - 1)
+            x[finished] = rng.uniform(0, FRAME_WIDTH, count)
+
+        visible = rng.random(args.concurrent) >= args.dropout
+        centers = np.stack([x[visible], y[visible]], axis=1).astype(np.int32)
+        counter.update(Detections(ids[visible], np.concatenate([centers - 20, centers + 20], axis=1), centers))
+
+        if frame_index % checkpoint_every == 0:
+            current, _ = tracemalloc.get_traced_memory()
+            stats = counter.memory_stats()
+            print(f"{frame_index:>10}{current / 1024:>13.1f}{stats['capacity']:>10}{stats['tracks']:>6}"
+                  f"{stats['kept_logs']:>8}{counter.entries + counter.exits:>9}")
+    tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    main()
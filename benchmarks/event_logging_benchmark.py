@@ -0,0 +1,58 @@
+# benchmarks/event_logging_benchmark.py
+#
+# DataManager.log_event'in doğrudan (olay başına commit) ve tamponlu (arka planda toplu
+# transaction) modlarını karşılaştırır: saniyedeki olay sayısı ve kare döngüsüne eklenen gecikme.
+#
+# Kullanım:
+#   python benchmarks/event_logging_benchmark.py --events 5000
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_manager import DataManager
+
+
+def run(buffered, num_events, db_folder):
+    db_manager = DataManager(db_folder=db_folder, db_name=f"bench_{'buffered' if buffered else 'direct'}.db",
+                             buffered=buffered)
+    session_id = db_manager.create_new_session(video_name="benchmark")
+
+    call_latencies = np.empty(num_events)
+    start = time.perf_counter()
+    for i in range(num_events):
+        call_start = time.perf_counter()
+        db_manager.log_event(session_id, 'Giriş' if i % 2 == 0 else 'Çıkış')
+        call_latencies[i] = time.perf_counter() - call_start
+    # Kapanışta tüm olaylar yazılır; toplam süreye dahil edilir
+    db_manager.close_connection()
+    elapsed = time.perf_counter() - start
+
+    check = DataManager(db_folder=db_folder, db_name=f"bench_{'buffered' if buffered else 'direct'}.db")
+    stored = len(check.get_events_by_session(session_id))
+    check.close_connection()
+    return num_events / elapsed, call_latencies * 1e6, stored
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Olay kaydetme ölçümü")
+    parser.add_argument("--events", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as db_folder:
+        print(f"{'mod':>10} {'olay/sn':>10} {'ort. (µs)':>10} {'p99 (µs)':>10} {'maks (µs)':>10} {'yazılan':>8}")
+        for buffered in (False, True):
+            events_per_second, latencies, stored = run(buffered, args.events, db_folder)
+            print(f"{'tamponlu' if buffered else 'doğrudan':>10} {events_per_second:>10.0f} "
+                  f"{latencies.mean():>10.1f} {np.percentile(latencies, 99):>10.1f} "
+                  f"{latencies.max():>10.1f} {stored:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# benchmarks/frame_skip_accuracy.py
+#
+# Kare atlama modunun (detect_interval > 1) her karede tespit yapan temel koşuya göre
+# ne kadar doğruluk kaybettiğini ve ne kadar hız kazandırdığını raporlar.
+#
+# Kullanım:
+#   python benchmarks/frame_skip_accuracy.py --video video/giris_cikis.mp4 --line-y 450 --intervals 2 3 5
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from video_stream_manager import VideoStreamManager
+from person_detect_and_tracking_engine import PersonTrackingEngine
+from entry_exit_counter import EntryExitCounter
+
+
+def run_pipeline(video_path, model_path, detect_interval, line_y):
+    """
+    Videoyu verilen tespit aralığıyla işler; kare başına merkezleri ve sayaç sonuçlarını döndürür.
+    """
+    stream_manager = VideoStreamManager(source=video_path)
+    if not stream_manager.start_stream():
+        return None
+
+    engine = PersonTrackingEngine(model_path=model_path, detect_interval=detect_interval, render=False)
+    counter = EntryExitCounter(line_y_position=line_y)
+    centers_per_frame = []
+
+    start = time.perf_counter()
+    while True:
+        ret, frame = stream_manager.get_frame()
+        if not ret:
+            break
+        _, _, detections = engine.process_frame(frame)
+        counter.update(detections)
+        centers_per_frame.append(detections.centers.astype(np.float32))
+    elapsed = time.perf_counter() - start
+    stream_manager.stop_stream()
+
+    return {
+        'fps': len(centers_per_frame) / elapsed if elapsed else 0.0,
+        'entries': counter.entries,
+        'exits': counter.exits,
+        'centers': centers_per_frame,
+    }
+
+
+def compare_centers(baseline_centers, candidate_centers):
+    """
+    Kare başına kişi sayısı hatası ve en yakın komşu merkez hatasının ortalamasını hesaplar.
+    ID'ler koşular arasında farklı olabileceği için eşleştirme konuma göre yapılır.
+    """
+    count_errors = []
+    distance_errors = []
+    for base, cand in zip(baseline_centers, candidate_centers):
+        count_errors.append(abs(len(base) - len(cand)))
+        if len(base) and len(cand):
+            distances = np.linalg.norm(base[:, None, :] - cand[None, :, :], axis=2)
+            distance_errors.extend(distances.min(axis=1).tolist())
+    mean_count_error = float(np.mean(count_errors)) if count_errors else 0.0
+    mean_distance_error = float(np.mean(distance_errors)) if distance_errors else 0.0
+    return mean_count_error, mean_distance_error
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kare atlama modu doğruluk karşılaştırması")
+    parser.add_argument("--video", default="video/giris_cikis.mp4")
+    parser.add_argument("--model", default="Model/yolov8m.pt")
+    parser.add_argument("--line-y", type=int, default=450)
+    parser.add_argument("--intervals", type=int, nargs="+", default=[2, 3, 5])
+    args = parser.parse_args()
+
+    baseline = run_pipeline(args.video, args.model, 1, args.line_y)
+    if baseline is None:
+        print(f"Video okunamadı: {args.video}")
+        return
+
+    print(f"{'aralık':>7} {'fps':>8} {'giriş':>6} {'çıkış':>6} {'sayı hatası':>12} {'merkez hatası(px)':>18}")
+    print(f"{1:>7} {baseline['fps']:>8.2f} {baseline['entries']:>6} {baseline['exits']:>6} {0.0:>12.3f} {0.0:>18.2f}")
+    for interval in args.intervals:
+        result = run_pipeline(args.video, args.model, interval, args.line_y)
+        count_error, distance_error = compare_centers(baseline['centers'], result['centers'])
+        print(f"{interval:>7} {result['fps']:>8.2f} {result['entries']:>6} {result['exits']:>6} "
+              f"{count_error:>12.3f} {distance_error:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
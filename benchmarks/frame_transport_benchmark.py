@@ -0,0 +1,143 @@
+# benchmarks/frame_transport_benchmark.py
+#
+# Kare çözme ve inference ayrı süreçlerde çalıştığında karelerin taşınma maliyetini ölçer:
+# multiprocessing.Queue (kareler pickle edilir) ile paylaşımlı bellek halka tamponu
+# (SharedFrameRing, kopyasız) karşılaştırılır.
+#
+# Kullanım:
+#   python benchmarks/frame_transport_benchmark.py --frames 600 --width 1920 --height 1080
+#   python benchmarks/frame_transport_benchmark.py --video video/giris_cikis.mp4
+
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shared_frame_ring import SharedFrameRing, decode_to_ring
+
+
+def _consume(frame):
+    # Tüketici karenin tamamına dokunur (ör. modelin ön işleme adımı gibi)
+    return int(frame[::16, ::16, 0].sum())
+
+
+def _synthetic_frame(shape):
+    return np.random.default_rng(0).integers(0, 255, size=shape, dtype=np.uint8)
+
+
+def _queue_producer(frame_queue, shape, num_frames):
+    frame = _synthetic_frame(shape)
+    for index in range(num_frames):
+        frame[0, 0, 0] = index % 256
+        frame_queue.put(frame)
+    frame_queue.put(None)
+
+
+def _ring_producer(ring, shape, num_frames):
+    frame = _synthetic_frame(shape)
+    for index in range(num_frames):
+        slot = ring.acquire_write_slot()
+        # Gerçek kullanımda kare doğrudan yuvaya çözülür; burada sentetik kare yuvaya yazılır
+        np.copyto(slot, frame)
+        slot[0, 0, 0] = index % 256
+        ring.commit_write()
+    ring.close()
+    ring.detach()
+
+
+def _video_queue_producer(frame_queue, source):
+    from video_stream_manager import VideoStreamManager
+    stream_manager = VideoStreamManager(source=source)
+    stream_manager.start_stream()
+    while True:
+        ret, frame = stream_manager.get_frame()
+        if not ret:
+            break
+        frame_queue.put(frame)
+    stream_manager.stop_stream()
+    frame_queue.put(None)
+
+
+def _video_ring_producer(ring, source):
+    decode_to_ring(source, ring)
+
+
+def run_queue(context, producer, producer_args, queue_size):
+    frame_queue = context.Queue(maxsize=queue_size)
+    process = context.Process(target=producer, args=(frame_queue,) + producer_args)
+    start = time.perf_counter()
+    process.start()
+    frames = 0
+    while True:
+        frame = frame_queue.get()
+        if frame is None:
+            break
+        _consume(frame)
+        frames += 1
+    elapsed = time.perf_counter() - start
+    process.join()
+    return frames, elapsed
+
+
+def run_ring(context, ring, producer, producer_args):
+    process = context.Process(target=producer, args=(ring,) + producer_args)
+    start = time.perf_counter()
+    process.start()
+    frames = 0
+    # Üretici süreç beklenmedik şekilde ölürse ölçüm takılı kalmasın
+    for _, frame in ring.frames(timeout=30):
+        _consume(frame)
+        frames += 1
+    elapsed = time.perf_counter() - start
+    process.join()
+    ring.detach()
+    return frames, elapsed
+
+
+def report(label, frames, elapsed, frame_bytes):
+    print(f"  {label:<34} {frames / elapsed:>9.1f} kare/s  {frames * frame_bytes / elapsed / 1e9:>6.2f} GB/s  "
+          f"{elapsed / frames * 1000:>7.3f} ms/kare")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Süreçler arası kare taşıma ölçümü")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--slots", type=int, default=8, help="Halka tampon yuva sayısı ve kuyruk boyutu")
+    parser.add_argument("--video", default=None, help="Sentetik kareler yerine bu videoyu çöz")
+    args = parser.parse_args()
+
+    context = mp.get_context('spawn')
+    if args.video:
+        from video_stream_manager import VideoStreamManager
+        probe = VideoStreamManager(source=args.video)
+        probe.start_stream()
+        shape = probe.get_frame_shape()
+        probe.stop_stream()
+        frame_bytes = int(np.prod(shape))
+        print(f"Video: {args.video} {shape[1]}x{shape[0]} (çözme dahil)")
+        report("multiprocessing.Queue",
+               *run_queue(context, _video_queue_producer, (args.video,), args.slots), frame_bytes)
+        ring = SharedFrameRing(shape, slots=args.slots, context=context)
+        report("SharedFrameRing (yuvaya çözme)",
+               *run_ring(context, ring, _video_ring_producer, (args.video,)), frame_bytes)
+        return
+
+    shape = (args.height, args.width, 3)
+    frame_bytes = int(np.prod(shape))
+    print(f"Sentetik {args.width}x{args.height} kareler, {args.frames} kare, {args.slots} yuva")
+    report("multiprocessing.Queue (pickle)",
+           *run_queue(context, _queue_producer, (shape, args.frames), args.slots), frame_bytes)
+    ring = SharedFrameRing(shape, slots=args.slots, context=context)
+    report("SharedFrameRing (kopyasız okuma)",
+           *run_ring(context, ring, _ring_producer, (shape, args.frames)), frame_bytes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# benchmarks/heatmap_accumulation_benchmark.py
+#
+# DensityMapGenerator.add_points'in vektörel (np.add.at) sürümünü eski nokta başına
+# Python döngüsüyle kare başına 10, 100 ve 1000 nokta için karşılaştırır.
+#
+# Kullanım:
+#   python benchmarks/heatmap_accumulation_benchmark.py --frames 2000
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from density_map_generator import DensityMapGenerator
+
+
+def legacy_add_points(generator, points, intensity=15):
+    """
+    Eski (nokta başına döngü) uygulamanın birebir kopyası.
+    """
+    for x, y in points:
+        if 0 <= x < generator.frame_width and 0 <= y < generator.frame_height:
+            generator.heatmap_matrix[y, x] += intensity
+
+
+def make_frames(num_frames, points_per_frame, frame_shape, rng):
+    # Sınır dışı noktaları da içersin diye aralık çerçeveden biraz geniş tutuluyor
+    height, width = frame_shape[:2]
+    low = np.array([-20, -20])
+    high = np.array([width + 20, height + 20])
+    return [rng.integers(low, high, size=(points_per_frame, 2)) for _ in range(num_frames)]
+
+
+def time_it(func, frames):
+    start = time.perf_counter()
+    for points in frames:
+        func(points)
+    return (time.perf_counter() - start) / len(frames) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Isı haritası biriktirme mikro ölçümü")
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    args = parser.parse_args()
+
+    frame_shape = (args.height, args.width, 3)
+    rng = np.random.default_rng(0)
+
+    print(f"{'nokta/kare':>11} {'döngü (µs)':>12} {'vektörel (µs)':>14} {'hız':>7}")
+    for points_per_frame in (10, 100, 1000):
+        frames = make_frames(args.frames, points_per_frame, frame_shape, rng)
+        legacy_frames = [points.tolist() for points in frames]
+
+        legacy = DensityMapGenerator(frame_shape)
+        vectorized = DensityMapGenerator(frame_shape)
+        legacy_us = time_it(lambda points: legacy_add_points(legacy, points), legacy_frames)
+        vectorized_us = time_it(vectorized.add_points, frames)
+
+        if not np.array_equal(legacy.heatmap_matrix, vectorized.heatmap_matrix):
+            print("UYARI: iki yöntemin sonuçları farklı!")
+        print(f"{points_per_frame:>11} {legacy_us:>12.1f} {vectorized_us:>14.1f} {legacy_us / vectorized_us:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# benchmarks/heatmap_grid_benchmark.py
+#
+# DensityMapGenerator'ın tam çözünürlüklü matrisi ile kaba ızgara (cell_size) seçeneklerini
+# bellek, görüntü oluşturma süresi ve görsel benzerlik açısından karşılaştırır.
+#
+# Kullanım:
+#   python benchmarks/heatmap_grid_benchmark.py --width 3840 --height 2160 --cells 4 8 16
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from density_map_generator import DensityMapGenerator
+
+
+def synthetic_tracks(frame_shape, num_people, num_frames, rng):
+    """
+    Kare boyunca rastgele yürüyen kişilerin merkezlerini üretir.
+    """
+    height, width = frame_shape[:2]
+    positions = rng.uniform([0, 0], [width, height], size=(num_people, 2))
+    for _ in range(num_frames):
+        positions += rng.normal(0, 6, size=positions.shape)
+        positions = np.clip(positions, 0, [width - 1, height - 1])
+        yield positions.astype(np.int32)
+
+
+def build_generator(frame_shape, cell_size, frames, args):
+    generator = DensityMapGenerator(frame_shape, blur_kernel_size=args.blur, clipping_percentile=args.percentile,
+                                    cell_size=cell_size)
+    for points in frames:
+        generator.add_points(points)
+    start = time.perf_counter()
+    image = generator.generate_heatmap_image()
+    render_ms = (time.perf_counter() - start) * 1000
+    return generator, image, render_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kaba ızgaralı ısı haritası karşılaştırması")
+    parser.add_argument("--width", type=int, default=3840)
+    parser.add_argument("--height", type=int, default=2160)
+    parser.add_argument("--cells", type=int, nargs="+", default=[2, 4, 8, 16])
+    parser.add_argument("--people", type=int, default=40)
+    parser.add_argument("--frames", type=int, default=3000)
+    parser.add_argument("--blur", type=int, default=61)
+    parser.add_argument("--percentile", type=int, default=98)
+    args = parser.parse_args()
+
+    frame_shape = (args.height, args.width, 3)
+    frames = list(synthetic_tracks(frame_shape, args.people, args.frames, np.random.default_rng(0)))
+
+    _, reference_image, reference_ms = build_generator(frame_shape, 1, frames, args)
+    reference_mb = args.width * args.height * 4 / 1e6
+
+    print(f"{args.width}x{args.height}, {args.frames} kare, {args.people} kişi")
+    print(f"{'hücre':>6} {'bellek (MB)':>12} {'çizim (ms)':>11} {'ort. fark (0-255)':>18}")
+    print(f"{1:>6} {reference_mb:>12.2f} {reference_ms:>11.1f} {0.0:>18.2f}")
+    for cell_size in args.cells:
+        generator, image, render_ms = build_generator(frame_shape, cell_size, frames, args)
+        mean_diff = np.abs(image.astype(np.int16) - reference_image.astype(np.int16)).mean()
+        print(f"{cell_size:>6} {generator.memory_bytes / 1e6:>12.2f} {render_ms:>11.1f} {mean_diff:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# benchmarks/history_query_benchmark.py
+#
+# Geçmiş sayfasının sorgularını sentetik bir veritabanında ölçer: ilk şema (TEXT zaman
+# damgası, indeks yok) ile güncel şema (epoch milisaniye, bileşik indeksler, sayfalama).
+#
+# Kullanım:
+#   python benchmarks/history_query_benchmark.py --events 10000000 --sessions 5000
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_manager import DataManager
+
+BASE_EPOCH_MS = 1_700_000_000_000
+
+
+def synthetic_rows(num_events, num_sessions):
+    # Olaylar oturumlar arasında karışık sırayla (gerçek eşzamanlı kameralar gibi) yazılır
+    for i in range(num_events):
+        yield i % num_sessions + 1, BASE_EPOCH_MS + i * 250, 'Giriş' if i % 3 else 'Çıkış'
+
+
+def build_legacy_db(path, num_events, num_sessions):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("CREATE TABLE sessions (session_id INTEGER PRIMARY KEY AUTOINCREMENT, start_time TEXT NOT NULL, "
+                 "video_name TEXT, total_entries INTEGER DEFAULT 0, total_exits INTEGER DEFAULT 0)")
+    conn.execute("CREATE TABLE events (event_id INTEGER PRIMARY KEY AUTOINCREMENT, session_id INTEGER NOT NULL, "
+                 "timestamp TEXT NOT NULL, event_type TEXT NOT NULL)")
+    fmt = lambda ms: datetime.fromtimestamp(ms / 1000).strftime("%Y-%m-%d %H:%M:%S")
+    conn.executemany("INSERT INTO sessions (start_time, video_name) VALUES (?, ?)",
+                     ((fmt(BASE_EPOCH_MS + i * 60_000), f"video_{i}.mp4") for i in range(num_sessions)))
+    conn.executemany("INSERT INTO events (session_id, timestamp, event_type) VALUES (?, ?, ?)",
+                     ((sid, fmt(ms), kind) for sid, ms, kind in synthetic_rows(num_events, num_sessions)))
+    conn.commit()
+    conn.close()
+
+
+def build_current_db(folder, name, num_events, num_sessions):
+    db_manager = DataManager(db_folder=folder, db_name=name)
+    db_manager.cursor.execute("PRAGMA synchronous=OFF")
+    db_manager.cursor.executemany("INSERT INTO sessions (start_time, video_name) VALUES (?, ?)",
+                                  ((BASE_EPOCH_MS + i * 60_000, f"video_{i}.mp4") for i in range(num_sessions)))
+    db_manager.cursor.executemany("INSERT INTO events (session_id, timestamp, event_type) VALUES (?, ?, ?)",
+                                  synthetic_rows(num_events, num_sessions))
+    db_manager.conn.commit()
+    return db_manager
+
+
+def timed(label, func, repeat=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    elapsed_ms = (time.perf_counter() - start) / repeat * 1000
+    print(f"  {label:<48} {elapsed_ms:>10.2f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Geçmiş sorguları ölçümü")
+    parser.add_argument("--events", type=int, default=10_000_000)
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--page-size", type=int, default=500)
+    args = parser.parse_args()
+
+    session_id = args.sessions // 2
+    with tempfile.TemporaryDirectory() as folder:
+        print(f"{args.events} olay, {args.sessions} oturum oluşturuluyor...")
+        legacy_path = os.path.join(folder, "legacy.db")
+        build_legacy_db(legacy_path, args.events, args.sessions)
+        db_manager = build_current_db(folder, "current.db", args.events, args.sessions)
+
+        legacy = sqlite3.connect(legacy_path)
+        print("İlk şema (indeks yok, TEXT zaman damgası):")
+        timed("oturum olayları (tam tarama + sıralama)", lambda: legacy.execute(
+            "SELECT timestamp, event_type FROM events WHERE session_id = ? ORDER BY timestamp ASC",
+            (session_id,)).fetchall(), repeat=2)
+        timed("tüm oturumlar (sıralama)", lambda: legacy.execute(
+            "SELECT * FROM sessions ORDER BY start_time DESC").fetchall())
+
+        print("Güncel şema (bileşik indeksler, epoch ms):")
+        timed("oturum olayları (get_events_by_session)", lambda: db_manager.get_events_by_session(session_id))
+        timed("olay sayısı (count_events)", lambda: db_manager.count_events(session_id))
+        _, cursor = timed("olaylar ilk sayfa (keyset)", lambda: db_manager.get_events_page(
+            session_id, page_size=args.page_size))
+        timed("oturumlar ilk sayfa (get_sessions_page)", lambda: db_manager.get_sessions_page(page=0))
+        timed("oturumlar son sayfa (get_sessions_page)", lambda: db_manager.get_sessions_page(
+            page=args.sessions // 50 - 1))
+
+        # Derin sayfa: keyset imleci ile OFFSET karşılaştırması
+        deep_offset = max(0, args.events // args.sessions - args.page_size)
+        deep_cursor = db_manager.cursor.execute(
+            "SELECT timestamp, event_id FROM events WHERE session_id = ? ORDER BY timestamp, event_id "
+            "LIMIT 1 OFFSET ?", (session_id, max(0, deep_offset - 1))).fetchone()
+        if deep_cursor:
+            # Her iki sorgu da ham SQL ile ölçülür (zaman damgası biçimlendirme maliyeti hariç)
+            timed("olaylar derin sayfa (keyset)", lambda: db_manager.cursor.execute(
+                "SELECT timestamp, event_type, event_id FROM events WHERE session_id = ? "
+                "AND (timestamp, event_id) > (?, ?) ORDER BY timestamp, event_id LIMIT ?",
+                (session_id, deep_cursor[0], deep_cursor[1], args.page_size)).fetchall())
+            timed("olaylar derin sayfa (OFFSET)", lambda: db_manager.cursor.execute(
+                "SELECT timestamp, event_type FROM events WHERE session_id = ? ORDER BY timestamp, event_id "
+                "LIMIT ? OFFSET ?", (session_id, args.page_size, deep_offset)).fetchall())
+
+        legacy.close()
+        db_manager.close_connection()
+
+
+if __name__ == "__main__":
+    main()
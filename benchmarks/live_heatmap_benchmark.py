@@ -0,0 +1,76 @@
+# benchmarks/live_heatmap_benchmark.py
+#
+# Canlı (artımlı) ısı haritası yenilemesinin maliyetini, her yenilemede haritayı baştan
+# üreten generate_heatmap_image ile karşılaştırır ve iki görüntü arasındaki farkı raporlar.
+#
+# Kullanım:
+#   python benchmarks/live_heatmap_benchmark.py --width 3840 --height 2160 --cell 1 --refresh-frames 90
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from density_map_generator import DensityMapGenerator
+
+
+def doorway_tracks(frame_shape, num_people, num_frames, rng):
+    """
+    Kapı önü senaryosu: kişiler karenin ortasındaki dar bir şeritte dikey olarak yürür.
+    """
+    height, width = frame_shape[:2]
+    lane = (int(width * 0.4), int(width * 0.6))
+    positions = np.column_stack([rng.uniform(*lane, num_people), rng.uniform(0, height, num_people)])
+    speeds = rng.choice([-1, 1], num_people) * rng.uniform(2, 6, num_people)
+    for _ in range(num_frames):
+        positions[:, 1] = (positions[:, 1] + speeds) % height
+        positions[:, 0] = np.clip(positions[:, 0] + rng.normal(0, 1, num_people), *lane)
+        yield positions.astype(np.int32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Canlı ısı haritası yenileme maliyeti")
+    parser.add_argument("--width", type=int, default=3840)
+    parser.add_argument("--height", type=int, default=2160)
+    parser.add_argument("--cell", type=int, default=1)
+    parser.add_argument("--people", type=int, default=20)
+    parser.add_argument("--frames", type=int, default=1800)
+    parser.add_argument("--refresh-frames", type=int, default=90, help="Kaç karede bir yenileneceği")
+    parser.add_argument("--blur", type=int, default=61)
+    parser.add_argument("--percentile", type=int, default=98)
+    args = parser.parse_args()
+
+    frame_shape = (args.height, args.width, 3)
+    generator = DensityMapGenerator(frame_shape, blur_kernel_size=args.blur, clipping_percentile=args.percentile,
+                                    cell_size=args.cell, incremental=True)
+
+    live_times, full_times, diffs = [], [], []
+    tracks = doorway_tracks(frame_shape, args.people, args.frames, np.random.default_rng(0))
+    for frame_index, points in enumerate(tracks, start=1):
+        generator.add_points(points)
+        if frame_index % args.refresh_frames:
+            continue
+
+        start = time.perf_counter()
+        live_image = generator.generate_live_heatmap_image()
+        live_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        full_image = generator.generate_heatmap_image()
+        full_times.append(time.perf_counter() - start)
+
+        diffs.append(np.abs(live_image.astype(np.int16) - full_image.astype(np.int16)).mean())
+
+    print(f"{args.width}x{args.height}, hücre {args.cell}, {args.people} kişi, "
+          f"her {args.refresh_frames} karede bir yenileme ({len(live_times)} yenileme)")
+    print(f"  tam üretim   : ort. {np.mean(full_times) * 1000:8.1f} ms")
+    print(f"  canlı yenileme: ort. {np.mean(live_times) * 1000:8.1f} ms")
+    print(f"  ort. görüntü farkı (0-255): {np.mean(diffs):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# benchmarks/motion_gate_benchmark.py
+#
+# Hareket kapısının (MotionGate) tam gün boyunca ne kadar kareyi atladığını ve ne kadar CPU
+# kazandırdığını ölçer. Bir günü temsil eden kare dizisi şöyle kurulur: yoğun saatler paketle
+# gelen videonun kendisi, boş saatler (gece, yoğun olmayan saatler) ise videonun kişisiz arka planı
+# (örnek karelerin medyanı) üzerine sensör gürültüsü ve yavaş ışık değişimi eklenerek üretilir.
+# Aynı dizi kapı kapalı ve açık iki kez işlenir; atlanan kare oranı, kare başına CPU süresi
+# (yalnızca process_frame; time.process_time, tüm thread'ler) ve giriş/çıkış sayıları
+# karşılaştırılır. Sonuç videonun FPS'iyle 24 saate ölçeklenir.
+#
+# Kullanım:
+#   python benchmarks/motion_gate_benchmark.py --frames 600 --busy-ratio 0.25
+#   python benchmarks/motion_gate_benchmark.py --video video/ornek.mp4 --max-skip 60
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entry_exit_counter import EntryExitCounter
+from motion_gate import MotionGate
+from person_detect_and_tracking_engine import PersonTrackingEngine
+
+
+def video_info(video):
+    cap = cv2.VideoCapture(video)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    return fps, frame_count
+
+
+def video_frames(video, limit):
+    cap = cv2.VideoCapture(video)
+    for _ in range(limit):
+        ret, frame = cap.read()
+        if not ret:
+            break
+        yield frame
+    cap.release()
+
+
+def background_frame(video, frame_count, samples=25):
+    """
+    Videodan eşit aralıklı örnek karelerin piksel bazlı medyanı: hareket eden kişiler silinir,
+    sabit arka plan kalır.
+    """
+    wanted = set(np.linspace(0, max(0, frame_count - 1), samples).astype(int).tolist())
+    sampled = [frame for index, frame in enumerate(video_frames(video, frame_count)) if index in wanted]
+    return np.median(np.stack(sampled), axis=0).astype(np.uint8)
+
+
+def day_sequence(video, busy_count, background, total_frames, seed=0):
+    """
+    Boş saat - yoğun saat - boş saat düzeninde kare üreteci (kareler bellekte biriktirilmez).
+    Boş karelerde sensör gürültüsü ve yavaş parlaklık değişimi vardır.
+    """
+    rng = np.random.default_rng(seed)
+    idle_count = total_frames - busy_count
+    background = background.astype(np.int16)
+
+    def idle(count):
+        for index in range(count):
+            drift = 3.0 * np.sin(index / 200.0)
+            noise = rng.normal(0, 2.0, background.shape)
+            yield np.clip(background + drift + noise, 0, 255).astype(np.uint8)
+
+    yield from idle(idle_count // 2)
+    yield from video_frames(video, busy_count)
+    yield from idle(idle_count - idle_count // 2)
+
+
+def run(frames, args, motion_gate=None):
+    engine = PersonTrackingEngine(model_path=args.model, render=False, motion_gate=motion_gate)
+    counter = None
+    cpu_seconds, wall_seconds = 0.0, 0.0
+    for frame in frames:
+        if counter is None:
+            counter = EntryExitCounter(line_y_position=int(frame.shape[0] * args.line_percent / 100))
+        # Yalnızca motorun süresi ölçülür (boş karelerin üretimi hariç)
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        _, _, detections = engine.process_frame(frame)
+        cpu_seconds += time.process_time() - cpu_start
+        wall_seconds += time.perf_counter() - wall_start
+        counter.update(detections)
+    engine.close()
+    return {'cpu_seconds': cpu_seconds, 'wall_seconds': wall_seconds,
+            'entries': counter.entries, 'exits': counter.exits}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hareket kapısının tam gün ölçeğinde kare atlama ve CPU kazancı.")
+    parser.add_argument("--model", default=os.path.join('Model', 'yolov8m.pt'))
+    parser.add_argument("--video", default=os.path.join('video', 'giris_cikis.mp4'))
+    parser.add_argument("--frames", type=int, default=600, help="Günü temsil eden toplam kare sayısı")
+    parser.add_argument("--busy-ratio", type=float, default=0.25, help="Günün yoğun (hareketli) kısmının oranı")
+    parser.add_argument("--max-skip", type=int, default=30, help="MotionGate max_skip_frames")
+    parser.add_argument("--line-percent", type=float, default=50, help="Sayım çizgisinin Y konumu (yüzde)")
+    args = parser.parse_args()
+
+    fps, frame_count = video_info(args.video)
+    busy_count = min(frame_count, int(round(args.frames * args.busy_ratio)))
+    background = background_frame(args.video, frame_count)
+
+    baseline = run(day_sequence(args.video, busy_count, background, args.frames), args)
+    gate = MotionGate(max_skip_frames=args.max_skip)
+    gated = run(day_sequence(args.video, busy_count, background, args.frames), args, motion_gate=gate)
+
+    frames_per_day = fps * 24 * 3600
+    cpu_per_frame = baseline['cpu_seconds'] / args.frames
+    gated_cpu_per_frame = gated['cpu_seconds'] / args.frames
+    print(f"Kare: {args.frames} (yoğun: {busy_count}), video FPS: {fps:.1f}")
+    print(f"{'':<14}{'CPU (ms/kare)':>15}{'Süre (s)':>10}{'Giriş':>7}{'Çıkış':>7}{'24 saat CPU (saat)':>20}")
+    for name, result, per_frame in (('kapı kapalı', baseline, cpu_per_frame), ('kapı açık', gated, gated_cpu_per_frame)):
+        print(f"{name:<14}{per_frame * 1000:>15.1f}{result['wall_seconds']:>10.1f}{result['entries']:>7}"
+              f"{result['exits']:>7}{per_frame * frames_per_day / 3600:>20.1f}")
+    saved = 1 - gated_cpu_per_frame / cpu_per_frame if cpu_per_frame > 0 else 0.0
+    print(f"Atlanan kare: {gate.skipped}/{gate.frames} (%{gate.skip_ratio * 100:.1f}), CPU kazancı: %{saved * 100:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# benchmarks/profiler_overhead_benchmark.py
+#
+# Profil katmanının kare döngüsüne eklediği maliyeti ölçer: ölçümsüz döngü, profil kapalıyken
+# profiler.stage()/timed() ve profil açıkken aynı çağrılar karşılaştırılır. Sonuç, kare başına
+# ölçülen aşama sayısı ile çarpılıp tipik bir kare süresine oranlanır.
+#
+# Kullanım:
+#   python benchmarks/profiler_overhead_benchmark.py --iterations 200000
+#   python benchmarks/profiler_overhead_benchmark.py --stages-per-frame 8 --frame-ms 30
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from profiler import Profiler
+
+
+def _work():
+    return None
+
+
+def _measure(func, iterations):
+    start = time.perf_counter()
+    func(iterations)
+    return (time.perf_counter() - start) / iterations * 1e9
+
+
+def run(iterations, stages_per_frame, frame_ms):
+    profiler = Profiler(enabled=False)
+
+    def bare_loop(n):
+        for _ in range(n):
+            _work()
+
+    def stage_loop(n):
+        for _ in range(n):
+            with profiler.stage('bench'):
+                _work()
+
+    timed_work = profiler.timed('bench_timed')(_work)
+
+    def timed_loop(n):
+        for _ in range(n):
+            timed_work()
+
+    bare_ns = _measure(bare_loop, iterations)
+    disabled_stage_ns = _measure(stage_loop, iterations)
+    disabled_timed_ns = _measure(timed_loop, iterations)
+
+    profiler.enable()
+    enabled_stage_ns = _measure(stage_loop, iterations)
+    enabled_timed_ns = _measure(timed_loop, iterations)
+
+    start = time.perf_counter()
+    snapshot = profiler.snapshot()
+    snapshot_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{'Çağrı':<28}{'ns/çağrı':>12}{'Ek maliyet (ns)':>18}{'Kare payı (%)':>16}")
+    for label, value in (('ölçümsüz', bare_ns),
+                         ('stage() kapalı', disabled_stage_ns),
+                         ('timed() kapalı', disabled_timed_ns),
+                         ('stage() açık', enabled_stage_ns),
+                         ('timed() açık', enabled_timed_ns)):
+        overhead = max(0.0, value - bare_ns)
+        share = overhead * stages_per_frame / (frame_ms * 1e6) * 100
+        print(f"{label:<28}{value:>12.0f}{overhead:>18.0f}{share:>16.4f}")
+    print(f"\nsnapshot() ({len(snapshot)} aşama, pencere {profiler.window}): {snapshot_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Profil katmanının çağrı başına maliyetini ölçer.")
+    parser.add_argument("--iterations", type=int, default=200000)
+    parser.add_argument("--stages-per-frame", type=int, default=6, help="Kare başına ölçülen aşama sayısı")
+    parser.add_argument("--frame-ms", type=float, default=30.0, help="Karşılaştırma için tipik kare süresi (ms)")
+    args = parser.parse_args()
+    run(args.iterations, args.stages_per_frame, args.frame_ms)
@@ -0,0 +1,110 @@
+# benchmarks/roi_benchmark.py
+#
+# İlgi bölgesi (ROI) kırpmasının ve uyarlanır giriş çözünürlüğünün etkisini ölçer: karenin tamamı,
+# sayım çizgisi çevresindeki şerit, uyarlanır imgsz ve ikisi birlikte. Her yapılandırma için
+# yalnızca process_frame süresinden hesaplanan fps, modele giden ortalama piksel sayısı (kesit alanı
+# x imgsz ölçeği) ve giriş/çıkış sayıları raporlanır; sayıların tam kareyle aynı kalması beklenir.
+#
+# Kullanım:
+#   python benchmarks/roi_benchmark.py --max-frames 300
+#   python benchmarks/roi_benchmark.py --band-percent 20 --line-percent 60 --videos video/ornek.mp4
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adaptive_image_size import AdaptiveImageSize
+from entry_exit_counter import EntryExitCounter
+from inference_backends import BACKEND_TORCH, BACKENDS, EXPORT_IMAGE_SIZE
+from person_detect_and_tracking_engine import PersonTrackingEngine
+from region_of_interest import RegionOfInterest
+from video_stream_manager import VideoStreamManager
+
+
+def model_pixels(frame_shape, roi, imgsz):
+    """
+    Modelin bir karede işlediği yaklaşık piksel sayısı: kesit, en uzun kenarı imgsz olacak şekilde ölçeklenir.
+    """
+    height, width = frame_shape[:2]
+    region_ratio = 1.0
+    if roi is not None:
+        region_ratio = roi.pixel_ratio(frame_shape)
+        x0, y0, x1, y1 = roi.bounds(frame_shape)
+        height, width = y1 - y0, x1 - x0
+    scale = imgsz / max(height, width)
+    return height * width * scale * scale, region_ratio
+
+
+def run_config(video, args, roi=None, adaptive=False):
+    adaptive_imgsz = AdaptiveImageSize() if adaptive else None
+    engine = PersonTrackingEngine(model_path=args.model, render=False, backend=args.backend,
+                                  num_threads=args.threads, roi=roi, adaptive_imgsz=adaptive_imgsz)
+    stream_manager = VideoStreamManager(source=video)
+    stream_manager.start_stream()
+    counter = None
+    latencies = []
+    pixels = []
+    region_ratio = 1.0
+    while len(latencies) < args.max_frames:
+        ret, frame = stream_manager.get_frame()
+        if not ret:
+            break
+        if counter is None:
+            counter = EntryExitCounter(line_y_position=int(frame.shape[0] * args.line_percent / 100))
+        imgsz = adaptive_imgsz.imgsz if adaptive_imgsz is not None else EXPORT_IMAGE_SIZE
+        start = time.perf_counter()
+        _, _, detections = engine.process_frame(frame)
+        latencies.append(time.perf_counter() - start)
+        frame_pixels, region_ratio = model_pixels(frame.shape, roi, imgsz)
+        pixels.append(frame_pixels)
+        counter.update(detections)
+    stream_manager.stop_stream()
+    engine.close()
+    latencies = np.asarray(latencies)
+    return {
+        'fps': len(latencies) / latencies.sum() if latencies.sum() > 0 else 0.0,
+        'mean_ms': latencies.mean() * 1000,
+        'region_ratio': region_ratio,
+        'model_kpixels': np.mean(pixels) / 1000,
+        'entries': counter.entries if counter else 0,
+        'exits': counter.exits if counter else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ROI kırpma ve uyarlanır imgsz hız karşılaştırması.")
+    parser.add_argument("--model", default=os.path.join('Model', 'yolov8m.pt'))
+    parser.add_argument("--videos", nargs='+', default=[os.path.join('video', 'giris_cikis.mp4'),
+                                                        os.path.join('video', 'ornek.mp4')])
+    parser.add_argument("--backend", default=BACKEND_TORCH, choices=BACKENDS)
+    parser.add_argument("--threads", type=int, default=None, help="Çıkarım thread sayısı")
+    parser.add_argument("--max-frames", type=int, default=200, help="Video başına işlenecek kare sayısı")
+    parser.add_argument("--line-percent", type=float, default=50, help="Sayım çizgisinin Y konumu (yüzde)")
+    parser.add_argument("--band-percent", type=float, default=15,
+                        help="Şeridin çizginin altında ve üstündeki yüksekliği (kare yüksekliğinin yüzdesi)")
+    args = parser.parse_args()
+
+    band = RegionOfInterest.band(args.line_percent / 100, args.band_percent / 100)
+    configs = [
+        ('tam kare', None, False),
+        ('şerit', band, False),
+        ('uyarlanır', None, True),
+        ('şerit+uyarlanır', band, True),
+    ]
+    for video in args.videos:
+        print(f"\n--- {video} ---")
+        print(f"{'Yapılandırma':<18}{'FPS':>8}{'Ort. (ms)':>11}{'Kesit (%)':>11}{'Model kpiksel':>15}"
+              f"{'Giriş':>7}{'Çıkış':>7}")
+        for name, roi, adaptive in configs:
+            result = run_config(video, args, roi=roi, adaptive=adaptive)
+            print(f"{name:<18}{result['fps']:>8.2f}{result['mean_ms']:>11.1f}{result['region_ratio'] * 100:>11.1f}"
+                  f"{result['model_kpixels']:>15.1f}{result['entries']:>7}{result['exits']:>7}")
+
+
+if __name__ == "__main__":
+    main()
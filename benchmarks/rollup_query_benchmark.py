@@ -0,0 +1,90 @@
+# benchmarks/rollup_query_benchmark.py
+#
+# Bir yıllık sentetik olay geçmişinde akış/doluluk sorgularını ölçer: ham events tablosu
+# üzerinde GROUP BY ile özet (rollup) tablosundan okuma karşılaştırılır. Olaylar
+# DataManager'ın normal yazma yolundan geçtiği için özetlerin yazma maliyeti de raporlanır.
+#
+# Kullanım:
+#   python benchmarks/rollup_query_benchmark.py --events 2000000 --days 365
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_manager import DataManager
+
+
+def timed(label, func, repeat=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    elapsed_ms = (time.perf_counter() - start) / repeat * 1000
+    print(f"  {label:<52} {elapsed_ms:>10.2f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Özet tablo sorguları ölçümü")
+    parser.add_argument("--events", type=int, default=2_000_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--sessions", type=int, default=365)
+    parser.add_argument("--lines", type=int, default=2)
+    parser.add_argument("--batch", type=int, default=100, help="Bir transaction'da yazılan olay sayısı")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    end_ms = DataManager._now_ms()
+    start_ms = end_ms - args.days * 86_400_000
+    step_ms = (end_ms - start_ms) // args.events
+
+    with tempfile.TemporaryDirectory() as folder:
+        db_manager = DataManager(db_folder=folder)
+        session_ids = [db_manager.create_new_session(f"kamera_{i}.mp4") for i in range(args.sessions)]
+
+        print(f"{args.events} olay yazılıyor ({args.batch} olaylık transaction'lar)...")
+        write_start = time.perf_counter()
+        batch = []
+        for i in range(args.events):
+            # Oturumlar zamanı eşit dilimlere böler (her gün bir oturum gibi)
+            session_id = session_ids[min(i * args.sessions // args.events, args.sessions - 1)]
+            event_type = 'Giriş' if rng.random() < 0.5 else 'Çıkış'
+            batch.append((session_id, start_ms + i * step_ms, event_type, rng.randrange(args.lines)))
+            if len(batch) == args.batch:
+                db_manager._write_events(batch)
+                batch = []
+        if batch:
+            db_manager._write_events(batch)
+        write_seconds = time.perf_counter() - write_start
+        print(f"  yazma: {write_seconds:.1f} s ({args.events / write_seconds:.0f} olay/s, özetler dahil)")
+        rollup_rows = db_manager.cursor.execute("SELECT COUNT(*) FROM event_rollups").fetchone()[0]
+        print(f"  özet satırı: {rollup_rows}")
+
+        cursor = db_manager.cursor
+        print("Ham olaylar (GROUP BY):")
+        timed("yıl boyu günlük akış (tüm oturumlar)", lambda: cursor.execute(
+            "SELECT strftime('%Y-%m-%d', timestamp / 1000, 'unixepoch', 'localtime') AS day, "
+            "SUM(event_type = 'Giriş'), SUM(event_type = 'Çıkış') FROM events GROUP BY day").fetchall(), repeat=1)
+        timed("son 7 gün, 15 dakikalık akış", lambda: cursor.execute(
+            "SELECT timestamp - timestamp % 900000 AS bucket, SUM(event_type = 'Giriş'), SUM(event_type = 'Çıkış') "
+            "FROM events WHERE timestamp >= ? GROUP BY bucket", (end_ms - 7 * 86_400_000,)).fetchall(), repeat=1)
+
+        print("Özet tablosu:")
+        timed("yıl boyu günlük akış (get_flow)", lambda: db_manager.get_flow(DataManager.ROLLUP_DAY))
+        timed("yıl boyu saatlik akış (get_flow)", lambda: db_manager.get_flow(DataManager.ROLLUP_HOUR))
+        timed("son 7 gün, 15 dakikalık akış (get_flow)", lambda: db_manager.get_flow(
+            DataManager.ROLLUP_MINUTE, start_ms=end_ms - 7 * 86_400_000, bucket_ms=15 * 60_000))
+        timed("son 7 gün saatlik doluluk (get_occupancy)", lambda: db_manager.get_occupancy(
+            DataManager.ROLLUP_HOUR, start_ms=end_ms - 7 * 86_400_000))
+        timed("tek oturum, tek çizgi dakikalık akış", lambda: db_manager.get_flow(
+            DataManager.ROLLUP_MINUTE, session_id=session_ids[len(session_ids) // 2], line_id=0))
+
+        db_manager.close_connection()
+
+
+if __name__ == "__main__":
+    main()
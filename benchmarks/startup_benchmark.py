@@ -0,0 +1,105 @@
+# benchmarks/startup_benchmark.py
+#
+# Açılış maliyetini ölçer: başsız giriş noktasının (cli) içe aktarım süresi, hangi ağır modüllerin
+# (ultralytics, torch, pandas, streamlit) bu sırada yüklendiği, ilk karenin işlenmesine kadar geçen
+# süre (time-to-first-frame) ve aynı süreçte ikinci bir analizin ilk kare süresi (model kayıttan
+# geliyorsa diskten yeniden yüklenmez). Her ölçüm temiz bir Python sürecinde yapılır.
+#
+# Önce/sonra karşılaştırması için eski bir sürümün klasörü --repo ile verilebilir:
+#   git worktree add /tmp/onceki <commit>
+#   python benchmarks/startup_benchmark.py --repo /tmp/onceki
+#
+# Kullanım:
+#   python benchmarks/startup_benchmark.py --runs 5
+#   python benchmarks/startup_benchmark.py --video video/ornek.mp4 --model Model/yolov8m.pt
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ('ultralytics', 'torch', 'pandas', 'streamlit')
+
+# Ölçülen depo klasöründe çalışan yoklama betiği; yalnızca her sürümde bulunan API'leri kullanır
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {repo!r})
+import cli
+import_seconds = time.perf_counter() - start
+loaded_after_import = [name for name in {heavy!r} if name in sys.modules]
+
+from person_detect_and_tracking_engine import PersonTrackingEngine
+from video_stream_manager import VideoStreamManager
+
+def first_frame_seconds():
+    session_start = time.perf_counter()
+    engine = PersonTrackingEngine(model_path={model!r}, render=False)
+    stream = VideoStreamManager(source={video!r})
+    stream.start_stream()
+    ret, frame = stream.get_frame()
+    engine.process_frame(frame)
+    elapsed = time.perf_counter() - session_start
+    frame_start = time.perf_counter()
+    ret, frame = stream.get_frame()
+    engine.process_frame(frame)
+    steady_frame = time.perf_counter() - frame_start
+    stream.stop_stream()
+    if hasattr(engine, 'close'):
+        engine.close()
+    return elapsed, steady_frame
+
+first_session, steady_frame = first_frame_seconds()
+time_to_first_frame = time.perf_counter() - start
+second_session, _ = first_frame_seconds()
+print(json.dumps({{
+    'import_seconds': import_seconds,
+    'loaded_after_import': loaded_after_import,
+    'time_to_first_frame': time_to_first_frame,
+    'first_session_seconds': first_session,
+    'second_session_seconds': second_session,
+    'steady_frame_seconds': steady_frame,
+}}))
+"""
+
+
+def run_probe(repo, model, video):
+    code = PROBE.format(repo=repo, heavy=HEAVY_MODULES, model=model, video=video)
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", code], cwd=repo, capture_output=True, text=True, check=True)
+    wall_seconds = time.perf_counter() - start
+    result = json.loads(output.stdout.strip().splitlines()[-1])
+    result['process_seconds'] = wall_seconds
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Açılış ve ilk kare sürelerini ölçer.")
+    parser.add_argument("--repo", action='append', default=None,
+                        help="Ölçülecek depo klasörü (birden fazla verilebilir; varsayılan: bu depo)")
+    parser.add_argument("--model", default=os.path.join('Model', 'yolov8m.pt'))
+    parser.add_argument("--video", default=os.path.join('video', 'giris_cikis.mp4'))
+    parser.add_argument("--runs", type=int, default=3, help="Depo başına süreç sayısı (medyan raporlanır)")
+    args = parser.parse_args()
+
+    repos = [os.path.abspath(repo) for repo in (args.repo or [ROOT_DIR])]
+    if args.repo and ROOT_DIR not in repos:
+        repos.append(ROOT_DIR)
+
+    keys = ('import_seconds', 'time_to_first_frame', 'first_session_seconds', 'second_session_seconds',
+            'steady_frame_seconds', 'process_seconds')
+    print(f"{'Depo':<28}" + "".join(f"{key.replace('_seconds', ''):>22}" for key in keys) + "  ağır modüller")
+    for repo in repos:
+        runs = [run_probe(repo, args.model, args.video) for _ in range(max(1, args.runs))]
+        medians = {key: statistics.median(run[key] for run in runs) for key in keys}
+        row = f"{os.path.basename(repo) or repo:<28}" + "".join(f"{medians[key] * 1000:>19.1f} ms" for key in keys)
+        print(f"{row}  {','.join(runs[0]['loaded_after_import']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# benchmarks/zone_analytics_benchmark.py
+#
+# ZoneAnalyzer'ın kare başına update süresini iz sayısı (ör. 50-500) ve bölge sayısına (ör. 1-48)
+# göre ölçer. Ayrıca etiket maskesinden okunan bölge üyeliklerinin, her nokta ve her çokgen için
+# cv2.pointPolygonTest ile yapılan klasik testle uyumu raporlanır (farklar yalnızca çokgen
+# kenarındaki hücrelerde beklenir; cell_size=1 ile kenar payı tek pikseldir).
+#
+# Kullanım:
+#   python benchmarks/zone_analytics_benchmark.py
+#   python benchmarks/zone_analytics_benchmark.py --tracks 100 500 --zones 12 48 --cell-size 1
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from detections import Detections
+from zone_analytics import ZoneAnalyzer
+
+FRAME_WIDTH, FRAME_HEIGHT = 1920, 1080
+FPS = 25.0
+
+
+def random_walk_frames(num_frames, num_tracks, seed=0):
+    """
+    Kare boyunca yavaş yürüyen izler; her karede izlerin ~%5'i görünmez olur.
+    """
+    rng = np.random.default_rng(seed)
+    positions = rng.uniform([0, 0], [FRAME_WIDTH, FRAME_HEIGHT], size=(num_tracks, 2))
+    velocities = rng.uniform(-4, 4, size=(num_tracks, 2))
+    frames = []
+    for _ in range(num_frames):
+        positions = np.clip(positions + velocities + rng.normal(0, 1, size=positions.shape),
+                            0, [FRAME_WIDTH - 1, FRAME_HEIGHT - 1])
+        visible = rng.random(num_tracks) > 0.05
+        centers = positions[visible].astype(np.int32)
+        frames.append(Detections(np.flatnonzero(visible) + 1, np.concatenate([centers - 20, centers + 20], axis=1),
+                                 centers))
+    return frames
+
+
+def random_zones(count, seed=1):
+    """
+    Rastgele konum ve boyutta, birbiriyle örtüşebilen dörtgen bölgeler (kare boyutunun kesri).
+    """
+    rng = np.random.default_rng(seed)
+    zones = []
+    for _ in range(count):
+        center = rng.uniform(0.15, 0.85, size=2)
+        radius = rng.uniform(0.05, 0.15, size=2)
+        angles = np.sort(rng.uniform(0, 2 * np.pi, 4))
+        zones.append(np.clip(center + radius * np.stack([np.cos(angles), np.sin(angles)], axis=1), 0, 1))
+    return zones
+
+
+def polygon_test_agreement(analyzer, frames):
+    """
+    Maske üyeliğinin cv2.pointPolygonTest (kenar dahil) ile aynı olduğu (nokta, bölge) çiftlerinin oranı.
+    """
+    matches, total = 0, 0
+    for detections in frames:
+        masked = analyzer.memberships(detections.centers)
+        for zone_id, points in enumerate(analyzer._pixel_points):
+            contour = points.reshape(-1, 1, 2)
+            reference = np.array([cv2.pointPolygonTest(contour, (float(x), float(y)), False) >= 0
+                                  for x, y in detections.centers.tolist()], dtype=bool)
+            matches += int((masked[:, zone_id] == reference).sum())
+            total += len(reference)
+    return matches / total if total else 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bölge doluluk/kalış süresi analizinin iz/bölge sayısına göre süresi.")
+    parser.add_argument("--tracks", type=int, nargs='+', default=[50, 200, 500])
+    parser.add_argument("--zones", type=int, nargs='+', default=[1, 12, 48])
+    parser.add_argument("--frames", type=int, default=500)
+    parser.add_argument("--cell-size", type=int, default=4, help="Etiket maskesinin hücre boyutu (piksel)")
+    args = parser.parse_args()
+
+    frame_shape = (FRAME_HEIGHT, FRAME_WIDTH, 3)
+    check_frames = random_walk_frames(20, max(args.tracks))
+    analyzer = ZoneAnalyzer(frame_shape, random_zones(max(args.zones)), cell_size=args.cell_size)
+    print(f"pointPolygonTest ile uyum: %{polygon_test_agreement(analyzer, check_frames) * 100:.2f} "
+          f"(cell_size={args.cell_size})\n")
+
+    print(f"{'İz':>6}{'Bölge':>7}{'update (µs/kare)':>19}{'Ziyaret':>9}{'Ort. kalış (s)':>16}")
+    for num_tracks in args.tracks:
+        frames = random_walk_frames(args.frames, num_tracks)
+        for num_zones in args.zones:
+            analyzer = ZoneAnalyzer(frame_shape, random_zones(num_zones), cell_size=args.cell_size)
+            start = time.perf_counter()
+            for frame_index, detections in enumerate(frames):
+                analyzer.update(detections, timestamp=frame_index / FPS)
+            elapsed = time.perf_counter() - start
+            analyzer.close_open_visits()
+            stats = analyzer.zone_stats()
+            visits = sum(zone['visits'] for zone in stats)
+            mean_dwell = sum(zone['mean_dwell'] * zone['visits'] for zone in stats) / visits if visits else 0.0
+            print(f"{num_tracks:>6}{num_zones:>7}{elapsed / len(frames) * 1e6:>19.1f}{visits:>9}{mean_dwell:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,436 @@
+import argparse
+import json
+import sys
+import time
+
+import cv2
+from video_stream_manager import VideoStreamManager
+from person_detect_and_tracking_engine import PersonTrackingEngine
+from density_map_generator import DensityMapGenerator
+from entry_exit_counter import CountingLine, EntryExitCounter
+from report_generator import ReportGenerator
+from data_manager import DataManager
+from detection_cache import DetectionCache
+from region_of_interest import RegionOfInterest
+from adaptive_image_size import AdaptiveImageSize
+from motion_gate import MotionGate
+from zone_analytics import ZoneAnalyzer
+from inference_backends import BACKEND_TORCH, BACKENDS
+from logger_config import logger
+from profiler import profiler
+
+# Özet tablosunda raporlanan aşamalar (sırasıyla). 'setup': akışın açılması, modelin yüklenip ısıtılması
+# (gerekirse ONNX/OpenVINO dışa aktarımı) ve ilk karenin okunması; kare döngüsü FPS'ine katılmaz.
+STAGES = ('setup', 'decode', 'inference', 'counting', 'heatmap', 'io')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Videoları arayüz açmadan (başsız) analiz eder; sonuçları veritabanına ve rapor klasörüne yazar."
+    )
+    parser.add_argument("sources", nargs='+', help="Video dosyaları, kamera indeksleri veya akış URL'leri")
+
+    line_group = parser.add_mutually_exclusive_group()
+    line_group.add_argument("--line-y", type=int, default=None, help="Giriş/çıkış çizgisinin Y konumu (piksel)")
+    line_group.add_argument("--line-percent", type=float, default=50,
+                            help="Giriş/çıkış çizgisinin Y konumu (kare yüksekliğinin yüzdesi, varsayılan 50)")
+    parser.add_argument("--line", action='append', default=None, metavar="NOKTALAR",
+                        help="Yatay çizgiye ek sayım çizgisi; piksel köşeleri 'x1,y1 x2,y2 ...' (kırık çizgi olabilir, "
+                             "birden fazla verilebilir). Çiziliş yönünün solundan sağına geçiş giriş sayılır")
+
+    parser.add_argument("--zone", action='append', default=None, metavar="ÇOKGEN",
+                        help="Doluluk ve kalış süresi raporlanacak bölge (kuyruk alanı vb.); köşeler kare boyutunun "
+                             "kesri: 'x1,y1 x2,y2 x3,y3' (birden fazla verilebilir)")
+    parser.add_argument("--model", default="Model/yolov8m.pt", help="YOLO model dosyası")
+    parser.add_argument("--backend", default=BACKEND_TORCH, choices=BACKENDS,
+                        help="Çıkarım arka ucu (onnx/onnx_int8/openvino: model ilk kullanımda dışa aktarılır)")
+    parser.add_argument("--threads", type=int, default=None, help="Çıkarım thread sayısı (varsayılan: arka uca göre)")
+    parser.add_argument("--roi", action='append', default=None, metavar="ÇOKGEN",
+                        help="Tespitin yapılacağı bölge; köşeler kare boyutunun kesri: 'x1,y1 x2,y2 x3,y3' "
+                             "(birden fazla verilebilir)")
+    parser.add_argument("--roi-band", type=float, default=None, metavar="YÜZDE",
+                        help="Sayım çizgisinin altında ve üstünde kare yüksekliğinin bu yüzdesi kadar şeritte tespit yap")
+    parser.add_argument("--no-roi-mask", action='store_true',
+                        help="ROI kesitinde çokgenlerin dışında kalan pikselleri maskeleme (yalnızca kırp)")
+    parser.add_argument("--adaptive-imgsz", action='store_true',
+                        help="Model giriş çözünürlüğünü kişi sayısına göre ayarla (boş sahnede 320, kalabalıkta 640)")
+    parser.add_argument("--motion-gate", action='store_true',
+                        help="Sahnede hareket yoksa inference'ı atla ve son takip sonuçlarını kullan")
+    parser.add_argument("--motion-max-skip", type=int, default=30,
+                        help="Hareket olmasa da en geç kaç karede bir inference yapılacağı (0: sınırsız)")
+    parser.add_argument("--detect-interval", type=int, default=1, help="Tam tespitin kaç karede bir yapılacağı")
+    parser.add_argument("--batch-size", type=int, default=1, help="Tek ileri geçişte işlenecek kare sayısı")
+    parser.add_argument("--buffer-size", type=int, default=8, help="Kare ön yükleme tamponu (0: ön yükleme kapalı)")
+    parser.add_argument("--max-frames", type=int, default=None, help="Kaynak başına en fazla işlenecek kare")
+
+    parser.add_argument("--heatmap-blur", type=int, default=61, help="Isı haritası bulanıklık çekirdeği (tek sayı)")
+    parser.add_argument("--heatmap-percentile", type=int, default=98, help="Isı haritası kontrast yüzdeliği")
+    parser.add_argument("--heatmap-cell-size", type=int, default=4, help="Isı haritası ızgara hücre boyutu (piksel)")
+    parser.add_argument("--heatmap-mode", default=DensityMapGenerator.MODE_CUMULATIVE,
+                        choices=(DensityMapGenerator.MODE_CUMULATIVE, DensityMapGenerator.MODE_WINDOW,
+                                 DensityMapGenerator.MODE_DECAY))
+    parser.add_argument("--heatmap-window", type=float, default=15 * 60, help="'window' modunda pencere (saniye)")
+    parser.add_argument("--heatmap-half-life", type=float, default=5 * 60, help="'decay' modunda yarı ömür (saniye)")
+
+    parser.add_argument("--report-folder", default="reports", help="JSON/CSV/PNG raporlarının klasörü")
+    parser.add_argument("--db-folder", default="database", help="Veritabanı klasörü")
+    parser.add_argument("--no-report", action='store_true', help="Rapor dosyası oluşturma")
+    parser.add_argument("--no-db", action='store_true', help="Olayları veritabanına yazma")
+    parser.add_argument("--detection-cache", default=None, metavar="KLASÖR",
+                        help="Tespit önbelleği klasörü; aynı video/model/tespit aralığı tekrar analiz edilirse "
+                             "tespitler YOLO çalıştırılmadan önbellekten okunur")
+    parser.add_argument("--cache-size-mb", type=int, default=2048, help="Tespit önbelleğinin en fazla boyutu (MB)")
+    parser.add_argument("--summary-json", default=None, help="İşlem özetinin (kare, fps, aşama süreleri) yazılacağı dosya")
+    parser.add_argument("--profile", action='store_true',
+                        help="Aşama sürelerinin p50/p95/p99 dağılımını ölç (model.track, results.plot, db_write dahil)")
+    parser.add_argument("--metrics-file", default=None,
+                        help="Prometheus metin formatındaki metriklerin düzenli yazılacağı dosya (--profile'ı açar)")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="Metriklerin /metrics adresinde sunulacağı HTTP portu (--profile'ı açar)")
+    return parser
+
+
+def parse_source(source):
+    return int(source) if source.isdigit() else source
+
+
+def build_roi(args):
+    """
+    --roi ve --roi-band ayarlarından RegionOfInterest oluşturur. Bölge verilmemişse None.
+    """
+    polygons = [RegionOfInterest.parse_polygon(text) for text in args.roi or []]
+    if args.roi_band is not None:
+        polygons.extend(RegionOfInterest.band(args.line_percent / 100, args.roi_band / 100).polygons)
+    if not polygons:
+        return None
+    return RegionOfInterest(polygons, mask_outside=not args.no_roi_mask)
+
+
+def build_lines(args):
+    """
+    --line ayarlarından ek sayım çizgilerini oluşturur (line_id 1'den başlar; 0 yatay çizgidir).
+    """
+    return [CountingLine.parse(text) for text in args.line or []]
+
+
+def analyze_source(source, args, db_manager=None, report_generator=None, detection_cache=None, roi=None, lines=None,
+                   zones=None):
+    """
+    Tek bir kaynağı başsız olarak analiz eder ve aşama bazlı süreleri ölçer.
+    detection_cache verilirse ve video daha önce aynı ayarlarla işlenmişse tespitler önbellekten
+    oynatılır (kare çözme ve inference yapılmaz); değilse ilk tam geçişin tespitleri önbelleğe yazılır.
+    roi verilirse tespit yalnızca bölge içinde yapılır; lines yatay çizgiye ek sayım çizgileridir.
+    zones verilirse bölge başına doluluk ve kalış süresi hesaplanır.
+
+    Returns:
+        dict | None: Kare sayısı, toplam süre, kare döngüsü süresi ve fps'i (kurulum hariç), giriş/çıkış
+            sayıları (toplam ve çizgi başına), bölge istatistikleri ve aşama süreleri (saniye).
+            Kaynak açılamazsa None.
+    """
+    stage_seconds = dict.fromkeys(STAGES, 0.0)
+    start_time = time.perf_counter()
+    # Uyarlanır çözünürlük durum tuttuğu için her kaynak kendi nesnesiyle başlar
+    adaptive_imgsz = AdaptiveImageSize() if args.adaptive_imgsz else None
+    motion_gate = MotionGate(max_skip_frames=args.motion_max_skip) if args.motion_gate else None
+
+    cache_key = None
+    cached_detections = None
+    if detection_cache is not None and not VideoStreamManager.is_live_source(source):
+        stage_start = time.perf_counter()
+        cache_key = detection_cache.make_key(source, args.model,
+                                             **PersonTrackingEngine.output_config(args.detect_interval, args.backend,
+                                                                                  roi, adaptive_imgsz,
+                                                                                  motion_gate))
+        cached_detections = detection_cache.load(cache_key)
+        stage_seconds['io'] += time.perf_counter() - stage_start
+
+    # Önbellekten oynatmada yalnızca ilk kare (rapor arka planı ve boyut için) okunur
+    setup_start = time.perf_counter()
+    stream_manager = VideoStreamManager(source=source, prefetch=args.buffer_size > 0 and cached_detections is None,
+                                        buffer_size=max(1, args.buffer_size))
+    if not stream_manager.start_stream():
+        return None
+
+    tracking_engine = None
+    if cached_detections is None:
+        tracking_engine = PersonTrackingEngine(model_path=args.model, batch_size=args.batch_size,
+                                               detect_interval=args.detect_interval, render=False,
+                                               backend=args.backend, num_threads=args.threads,
+                                               roi=roi, adaptive_imgsz=adaptive_imgsz,
+                                               motion_gate=motion_gate)
+    ret, first_frame = stream_manager.get_frame()
+    if not ret:
+        logger.error(f"İlk kare okunamadı: {source}")
+        stream_manager.stop_stream()
+        if tracking_engine is not None:
+            tracking_engine.close()
+        return None
+
+    line_y = args.line_y if args.line_y is not None else int(first_frame.shape[0] * args.line_percent / 100)
+    counter = EntryExitCounter(line_y_position=line_y, lines=lines)
+    zone_analyzer = ZoneAnalyzer(first_frame.shape, zones) if zones else None
+    density_generator = DensityMapGenerator(
+        frame_shape=first_frame.shape,
+        blur_kernel_size=args.heatmap_blur,
+        clipping_percentile=args.heatmap_percentile,
+        cell_size=args.heatmap_cell_size,
+        mode=args.heatmap_mode,
+        window_seconds=args.heatmap_window,
+        half_life_seconds=args.heatmap_half_life
+    )
+    video_fps = stream_manager.cap.get(cv2.CAP_PROP_FPS)
+    if VideoStreamManager.is_live_source(source):
+        video_fps = 0
+    recorder = None
+    if cache_key is not None and cached_detections is None:
+        recorder = detection_cache.recorder(cache_key, frame_shape=first_frame.shape, fps=video_fps)
+    stage_seconds['setup'] += time.perf_counter() - setup_start
+
+    session_id = None
+    if db_manager is not None:
+        stage_start = time.perf_counter()
+        session_id = db_manager.create_new_session(video_name=str(source))
+        stage_seconds['io'] += time.perf_counter() - stage_start
+
+    # Verim (FPS) yalnızca kare döngüsünden hesaplanır; model yükleme ve ısıtma 'setup' aşamasındadır
+    loop_start = time.perf_counter()
+
+    frame_count = 0
+
+    def handle_detections(detections):
+        nonlocal frame_count
+        frame_count += 1
+
+        # 3. Giriş/çıkış sayımı
+        stage_start = time.perf_counter()
+        new_events = counter.update(detections)
+        elapsed_stage = time.perf_counter() - stage_start
+        stage_seconds['counting'] += elapsed_stage
+        profiler.record('counter_update', elapsed_stage)
+
+        video_time = frame_count / video_fps if video_fps > 0 else None
+        if zone_analyzer is not None:
+            stage_start = time.perf_counter()
+            zone_analyzer.update(detections, timestamp=video_time)
+            elapsed_stage = time.perf_counter() - stage_start
+            stage_seconds['counting'] += elapsed_stage
+            profiler.record('zone_update', elapsed_stage)
+
+        # 4. Yoğunluk haritası
+        stage_start = time.perf_counter()
+        density_generator.add_points(detections.centers, timestamp=video_time)
+        elapsed_stage = time.perf_counter() - stage_start
+        stage_seconds['heatmap'] += elapsed_stage
+        profiler.record('heatmap_add', elapsed_stage)
+
+        # 5. Veritabanı (tamponlu yazıcıya yalnızca kuyruklama)
+        if new_events and db_manager is not None:
+            stage_start = time.perf_counter()
+            for event, line_id in zip(new_events, counter.last_event_line_ids):
+                db_manager.log_event(session_id, event, line_id=line_id)
+            stage_seconds['io'] += time.perf_counter() - stage_start
+
+    if cached_detections is not None:
+        # Önbellekten oynatma: kare çözme ve inference aşamaları atlanır (akış çıkışta bir kez durdurulur)
+        frame_limit = len(cached_detections)
+        if args.max_frames is not None:
+            frame_limit = min(frame_limit, args.max_frames)
+        for frame_index in range(frame_limit):
+            handle_detections(cached_detections[frame_index])
+
+    # İlk kare de analiz edilir; akış baştan açılmaz
+    pending_frames = [first_frame] if cached_detections is None else []
+    stream_finished = cached_detections is not None
+    reached_end = False
+    while not stream_finished or pending_frames:
+        # 1. Kare çözme: batch dolana kadar kare topla (ön yükleme açıksa yalnızca bekleme süresi ölçülür).
+        # Profil örneği app.py ve main.py'deki gibi kare başına (get_frame çağrısı başına) kaydedilir.
+        while not stream_finished and len(pending_frames) < args.batch_size:
+            if args.max_frames is not None and frame_count + len(pending_frames) >= args.max_frames:
+                stream_finished = True
+                break
+            stage_start = time.perf_counter()
+            ret, frame = stream_manager.get_frame()
+            elapsed_stage = time.perf_counter() - stage_start
+            stage_seconds['decode'] += elapsed_stage
+            profiler.record('decode', elapsed_stage)
+            if not ret:
+                stream_finished = True
+                reached_end = True
+                break
+            pending_frames.append(frame)
+        if args.max_frames is not None:
+            pending_frames = pending_frames[:max(0, args.max_frames - frame_count)]
+        if not pending_frames:
+            break
+
+        # 2. Tespit ve takip
+        stage_start = time.perf_counter()
+        if len(pending_frames) == 1:
+            outputs = [tracking_engine.process_frame(pending_frames[0])]
+        else:
+            outputs = tracking_engine.process_batch(pending_frames)
+        stage_seconds['inference'] += time.perf_counter() - stage_start
+
+        for _, _, detections in outputs:
+            if recorder is not None:
+                recorder.append(detections)
+            handle_detections(detections)
+        pending_frames = []
+    loop_seconds = time.perf_counter() - loop_start
+
+    decode_stats = stream_manager.get_stats()
+    stream_manager.stop_stream()
+    if tracking_engine is not None:
+        # Model kayıtta kalır; sonraki kaynak modeli yeniden yüklemeden kullanır
+        tracking_engine.close()
+
+    # Yalnızca video sonuna kadar işlenmiş kayıtlar önbelleğe yazılır (--max-frames ile kesilenler değil)
+    if recorder is not None and reached_end:
+        stage_start = time.perf_counter()
+        recorder.finish()
+        stage_seconds['io'] += time.perf_counter() - stage_start
+
+    zone_stats = None
+    if zone_analyzer is not None:
+        # Video sonunda bölgede kalanların ziyaretleri de kalış süresi dağılımına katılır
+        zone_analyzer.close_open_visits()
+        zone_stats = zone_analyzer.zone_stats()
+
+    # Sonuç haritası ve raporlar
+    stage_start = time.perf_counter()
+    final_heatmap_image = density_generator.generate_heatmap_image()
+    stage_seconds['heatmap'] += time.perf_counter() - stage_start
+
+    stage_start = time.perf_counter()
+    if db_manager is not None:
+        db_manager.flush()
+    if report_generator is not None:
+        final_result_image = cv2.addWeighted(first_frame, 0.2, final_heatmap_image, 0.8, 0)
+        report_generator.generate_summary_report(
+            total_entries=counter.entries, total_exits=counter.exits,
+            entry_logs=counter.entry_logs, exit_logs=counter.exit_logs,
+            heatmap_image=final_result_image
+        )
+    stage_seconds['io'] += time.perf_counter() - stage_start
+
+    elapsed = time.perf_counter() - start_time
+    return {
+        'source': str(source),
+        'session_id': session_id,
+        'frames': frame_count,
+        'seconds': elapsed,
+        'loop_seconds': loop_seconds,
+        'fps': frame_count / loop_seconds if loop_seconds > 0 else 0.0,
+        'entries': counter.entries,
+        'exits': counter.exits,
+        'lines': counter.line_counts(),
+        'zones': zone_stats,
+        'stage_seconds': stage_seconds,
+        'prefetch': stream_manager.prefetch,
+        'from_cache': cached_detections is not None,
+        'motion_gate': motion_gate.stats() if motion_gate is not None else None,
+        'background_decode_ms': decode_stats['avg_decode_ms'],
+    }
+
+
+def print_summary(summary):
+    frames = max(1, summary['frames'])
+    print(f"\n--- İşlem Özeti: {summary['source']} ---")
+    print(f"Kare: {summary['frames']}  Süre: {summary['seconds']:.2f} s "
+          f"(kurulum {summary['stage_seconds']['setup']:.2f} s)  FPS (kare döngüsü): {summary['fps']:.1f}")
+    print(f"Giriş: {summary['entries']}  Çıkış: {summary['exits']}")
+    if len(summary['lines']) > 1:
+        for line in summary['lines']:
+            print(f"  {line['name']}: giriş {line['entries']}, çıkış {line['exits']}")
+    for zone in summary['zones'] or []:
+        print(f"  {zone['name']}: {zone['visits']} ziyaret, kalış ort. {zone['mean_dwell']:.1f} s, "
+              f"p50 {zone['p50_dwell']:.1f} s, p90 {zone['p90_dwell']:.1f} s, en fazla {zone['max_dwell']:.1f} s")
+    print(f"{'Aşama':<12}{'Toplam (s)':>12}{'Kare başına (ms)':>18}{'Pay (%)':>10}")
+    for stage in STAGES:
+        seconds = summary['stage_seconds'][stage]
+        share = seconds / summary['seconds'] * 100 if summary['seconds'] > 0 else 0.0
+        print(f"{stage:<12}{seconds:>12.3f}{seconds / frames * 1000:>18.2f}{share:>10.1f}")
+    if summary['motion_gate'] and summary['motion_gate']['frames']:
+        gate_stats = summary['motion_gate']
+        print(f"Hareket kapısı: {gate_stats['skipped']}/{gate_stats['frames']} tespit karesinde inference atlandı "
+              f"(%{gate_stats['skip_ratio'] * 100:.1f})")
+    if summary['from_cache']:
+        print("(Tespitler önbellekten okundu; kare çözme ve inference yapılmadı.)")
+    elif summary['prefetch']:
+        # Ön yüklemede 'decode' yalnızca tamponu bekleme süresidir; asıl çözme arka planda paralel yürür
+        print(f"(Arka plan kare çözme ortalaması: {summary['background_decode_ms']:.2f} ms/kare)")
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.roi_band is not None and args.line_y is not None:
+        parser.error("--roi-band, çizgi konumu --line-percent ile verildiğinde kullanılabilir")
+    try:
+        roi = build_roi(args)
+        lines = build_lines(args)
+        zones = [RegionOfInterest.parse_polygon(text) for text in args.zone or []]
+        if zones:
+            ZoneAnalyzer.validate_zones(zones)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.roi_band is not None and lines:
+        logger.warning("--roi-band yalnızca yatay çizginin çevresini kapsar; --line ile verilen çizgiler şeridin "
+                       "dışındaysa bu çizgilerdeki geçişler tespit edilmez (--roi ile bölge ekleyin).")
+
+    if args.profile or args.metrics_file or args.metrics_port is not None:
+        profiler.enable()
+        if args.metrics_file:
+            profiler.start_file_exporter(args.metrics_file)
+        if args.metrics_port is not None:
+            profiler.start_metrics_server(args.metrics_port)
+
+    db_manager = None if args.no_db else DataManager(db_folder=args.db_folder, buffered=True)
+    report_generator = None if args.no_report else ReportGenerator(report_folder=args.report_folder)
+    detection_cache = None
+    if args.detection_cache:
+        detection_cache = DetectionCache(cache_folder=args.detection_cache, max_bytes=args.cache_size_mb * 1024 * 1024)
+
+    summaries = []
+    failed_sources = []
+    try:
+        for source in args.sources:
+            summary = analyze_source(parse_source(source), args, db_manager, report_generator, detection_cache, roi, lines, zones)
+            if summary is None:
+                failed_sources.append(source)
+                continue
+            print_summary(summary)
+            summaries.append(summary)
+    finally:
+        if db_manager is not None:
+            db_manager.close_connection()
+        if profiler.enabled:
+            profiler.stop_exporters()
+            if args.metrics_file:
+                profiler.write_metrics_file(args.metrics_file)
+
+    if len(summaries) > 1:
+        total_frames = sum(summary['frames'] for summary in summaries)
+        total_seconds = sum(summary['loop_seconds'] for summary in summaries)
+        print(f"\nToplam: {len(summaries)} kaynak, {total_frames} kare, {total_frames / total_seconds:.1f} FPS")
+
+    if profiler.enabled:
+        print("\n--- Aşama Süre Dağılımı (ms) ---")
+        print(profiler.format_summary())
+
+    if args.summary_json:
+        with open(args.summary_json, 'w', encoding='utf-8') as f:
+            result = {'sources': summaries, 'failed': failed_sources}
+            if profiler.enabled:
+                result['profile'] = profiler.snapshot()
+            json.dump(result, f, ensure_ascii=False, indent=4)
+
+    if failed_sources:
+        logger.error(f"Açılamayan kaynaklar: {failed_sources}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
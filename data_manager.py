@@ -1,7 +1,12 @@
+import atexit
+import queue
 import sqlite3
+import threading
+import time
 from datetime import datetime
 import os
 from logger_config import logger
+from profiler import profiler
 
 
 class DataManager:
@@ -10,14 +15,37 @@ class DataManager:
     Bağlantı kurma, tablo oluşturma, veri ekleme ve çekme işlemlerini yapar.
     """
 
-    def __init__(self, db_folder='database', db_name='analysis_history.db'):
+    SCHEMA_VERSION = 3
+
+    # Özet (rollup) tablolarının zaman çözünürlükleri. Dakika ve saat kovaları epoch'a göre,
+    # gün kovaları yerel gece yarısına göre hizalanır.
+    ROLLUP_MINUTE = 'minute'
+    ROLLUP_HOUR = 'hour'
+    ROLLUP_DAY = 'day'
+    ROLLUP_BUCKET_MS = {ROLLUP_MINUTE: 60_000, ROLLUP_HOUR: 3_600_000}
+    ROLLUP_GRANULARITIES = (ROLLUP_MINUTE, ROLLUP_HOUR, ROLLUP_DAY)
+
+    def __init__(self, db_folder='database', db_name='analysis_history.db', buffered=False,
+                 flush_every_n=100, flush_interval_ms=500):
         """
         Veritabanı bağlantısını kurar ve gerekirse tabloları oluşturur.
 
         Args:
             db_folder (str): Veritabanı dosyasının bulunacağı klasör.
             db_name (str): Veritabanı dosyasının adı.
+            buffered (bool): True ise log_event olayları yalnızca kuyruğa ekler; arka plan
+                thread'i bunları flush_every_n olayda bir veya flush_interval_ms milisaniyede bir
+                tek bir transaction içinde yazar. Böylece kare döngüsü disk senkronizasyonunu beklemez.
+            flush_every_n (int): Tampon bu kadar olaya ulaşınca hemen yazılır.
+            flush_interval_ms (int): Kuyruktaki ilk olaydan en geç bu kadar sonra yazılır.
         """
+        self._lock = threading.RLock()
+        self.buffered = buffered
+        self.flush_every_n = max(1, int(flush_every_n))
+        self.flush_interval = flush_interval_ms / 1000.0
+        self._event_queue = None
+        self._writer_thread = None
+
         # Veritabanı klasörünün var olduğundan emin ol
         if not os.path.exists(db_folder):
             os.makedirs(db_folder)
@@ -28,84 +56,211 @@ class DataManager:
             # Veritabanına bağlan (eğer dosya yoksa oluşturulur)
             self.conn = sqlite3.connect(db_path, check_same_thread=False)
             self.cursor = self.conn.cursor()
+            # WAL modu: okuyucular yazıcıyı beklemez, commit başına fsync maliyeti azalır
+            self.cursor.execute("PRAGMA journal_mode=WAL")
+            self.cursor.execute("PRAGMA synchronous=NORMAL")
             print(f"Veritabanı bağlantısı başarılı: {db_path}")
             self._setup_tables()
         except sqlite3.Error as e:
             print(f"Veritabanı hatası: {e}")
             self.conn = None
 
+        if self.conn and self.buffered:
+            self._event_queue = queue.Queue()
+            self._writer_thread = threading.Thread(target=self._writer_loop, name="DataManagerWriter", daemon=True)
+            self._writer_thread.start()
+            # Süreç kapanırken kuyrukta olay kalmaması için
+            atexit.register(self.close_connection)
+
     def _setup_tables(self):
         """
-        Gerekli tabloları veritabanında oluşturur (eğer mevcut değillerse).
+        Gerekli tabloları veritabanında oluşturur (eğer mevcut değillerse) ve eski
+        şemadaki veritabanlarını güncel şemaya taşır (migration).
         - sessions: Her bir video analizini tekil bir oturum olarak kaydeder.
-        - events: Her bir giriş/çıkış olayını kaydeder ve bir oturuma bağlar.
+        - events: Her bir giriş/çıkış olayını kaydeder ve bir oturuma ve sayım çizgisine bağlar.
+        - event_rollups: Olayların oturum ve çizgi başına dakika/saat/gün kovalarındaki toplamları.
+
+        Şema sürümü PRAGMA user_version içinde tutulur:
+        - 1: İlk şema (zaman damgaları biçimlendirilmiş TEXT, indeks yok).
+        - 2: Zaman damgaları epoch milisaniye (INTEGER); (session_id, timestamp) ve
+             (start_time) üzerinde bileşik indeksler.
+        - 3: events.line_id sütunu ve artımlı güncellenen event_rollups tablosu.
         """
         if not self.conn:
             return
 
         try:
-            # Analiz oturumlarını tutan tablo
-            self.cursor.execute('''
-                                CREATE TABLE IF NOT EXISTS sessions
-                                (
-                                    session_id
-                                    INTEGER
-                                    PRIMARY
-                                    KEY
-                                    AUTOINCREMENT,
-                                    start_time
-                                    TEXT
-                                    NOT
-                                    NULL,
-                                    video_name
-                                    TEXT,
-                                    total_entries
-                                    INTEGER
-                                    DEFAULT
-                                    0,
-                                    total_exits
-                                    INTEGER
-                                    DEFAULT
-                                    0
-                                )
-                                ''')
-
-            # Her bir giriş/çıkış olayını tutan tablo
-            self.cursor.execute('''
-                                CREATE TABLE IF NOT EXISTS events
-                                (
-                                    event_id
-                                    INTEGER
-                                    PRIMARY
-                                    KEY
-                                    AUTOINCREMENT,
-                                    session_id
-                                    INTEGER
-                                    NOT
-                                    NULL,
-                                    timestamp
-                                    TEXT
-                                    NOT
-                                    NULL,
-                                    event_type
-                                    TEXT
-                                    NOT
-                                    NULL,
-                                    FOREIGN
-                                    KEY
-                                (
-                                    session_id
-                                ) REFERENCES sessions
-                                (
-                                    session_id
-                                )
-                                    )
-                                ''')
+            version = self.cursor.execute("PRAGMA user_version").fetchone()[0]
+            has_tables = self.cursor.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = 'sessions'"
+            ).fetchone()[0] > 0
+            if has_tables and version < 1:
+                version = 1
+
+            if version == 1:
+                self._migrate_to_v2()
+                version = 2
+            if version == 2:
+                self._migrate_to_v3()
+
+            # Analiz oturumlarını tutan tablo (start_time: epoch milisaniye)
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    session_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    start_time INTEGER NOT NULL,
+                    video_name TEXT,
+                    total_entries INTEGER DEFAULT 0,
+                    total_exits INTEGER DEFAULT 0
+                )
+            """)
+
+            # Her bir giriş/çıkış olayını tutan tablo (timestamp: epoch milisaniye)
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS events (
+                    event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id INTEGER NOT NULL,
+                    timestamp INTEGER NOT NULL,
+                    event_type TEXT NOT NULL,
+                    line_id INTEGER NOT NULL DEFAULT 0,
+                    FOREIGN KEY (session_id) REFERENCES sessions (session_id)
+                )
+            """)
+            self._create_rollup_table()
+
+            # Oturum olaylarını zaman sırasıyla tarama ve keyset sayfalama için bileşik indeksler.
+            # event_type da indekste tutulur; böylece geçmiş sorguları tabloya hiç dokunmaz (covering index).
+            self.cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_events_session_time ON events (session_id, timestamp, event_id, event_type)")
+            self.cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_sessions_start_time ON sessions (start_time, session_id)")
+
+            self.cursor.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
             self.conn.commit()
             print("Tablolar başarıyla kuruldu veya zaten mevcut.")
         except sqlite3.Error as e:
+            self.conn.rollback()
             print(f"Tablo oluşturma hatası: {e}")
 
+    def _migrate_to_v2(self):
+        """
+        Sürüm 1 şemasını sürüm 2'ye taşır: TEXT zaman damgaları ('%Y-%m-%d %H:%M:%S', yerel saat)
+        epoch milisaniyeye çevrilir. SQLite sütun tipi değiştirmeyi desteklemediği için tablolar
+        yeniden oluşturulur; ID'ler korunur.
+        """
+        print("Veritabanı şeması güncelleniyor (sürüm 1 -> 2)...")
+        # Taşıma yarıda kalırsa eski tablolar bozulmasın diye tüm adımlar tek transaction içinde
+        if not self.conn.in_transaction:
+            self.cursor.execute("BEGIN")
+        self.cursor.execute("ALTER TABLE sessions RENAME TO sessions_v1")
+        self.cursor.execute("ALTER TABLE events RENAME TO events_v1")
+        self.cursor.execute("""
+            CREATE TABLE sessions (
+                session_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                start_time INTEGER NOT NULL,
+                video_name TEXT,
+                total_entries INTEGER DEFAULT 0,
+                total_exits INTEGER DEFAULT 0
+            )
+        """)
+        self.cursor.execute("""
+            CREATE TABLE events (
+                event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id INTEGER NOT NULL,
+                timestamp INTEGER NOT NULL,
+                event_type TEXT NOT NULL,
+                FOREIGN KEY (session_id) REFERENCES sessions (session_id)
+            )
+        """)
+        # 'utc' değiştiricisi metni yerel saat kabul edip UTC'ye çevirir
+        self.cursor.execute("""
+            INSERT INTO sessions (session_id, start_time, video_name, total_entries, total_exits)
+            SELECT session_id, CAST(strftime('%s', start_time, 'utc') AS INTEGER) * 1000,
+                   video_name, total_entries, total_exits
+            FROM sessions_v1
+        """)
+        self.cursor.execute("""
+            INSERT INTO events (event_id, session_id, timestamp, event_type)
+            SELECT event_id, session_id, CAST(strftime('%s', timestamp, 'utc') AS INTEGER) * 1000, event_type
+            FROM events_v1
+        """)
+        self.cursor.execute("DROP TABLE events_v1")
+        self.cursor.execute("DROP TABLE sessions_v1")
+
+    def _migrate_to_v3(self):
+        """
+        Sürüm 2 şemasını sürüm 3'e taşır: olaylara line_id sütunu eklenir (mevcut olaylar 0 numaralı
+        çizgiye yazılır) ve özet tablosu mevcut olaylardan bir kez doldurulur.
+        """
+        print("Veritabanı şeması güncelleniyor (sürüm 2 -> 3)...")
+        if not self.conn.in_transaction:
+            self.cursor.execute("BEGIN")
+        self.cursor.execute("ALTER TABLE events ADD COLUMN line_id INTEGER NOT NULL DEFAULT 0")
+        self._create_rollup_table()
+        self._backfill_rollups()
+
+    def _create_rollup_table(self):
+        """
+        Özet tablosunu ve zaman aralığı sorguları için indeksini oluşturur.
+        Birincil anahtar oturum bazlı, indeks tüm oturumları kapsayan aralık sorgularına hizmet eder.
+        """
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS event_rollups (
+                granularity TEXT NOT NULL,
+                session_id INTEGER NOT NULL,
+                bucket_start INTEGER NOT NULL,
+                line_id INTEGER NOT NULL,
+                entries INTEGER NOT NULL DEFAULT 0,
+                exits INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (granularity, session_id, bucket_start, line_id)
+            ) WITHOUT ROWID
+        """)
+        self.cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_rollups_time ON event_rollups "
+            "(granularity, bucket_start, session_id, line_id, entries, exits)")
+
+    def _backfill_rollups(self):
+        """
+        Özet tablosunu events tablosundan baştan hesaplar (yalnızca şema taşımada kullanılır).
+        """
+        self.cursor.execute("DELETE FROM event_rollups")
+        bucket_expressions = {
+            self.ROLLUP_MINUTE: "timestamp - timestamp % 60000",
+            self.ROLLUP_HOUR: "timestamp - timestamp % 3600000",
+            # Yerel günün başlangıcı, _bucket_start ile aynı hizalama
+            self.ROLLUP_DAY: "CAST(strftime('%s', timestamp / 1000, 'unixepoch', 'localtime', 'start of day', 'utc') "
+                             "AS INTEGER) * 1000",
+        }
+        for granularity, bucket_expression in bucket_expressions.items():
+            self.cursor.execute(f"""
+                INSERT INTO event_rollups (granularity, session_id, bucket_start, line_id, entries, exits)
+                SELECT ?, session_id, {bucket_expression} AS bucket, line_id,
+                       SUM(event_type = 'Giriş'), SUM(event_type = 'Çıkış')
+                FROM events
+                GROUP BY session_id, bucket, line_id
+            """, (granularity,))
+
+    @staticmethod
+    def _now_ms():
+        return int(time.time() * 1000)
+
+    @classmethod
+    def _bucket_start(cls, granularity, timestamp_ms):
+        """
+        Zaman damgasının düştüğü özet kovasının başlangıcını (epoch milisaniye) döndürür.
+        """
+        if granularity == cls.ROLLUP_DAY:
+            local_day = datetime.fromtimestamp(timestamp_ms / 1000).replace(hour=0, minute=0, second=0, microsecond=0)
+            return int(local_day.timestamp()) * 1000
+        bucket_ms = cls.ROLLUP_BUCKET_MS[granularity]
+        return timestamp_ms - timestamp_ms % bucket_ms
+
+    @staticmethod
+    def format_timestamp(timestamp_ms):
+        """
+        Epoch milisaniye değerini arayüzde gösterilen yerel saat metnine çevirir.
+        """
+        return datetime.fromtimestamp(timestamp_ms / 1000).strftime("%Y-%m-%d %H:%M:%S")
+
     def create_new_session(self, video_name='N/A'):
         """
         Yeni bir analiz oturumu başlatır ve veritabanına kaydeder.
@@ -116,80 +271,393 @@ class DataManager:
         if not self.conn:
             return None
 
-        start_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        try:
-            self.cursor.execute(
-                "INSERT INTO sessions (start_time, video_name) VALUES (?, ?)",
-                (start_time, video_name)
-            )
-            self.conn.commit()
-            session_id = self.cursor.lastrowid
-            print(f"Yeni oturum oluşturuldu: ID={session_id}")
-            return session_id
-        except sqlite3.Error as e:
-            print(f"Oturum oluşturma hatası: {e}")
-            return None
+        start_time = self._now_ms()
+        with self._lock:
+            try:
+                self.cursor.execute(
+                    "INSERT INTO sessions (start_time, video_name) VALUES (?, ?)",
+                    (start_time, video_name)
+                )
+                self.conn.commit()
+                session_id = self.cursor.lastrowid
+                print(f"Yeni oturum oluşturuldu: ID={session_id}")
+                return session_id
+            except sqlite3.Error as e:
+                print(f"Oturum oluşturma hatası: {e}")
+                return None
 
-    def log_event(self, session_id, event_type):
+    def log_event(self, session_id, event_type, line_id=0, timestamp_ms=None):
         """
         Bir giriş veya çıkış olayını veritabanına kaydeder.
+        Tamponlu modda olay yalnızca kuyruğa eklenir; zaman damgası yine çağrı anında alınır.
+
+        Args:
+            session_id (int): Oturum ID'si.
+            event_type (str): 'Giriş' veya 'Çıkış'.
+            line_id (int): Olayı üreten sayım çizgisinin numarası.
+            timestamp_ms (int | None): Olayın gerçekleştiği an (epoch ms). Olaylar başka bir süreçte
+                üretilip sonradan yazılıyorsa verilir; None ise çağrı anı kullanılır.
         """
         if not self.conn or session_id is None:
             return
 
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        try:
-            self.cursor.execute(
-                "INSERT INTO events (session_id, timestamp, event_type) VALUES (?, ?, ?)",
-                (session_id, timestamp, event_type)
-            )
-            # İlgili oturumun toplam giriş/çıkış sayısını da güncelle
-            if event_type == 'Giriş':
-                self.cursor.execute("UPDATE sessions SET total_entries = total_entries + 1 WHERE session_id = ?",
-                                    (session_id,))
-            elif event_type == 'Çıkış':
-                self.cursor.execute("UPDATE sessions SET total_exits = total_exits + 1 WHERE session_id = ?",
-                                    (session_id,))
+        timestamp = self._now_ms() if timestamp_ms is None else int(timestamp_ms)
+        if self._event_queue is not None:
+            self._event_queue.put((session_id, timestamp, event_type, line_id))
+            return
 
-            self.conn.commit()
-        except sqlite3.Error as e:
-            print(f"Olay kaydetme hatası: {e}")
+        self._write_events([(session_id, timestamp, event_type, line_id)])
+
+    @profiler.timed('db_write')
+    def _write_events(self, events):
+        """
+        Olayları, oturum toplamlarını ve özet tablosunu tek bir transaction içinde yazar.
+
+        Args:
+            events (list of tuple): (session_id, timestamp_ms, event_type, line_id) demetleri.
+        """
+        # İlgili oturumların toplam giriş/çıkış sayılarını olay başına değil, oturum başına bir kez güncelle;
+        # özet kovaları da önce bellekte toplanır, her kova için tek bir upsert yapılır.
+        totals = {}
+        rollups = {}
+        day_starts = {}
+        for session_id, timestamp, event_type, line_id in events:
+            is_entry = event_type == 'Giriş'
+            is_exit = event_type == 'Çıkış'
+            entries, exits = totals.get(session_id, (0, 0))
+            totals[session_id] = (entries + is_entry, exits + is_exit)
+
+            # Yerel gün başlangıcı çeyrek saat başına bir kez hesaplanır (saat dilimi farkları çeyrek saatin katıdır)
+            quarter_start = timestamp - timestamp % 900_000
+            if quarter_start not in day_starts:
+                day_starts[quarter_start] = self._bucket_start(self.ROLLUP_DAY, timestamp)
+            buckets = ((self.ROLLUP_MINUTE, timestamp - timestamp % 60_000),
+                       (self.ROLLUP_HOUR, timestamp - timestamp % 3_600_000),
+                       (self.ROLLUP_DAY, day_starts[quarter_start]))
+            for granularity, bucket_start in buckets:
+                key = (granularity, session_id, bucket_start, line_id)
+                entries, exits = rollups.get(key, (0, 0))
+                rollups[key] = (entries + is_entry, exits + is_exit)
+
+        with self._lock:
+            try:
+                self.cursor.executemany(
+                    "INSERT INTO events (session_id, timestamp, event_type, line_id) VALUES (?, ?, ?, ?)",
+                    events
+                )
+                self.cursor.executemany(
+                    "UPDATE sessions SET total_entries = total_entries + ?, total_exits = total_exits + ? "
+                    "WHERE session_id = ?",
+                    [(entries, exits, session_id) for session_id, (entries, exits) in totals.items()]
+                )
+                self.cursor.executemany(
+                    "INSERT INTO event_rollups (granularity, session_id, bucket_start, line_id, entries, exits) "
+                    "VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (granularity, session_id, bucket_start, line_id) DO UPDATE SET "
+                    "entries = entries + excluded.entries, exits = exits + excluded.exits",
+                    [key + counts for key, counts in rollups.items()]
+                )
+                self.conn.commit()
+            except sqlite3.Error as e:
+                self.conn.rollback()
+                print(f"Olay kaydetme hatası: {e}")
+
+    def _writer_loop(self):
+        """
+        Arka plan yazıcı thread'i: kuyruktaki olayları toplu halde yazar.
+        Kuyruğa None konulduğunda kalan olayları yazar ve sonlanır.
+        """
+        pending = []
+        first_event_time = None
+        running = True
+        while running:
+            timeout = None
+            if pending:
+                timeout = max(0.0, first_event_time + self.flush_interval - time.monotonic())
+            try:
+                item = self._event_queue.get(timeout=timeout)
+            except queue.Empty:
+                item = ()
+
+            if item is None:
+                running = False
+            elif isinstance(item, threading.Event):
+                # flush() çağrısı: bekleyen her şeyi hemen yaz ve çağıranı uyandır
+                self._flush_pending(pending)
+                pending, first_event_time = [], None
+                item.set()
+                continue
+            elif item:
+                if not pending:
+                    first_event_time = time.monotonic()
+                pending.append(item)
+
+            if pending and (not running or len(pending) >= self.flush_every_n or
+                            time.monotonic() - first_event_time >= self.flush_interval):
+                self._flush_pending(pending)
+                pending, first_event_time = [], None
+
+    def _flush_pending(self, pending):
+        if pending:
+            self._write_events(pending)
+
+    def flush(self, timeout=None):
+        """
+        Tamponlu modda kuyruktaki tüm olayların veritabanına yazılmasını bekler.
+        """
+        if self._event_queue is None or self._writer_thread is None or not self._writer_thread.is_alive():
+            return
+        done = threading.Event()
+        self._event_queue.put(done)
+        done.wait(timeout)
 
     def get_all_sessions(self):
         """
         Tüm geçmiş analiz oturumlarının özetini döndürür.
+        Çok sayıda oturum varsa get_sessions_page tercih edilmelidir.
+        """
+        return self.get_sessions_page(page_size=-1)
+
+    def count_sessions(self):
+        """
+        Kayıtlı oturum sayısını döndürür.
         """
         if not self.conn:
-            return []
-        try:
-            self.cursor.execute(
-                "SELECT session_id, start_time, video_name, total_entries, total_exits FROM sessions ORDER BY start_time DESC")
-            return self.cursor.fetchall()
-        except sqlite3.Error as e:
-            print(f"Oturumları getirme hatası: {e}")
-            return []
+            return 0
+        with self._lock:
+            try:
+                return self.cursor.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+            except sqlite3.Error as e:
+                print(f"Oturum sayısı getirme hatası: {e}")
+                return 0
+
+    def get_sessions_page(self, page_size=50, page=0):
+        """
+        Oturumları en yeniden eskiye, sayfa sayfa döndürür. Sıralama start_time indeksinden
+        okunur; ayrıca sıralama (sort) yapılmaz.
+
+        Args:
+            page_size (int): Sayfa başına oturum sayısı. -1: tümü.
+            page (int): 0'dan başlayan sayfa numarası.
 
+        Returns:
+            list: (session_id, start_time, video_name, total_entries, total_exits) satırları.
+        """
+        if not self.conn:
+            return []
+        with self._lock:
+            try:
+                self.cursor.execute(
+                    "SELECT session_id, start_time, video_name, total_entries, total_exits FROM sessions "
+                    "ORDER BY start_time DESC, session_id DESC LIMIT ? OFFSET ?",
+                    (page_size, max(0, page) * max(0, page_size))
+                )
+                rows = self.cursor.fetchall()
+            except sqlite3.Error as e:
+                print(f"Oturumları getirme hatası: {e}")
+                return []
+        return [(row[0], self.format_timestamp(row[1])) + tuple(row[2:]) for row in rows]
 
     def get_events_by_session(self, session_id):
         """
         Belirli bir oturum ID'sine ait tüm giriş/çıkış olaylarını zaman sırasıyla döndürür.
         """
+        events = []
+        cursor = None
+        while True:
+            page, cursor = self.get_events_page(session_id, page_size=10000, after=cursor)
+            events.extend(page)
+            if cursor is None:
+                return events
+
+    def count_events(self, session_id):
+        """
+        Bir oturuma ait olay sayısını döndürür (yalnızca indeks taranır).
+        """
+        if not self.conn or session_id is None:
+            return 0
+        with self._lock:
+            try:
+                return self.cursor.execute(
+                    "SELECT COUNT(*) FROM events WHERE session_id = ?", (session_id,)
+                ).fetchone()[0]
+            except sqlite3.Error as e:
+                print(f"Olay sayısı getirme hatası: {e}")
+                return 0
+
+    def get_events_page(self, session_id, page_size=500, after=None):
+        """
+        Bir oturumun olaylarını keyset (seek) sayfalama ile zaman sırasıyla döndürür.
+        OFFSET kullanılmadığı için derin sayfalar da ilk sayfa kadar hızlıdır.
+
+        Args:
+            session_id (int): Oturum ID'si.
+            page_size (int): Sayfa başına olay sayısı.
+            after (tuple | None): Bir önceki çağrının döndürdüğü imleç; None ise ilk sayfa.
+
+        Returns:
+            tuple: (olaylar, sonraki_imleç). olaylar (timestamp, event_type) satırlarıdır;
+                sonraki_imleç son sayfada None olur.
+        """
         if not self.conn or session_id is None:
+            return [], None
+
+        last_timestamp, last_event_id = after if after is not None else (-1, -1)
+        with self._lock:
+            try:
+                self.cursor.execute(
+                    "SELECT timestamp, event_type, event_id, "
+                    "strftime('%Y-%m-%d %H:%M:%S', timestamp / 1000, 'unixepoch', 'localtime') FROM events "
+                    "WHERE session_id = ? AND (timestamp, event_id) > (?, ?) "
+                    "ORDER BY timestamp ASC, event_id ASC LIMIT ?",
+                    (session_id, last_timestamp, last_event_id, page_size)
+                )
+                rows = self.cursor.fetchall()
+            except sqlite3.Error as e:
+                logger.exception(f"Oturum ID {session_id} için olaylar getirilirken hata oluştu.")
+                return [], None
+
+        next_cursor = (rows[-1][0], rows[-1][2]) if len(rows) == page_size else None
+        # Zaman damgaları SQLite tarafında (format_timestamp ile aynı biçimde) metne çevrilir
+        return [(text, event_type) for _, event_type, _, text in rows], next_cursor
+
+    def _rollup_filters(self, granularity, start_ms, end_ms, session_id, line_id):
+        """
+        Özet sorguları için WHERE koşulunu ve parametrelerini oluşturur.
+        """
+        if granularity not in self.ROLLUP_GRANULARITIES:
+            raise ValueError(f"Geçersiz özet çözünürlüğü: {granularity}")
+        conditions = ["granularity = ?"]
+        params = [granularity]
+        if session_id is not None:
+            conditions.append("session_id = ?")
+            params.append(session_id)
+        if start_ms is not None:
+            conditions.append("bucket_start >= ?")
+            params.append(start_ms)
+        if end_ms is not None:
+            conditions.append("bucket_start < ?")
+            params.append(end_ms)
+        if line_id is not None:
+            conditions.append("line_id = ?")
+            params.append(line_id)
+        return " AND ".join(conditions), params
+
+    def get_flow(self, granularity=ROLLUP_HOUR, start_ms=None, end_ms=None, session_id=None, line_id=None,
+                 bucket_ms=None):
+        """
+        Giriş/çıkış akış eğrisini ham olayları taramadan özet tablosundan döndürür.
+
+        Args:
+            granularity (str): ROLLUP_MINUTE, ROLLUP_HOUR veya ROLLUP_DAY.
+            start_ms (int | None): Aralık başlangıcı (epoch ms, dahil). None: en baştan.
+            end_ms (int | None): Aralık sonu (epoch ms, hariç). None: sona kadar.
+            session_id (int | None): Yalnızca bu oturum. None: tüm oturumların toplamı.
+            line_id (int | None): Yalnızca bu sayım çizgisi. None: tüm çizgilerin toplamı.
+            bucket_ms (int | None): Kovaları bu genişlikte yeniden grupla (örn. 15 dakika için 900000).
+                Dakika ve saat çözünürlüğünde kullanılabilir ve çözünürlüğün katı olmalıdır.
+
+        Returns:
+            list: Zamana göre sıralı (bucket_start_ms, entries, exits) satırları; boş kovalar dönmez.
+        """
+        if not self.conn:
             return []
-        try:
-            self.cursor.execute(
-                "SELECT timestamp, event_type FROM events WHERE session_id = ? ORDER BY timestamp ASC",
-                (session_id,)
-            )
-            return self.cursor.fetchall()
-        except sqlite3.Error as e:
-            logger.exception(f"Oturum ID {session_id} için olaylar getirilirken hata oluştu.")
+
+        where, params = self._rollup_filters(granularity, start_ms, end_ms, session_id, line_id)
+        bucket_expression = "bucket_start"
+        if bucket_ms is not None:
+            if granularity not in self.ROLLUP_BUCKET_MS or bucket_ms % self.ROLLUP_BUCKET_MS[granularity]:
+                raise ValueError(f"{bucket_ms} ms kovası {granularity} çözünürlüğünden oluşturulamaz.")
+            bucket_expression = f"bucket_start - bucket_start % {int(bucket_ms)}"
+
+        with self._lock:
+            try:
+                self.cursor.execute(
+                    f"SELECT {bucket_expression} AS bucket, SUM(entries), SUM(exits) FROM event_rollups "
+                    f"WHERE {where} GROUP BY bucket ORDER BY bucket",
+                    params
+                )
+                return self.cursor.fetchall()
+            except sqlite3.Error as e:
+                print(f"Akış verisi getirme hatası: {e}")
+                return []
+
+    def get_occupancy(self, granularity=ROLLUP_HOUR, start_ms=None, end_ms=None, session_id=None, line_id=None,
+                      bucket_ms=None):
+        """
+        Doluluk eğrisini (içerideki kişi sayısı = toplam giriş - toplam çıkış) özet tablosundan döndürür.
+        Aralık başlangıcından önceki net akış da hesaba katılır: tamamlanmış günler gün kovalarından,
+        başlangıç gününün kalanı dakika kovalarından toplanır, böylece bir yıllık geçmişte bile
+        en fazla birkaç bin satır okunur.
+
+        Args:
+            get_flow ile aynı.
+
+        Returns:
+            list: (bucket_start_ms, entries, exits, occupancy) satırları; occupancy kova sonundaki değerdir.
+        """
+        if start_ms is not None:
+            # Başlangıç bir kova sınırına yukarı yuvarlanır; aksi halde yarım kalan kovanın
+            # olayları ne başlangıç değerine ne de eğriye girerdi.
+            start_ms = self._align_bucket_up(granularity, start_ms, bucket_ms)
+        flow = self.get_flow(granularity, start_ms, end_ms, session_id, line_id, bucket_ms)
+        if not flow:
             return []
 
+        occupancy = 0
+        if start_ms is not None:
+            occupancy = self._net_flow_before(start_ms, session_id, line_id)
+
+        curve = []
+        for bucket_start, entries, exits in flow:
+            occupancy += entries - exits
+            curve.append((bucket_start, entries, exits, occupancy))
+        return curve
+
+    def _align_bucket_up(self, granularity, timestamp_ms, bucket_ms=None):
+        """
+        Zaman damgasını içinde bulunduğu kova başlangıcı değilse bir sonraki kovanın başlangıcına yuvarlar.
+        """
+        if granularity == self.ROLLUP_DAY:
+            day_start = self._bucket_start(self.ROLLUP_DAY, timestamp_ms)
+            if day_start == timestamp_ms:
+                return timestamp_ms
+            # Gün uzunluğu yaz saati geçişlerinde 23-25 saat olabilir; 30 saat sonrası her zaman ertesi gündür
+            return self._bucket_start(self.ROLLUP_DAY, day_start + 30 * 3_600_000)
+        width = bucket_ms or self.ROLLUP_BUCKET_MS[granularity]
+        return -(-timestamp_ms // width) * width
+
+    def _net_flow_before(self, timestamp_ms, session_id, line_id):
+        """
+        Verilen zamandan önceki toplam (giriş - çıkış) değerini özet tablosundan hesaplar.
+        """
+        day_start = self._bucket_start(self.ROLLUP_DAY, timestamp_ms)
+        parts = ((self.ROLLUP_DAY, None, day_start), (self.ROLLUP_MINUTE, day_start, timestamp_ms))
+        net_flow = 0
+        with self._lock:
+            try:
+                for granularity, start_ms, end_ms in parts:
+                    where, params = self._rollup_filters(granularity, start_ms, end_ms, session_id, line_id)
+                    self.cursor.execute(
+                        f"SELECT COALESCE(SUM(entries) - SUM(exits), 0) FROM event_rollups WHERE {where}", params)
+                    net_flow += self.cursor.fetchone()[0]
+            except sqlite3.Error as e:
+                print(f"Doluluk verisi getirme hatası: {e}")
+        return net_flow
+
     def close_connection(self):
         """
         Veritabanı bağlantısını güvenli bir şekilde kapatır.
+        Tamponlu modda önce kuyrukta bekleyen tüm olaylar yazılır.
         """
+        if self._writer_thread is not None:
+            self._event_queue.put(None)
+            self._writer_thread.join()
+            self._writer_thread = None
+            self._event_queue = None
+
         if self.conn:
-            self.conn.close()
+            with self._lock:
+                self.conn.close()
+                self.conn = None
             logger.info("Veritabanı bağlantısı kapatıldı.")
@@ -1,37 +1,258 @@
 # density_map_generator.py (Güncellenmiş Hali)
 
+import time
+
 import numpy as np
 import cv2
 
 
 class DensityMapGenerator:
-    def __init__(self, frame_shape, blur_kernel_size=51, clipping_percentile=99):
+    """
+    Kişi merkezlerini biriktirerek yoğunluk (ısı) haritası oluşturan sınıf.
+
+    cell_size > 1 verildiğinde noktalar tam çözünürlük yerine cell_size x cell_size
+    piksellik hücrelerden oluşan kaba bir ızgarada biriktirilir; bulanıklaştırma ve
+    yüzdelik hesabı bu küçük matriste yapılır, görüntü yalnızca çizilirken kare
+    boyutuna büyütülür. Bellek kazancı cell_size^2 katıdır; örneğin 4K (3840x2160)
+    bir akış için float32 matris tam çözünürlükte ~33.2 MB iken cell_size=8 ile
+    480x270 hücre, ~0.52 MB tutar.
+
+    Zaman modları:
+        - 'cumulative': Oturumun tamamı biriktirilir (varsayılan).
+        - 'window': Yalnızca son window_seconds saniye gösterilir. Pencere, her biri
+          window_seconds / window_buckets saniyelik alt biriktiricilerden oluşan bir
+          halkada tutulur; en eski dilim süresi dolunca toplamdan çıkarılır.
+        - 'decay': Eski noktalar half_life_seconds yarı ömrüyle üstel olarak söner. Matrisin
+          tamamını her karede çarpmak yerine yeni noktalar büyüyen bir ölçekle eklenir
+          (kare başına O(1)); ölçek çok büyüyünce matris bir kez yeniden ölçeklenir.
+    Her modda bellek, oturum ne kadar uzun sürerse sürsün sabittir.
+    """
+
+    MODE_CUMULATIVE = 'cumulative'
+    MODE_WINDOW = 'window'
+    MODE_DECAY = 'decay'
+
+    # Sönüm modunda ölçek bu değeri aşınca matris yeniden ölçeklenir (float32 hassasiyeti için)
+    DECAY_RENORMALIZE_LIMIT = 1e6
+
+    # Canlı modda yüzdelik tahmini için logaritmik histogram. Bölmeler float32 bit deseninden
+    # (üs + mantisin ilk 4 biti) doğrudan okunur: oktav başına 16 bölme, log hesabı gerekmez.
+    HISTOGRAM_MANTISSA_BITS = 4
+    HISTOGRAM_MIN_EXPONENT = -24
+    HISTOGRAM_MAX_EXPONENT = 40
+    # Canlı modda artımlı bulanıklaştırmanın yapıldığı en küçük karo (tile) boyutu (hücre cinsinden)
+    LIVE_TILE_SIZE = 32
+
+    def __init__(self, frame_shape, blur_kernel_size=51, clipping_percentile=99, cell_size=1, incremental=False,
+                 mode=MODE_CUMULATIVE, window_seconds=600, window_buckets=10, half_life_seconds=300):
         """
         Sınıfın kurucu metodu. Artık ayarlanabilir parametreler alıyor.
 
         Args:
             frame_shape (tuple): Video karesinin şekli.
             blur_kernel_size (int): Isıyı yaymak için kullanılacak blur kernel boyutu. Tek sayı olmalı.
+                Tam çözünürlük piksel cinsindendir; kaba ızgarada otomatik ölçeklenir.
             clipping_percentile (int): Kontrast ayarı için kullanılacak yüzdelik dilim.
+            cell_size (int): Izgara hücresinin piksel cinsinden kenar uzunluğu. 1: tam çözünürlük.
+            incremental (bool): True ise oturum sürerken generate_live_heatmap_image ile
+                ucuz, artımlı (incremental) canlı harita üretilebilir.
+            mode (str): 'cumulative', 'window' veya 'decay'.
+            window_seconds (float): 'window' modunda gösterilecek son süre (saniye).
+            window_buckets (int): 'window' modunda pencerenin bölündüğü alt biriktirici sayısı.
+            half_life_seconds (float): 'decay' modunda ısının yarıya inme süresi (saniye).
         """
         self.frame_height = frame_shape[0]
         self.frame_width = frame_shape[1]
         self.blur_kernel_size = (blur_kernel_size, blur_kernel_size)
         self.clipping_percentile = clipping_percentile
 
-        self.heatmap_matrix = np.zeros((self.frame_height, self.frame_width), dtype=np.float32)
+        self.cell_size = max(1, int(cell_size))
+        self.grid_height = -(-self.frame_height // self.cell_size)
+        self.grid_width = -(-self.frame_width // self.cell_size)
+
+        self.heatmap_matrix = np.zeros((self.grid_height, self.grid_width), dtype=np.float32)
+
+        if mode not in (self.MODE_CUMULATIVE, self.MODE_WINDOW, self.MODE_DECAY):
+            raise ValueError(f"Geçersiz ısı haritası modu: {mode}")
+        self.mode = mode
+        self._current_time = None
+
+        if self.mode == self.MODE_WINDOW:
+            # heatmap_matrix pencere içindeki dilimlerin toplamını tutar
+            self.window_buckets = max(1, int(window_buckets))
+            self.bucket_seconds = window_seconds / self.window_buckets
+            self._buckets = np.zeros((self.window_buckets, self.grid_height, self.grid_width), dtype=np.float32)
+            self._bucket_index = 0
+            self._bucket_start_time = None
+        elif self.mode == self.MODE_DECAY:
+            # Gerçek harita = heatmap_matrix * _decay_scale
+            self.half_life_seconds = half_life_seconds
+            self._decay_scale = 1.0
+
+        self.incremental = incremental
+        if self.incremental:
+            self._init_live_state()
+
+    @property
+    def memory_bytes(self):
+        """
+        Isı matrisinin bellekte kapladığı bayt sayısı.
+        """
+        total = self.heatmap_matrix.nbytes
+        if self.mode == self.MODE_WINDOW:
+            total += self._buckets.nbytes
+        if self.incremental:
+            total += self._live_blurred.nbytes
+        return total
+
+    def advance_time(self, timestamp=None):
+        """
+        Zaman pencereli ve sönümlü modlarda haritanın saatini ilerletir.
+
+        add_points zaten bu metodu çağırır; kare gelmeyen sürelerde de pencerenin
+        kaymasını istiyorsanız ayrıca çağırabilirsiniz.
+
+        Args:
+            timestamp (float | None): Saniye cinsinden zaman (örn. video zamanı). None ise
+                time.monotonic() kullanılır. Aynı oturumda tek bir zaman kaynağı kullanılmalıdır.
+        """
+        if self.mode == self.MODE_CUMULATIVE:
+            return
+        now = time.monotonic() if timestamp is None else float(timestamp)
+        previous = self._current_time
+        self._current_time = now if previous is None else max(previous, now)
+        if previous is None:
+            if self.mode == self.MODE_WINDOW:
+                self._bucket_start_time = now
+            return
+
+        if self.mode == self.MODE_WINDOW:
+            self._rotate_buckets()
+        else:
+            self._decay_scale *= 0.5 ** ((self._current_time - previous) / self.half_life_seconds)
+            if self._decay_scale < 1.0 / self.DECAY_RENORMALIZE_LIMIT:
+                self._renormalize_decay()
+
+    def _rotate_buckets(self):
+        """
+        Süresi dolan dilimleri toplamdan çıkarır ve yeniden kullanıma açar (dilim başına bir kez).
+        """
+        elapsed_buckets = int((self._current_time - self._bucket_start_time) // self.bucket_seconds)
+        if elapsed_buckets <= 0:
+            return
+
+        self._bucket_start_time += elapsed_buckets * self.bucket_seconds
+        if elapsed_buckets >= self.window_buckets:
+            self._buckets.fill(0)
+            self.heatmap_matrix.fill(0)
+        else:
+            for _ in range(elapsed_buckets):
+                self._bucket_index = (self._bucket_index + 1) % self.window_buckets
+                # Halkadaki en eski dilim, yeni dilim olarak yeniden kullanılır
+                self.heatmap_matrix -= self._buckets[self._bucket_index]
+                self._buckets[self._bucket_index].fill(0)
+            # Kayan nokta artıklarının negatif değer bırakmasını önle
+            np.maximum(self.heatmap_matrix, 0, out=self.heatmap_matrix)
+
+        if self.incremental:
+            self._rebuild_live_state()
+
+    def _renormalize_decay(self):
+        self.heatmap_matrix *= np.float32(self._decay_scale)
+        self._decay_scale = 1.0
+        if self.incremental:
+            self._rebuild_live_state()
+
+    def current_matrix(self):
+        """
+        Seçili zaman moduna göre gösterilecek ısı matrisini döndürür.
+        """
+        if self.mode == self.MODE_DECAY:
+            return self.heatmap_matrix * np.float32(self._decay_scale)
+        return self.heatmap_matrix
+
+    def add_points(self, points, intensity=15, weights=None, timestamp=None):  # Intensity'yi varsayılan olarak biraz daha yüksek tutalım
+        """
+        Noktaları ısı matrisine toplu (vektörel) olarak ekler.
+
+        Args:
+            points (iterable | np.ndarray): (x, y) noktaları; Detections.centers gibi (N, 2) bir dizi de olabilir.
+            intensity (float): Her noktanın eklediği temel ısı miktarı.
+            weights (np.ndarray | None): Nokta başına (N,) ağırlıklar (örn. bekleme süresi veya kutu alanı).
+                Verilirse her noktanın katkısı intensity * weight olur.
+            timestamp (float | None): 'window' ve 'decay' modlarında noktaların zamanı (saniye).
+                None ise time.monotonic() kullanılır; video dosyalarında video zamanı verilmelidir.
+        """
+        self.advance_time(timestamp)
+
+        points = np.asarray(points).reshape(-1, 2)
+        if len(points) == 0:
+            return
 
-    def add_points(self, points, intensity=15):  # Intensity'yi varsayılan olarak biraz daha yüksek tutalım
-        for x, y in points:
-            if 0 <= x < self.frame_width and 0 <= y < self.frame_height:
-                self.heatmap_matrix[y, x] += intensity
+        xs = points[:, 0].astype(np.intp)
+        ys = points[:, 1].astype(np.intp)
+        in_bounds = (xs >= 0) & (xs < self.frame_width) & (ys >= 0) & (ys < self.frame_height)
+
+        if weights is None:
+            values = np.float32(intensity)
+        else:
+            values = (intensity * np.asarray(weights, dtype=np.float32).reshape(-1))[in_bounds]
+
+        cell_x = xs[in_bounds] // self.cell_size
+        cell_y = ys[in_bounds] // self.cell_size
+        self._accumulate(cell_y * self.grid_width + cell_x, values)
+
+    def add_sparse(self, flat_indices, values, timestamp=None):
+        """
+        Başka bir DensityMapGenerator'dan (örn. ayrı bir işçi sürecinden) gelen seyrek ısı farkını
+        ekler. Izgara boyutları iki tarafta aynı olmalıdır.
+
+        Args:
+            flat_indices (np.ndarray): Düzleştirilmiş ızgara hücre indeksleri.
+            values (np.ndarray): Hücrelere eklenecek ısı değerleri.
+            timestamp (float | None): add_points ile aynı anlamda.
+        """
+        self.advance_time(timestamp)
+        flat_indices = np.asarray(flat_indices, dtype=np.intp).reshape(-1)
+        if len(flat_indices) == 0:
+            return
+        self._accumulate(flat_indices, np.asarray(values, dtype=np.float32).reshape(-1))
+
+    def take_sparse_delta(self):
+        """
+        Son çağrıdan beri biriken ısıyı seyrek (indeks, değer) çifti olarak döndürür ve matrisi sıfırlar.
+        Yalnızca 'cumulative' modda anlamlıdır; add_sparse ile birlikte kullanılır.
+
+        Returns:
+            tuple: (flat_indices int32, values float32)
+        """
+        flat_matrix = self.heatmap_matrix.reshape(-1)
+        flat_indices = np.flatnonzero(flat_matrix)
+        values = flat_matrix[flat_indices]
+        self.heatmap_matrix.fill(0)
+        return flat_indices.astype(np.int32), values
+
+    def _accumulate(self, flat_indices, values):
+        if self.mode == self.MODE_DECAY:
+            # Matrisi söndürmek yerine yeni noktaları güncel ölçeğin tersiyle ekle
+            values = np.float32(values / self._decay_scale)
+
+        # Düzleştirilmiş (flat) indeksler üzerinde np.add.at: aynı piksele düşen
+        # birden fazla nokta da doğru şekilde toplanır
+        np.add.at(self.heatmap_matrix.reshape(-1), flat_indices, values)
+        if self.mode == self.MODE_WINDOW:
+            np.add.at(self._buckets[self._bucket_index].reshape(-1), flat_indices, values)
+
+        if self.incremental:
+            self._pending_indices.append(flat_indices)
+            self._pending_values.append(np.broadcast_to(np.float32(values), flat_indices.shape))
 
     def generate_heatmap_image(self):
         """
         Daha akıllı normalizasyon ile görsel bir ısı haritası oluşturur.
         """
         # Isıyı daha geniş ve belirgin alanlara yay
-        blurred_map = cv2.GaussianBlur(self.heatmap_matrix, self.blur_kernel_size, 0)
+        blurred_map = self._blur(self.current_matrix())
 
         # Eğer hiç ısı birikmediyse, boş bir harita döndür
         if np.max(blurred_map) == 0:
@@ -52,7 +273,164 @@ class DensityMapGenerator:
         # Kırpılmış haritayı 0-255 arasına normalize et
         norm_map = cv2.normalize(clipped_map, None, 0, 255, cv2.NORM_MINMAX, dtype=cv2.CV_8U)
 
+        # Kaba ızgara kullanılıyorsa haritayı ancak şimdi kare boyutuna büyüt
+        if self.cell_size > 1:
+            norm_map = cv2.resize(norm_map, (self.frame_width, self.frame_height), interpolation=cv2.INTER_LINEAR)
+
         # Renklendir
         heatmap_color_image = cv2.applyColorMap(norm_map, cv2.COLORMAP_JET)
 
-        return heatmap_color_image
\ No newline at end of file
+        return heatmap_color_image
+
+    def generate_live_heatmap_image(self):
+        """
+        Oturum sürerken canlı ısı haritası üretir (incremental=True gerektirir).
+
+        Gauss bulanıklaştırması doğrusal olduğu için tüm matris yeniden bulanıklaştırılmaz:
+        son yenilemeden bu yana yeni nokta düşen karolar (tile) kendi kenar payıyla birlikte
+        ayrı ayrı bulanıklaştırılıp çalışan (running) bulanık haritaya eklenir. Kırpma
+        yüzdeliği de tam sıralama yerine yalnızca değişen piksellerle güncellenen
+        logaritmik bir histogramdan okunur. Sonuç generate_heatmap_image ile (kare
+        kenarlarındaki yansıma farkı ve ~%4'lük yüzdelik çözünürlüğü dışında) eşdeğerdir.
+        """
+        if not self.incremental:
+            raise RuntimeError("Canlı ısı haritası için DensityMapGenerator(incremental=True) kullanılmalı.")
+
+        self._apply_pending_points()
+
+        empty_image = np.zeros((self.frame_height, self.frame_width, 3), dtype=np.uint8)
+        total = self._value_histogram.sum()
+        if total == 0:
+            return empty_image
+
+        # Histogramdan yüzdelik tahmini: hedef sıraya ulaşılan bölmenin üst sınırı
+        target_rank = max(1, np.ceil(total * self.clipping_percentile / 100.0))
+        bin_index = int(np.searchsorted(np.cumsum(self._value_histogram), target_rank))
+        upper_edge_bits = (bin_index + 1 + self._histogram_offset) << self._histogram_shift
+        max_val_clipped = np.array([upper_edge_bits], dtype=np.int32).view(np.float32)[0]
+
+        # convertScaleAbs 255'in üzerini zaten doyurduğu (saturate) için ayrı bir kırpma adımı gerekmez
+        norm_map = cv2.convertScaleAbs(self._live_blurred, alpha=255.0 / max_val_clipped)
+
+        if self.cell_size > 1:
+            norm_map = cv2.resize(norm_map, (self.frame_width, self.frame_height), interpolation=cv2.INTER_LINEAR)
+
+        return cv2.applyColorMap(norm_map, cv2.COLORMAP_JET)
+
+    def _init_live_state(self):
+        self._live_kernel_size, self._live_sigma = self._kernel_params()
+        self._live_radius = self._live_kernel_size // 2
+
+        self._live_blurred = np.zeros_like(self.heatmap_matrix)
+        # float32: 23 bit mantis; üs ve mantisin ilk bitleri birlikte bölme numarasını verir
+        self._histogram_shift = 23 - self.HISTOGRAM_MANTISSA_BITS
+        self._histogram_offset = (127 + self.HISTOGRAM_MIN_EXPONENT) << self.HISTOGRAM_MANTISSA_BITS
+        num_bins = (self.HISTOGRAM_MAX_EXPONENT - self.HISTOGRAM_MIN_EXPONENT) << self.HISTOGRAM_MANTISSA_BITS
+        self._value_histogram = np.zeros(num_bins, dtype=np.int64)
+        self._pending_indices = []
+        self._pending_values = []
+
+        # Kenar payının karo alanına oranla fazla büyümemesi için karo en az dört yarıçap kadar olur
+        self._tile_size = max(self.LIVE_TILE_SIZE, 4 * self._live_radius)
+        self._tiles_x = -(-self.grid_width // self._tile_size)
+
+    def _rebuild_live_state(self):
+        """
+        Dilim çıkarma veya yeniden ölçekleme sonrası çalışan bulanık haritayı ve histogramı
+        baştan kurar. Bu tam işlem dilim ya da ölçek değişimi başına yalnızca bir kez yapılır.
+        """
+        self._pending_indices = []
+        self._pending_values = []
+        kernel = (self._live_kernel_size, self._live_kernel_size)
+        self._live_blurred = cv2.GaussianBlur(self.heatmap_matrix, kernel, self._live_sigma,
+                                              borderType=cv2.BORDER_CONSTANT)
+        self._value_histogram.fill(0)
+        self._update_histogram(self._live_blurred.reshape(-1), +1)
+
+    def _update_histogram(self, values, sign):
+        values = values[values > 0]
+        if len(values):
+            # Pozitif float32 değerlerin bit desenleri değerle aynı sırada artar
+            bins = (values.view(np.int32) >> self._histogram_shift) - self._histogram_offset
+            bins = np.clip(bins, 0, len(self._value_histogram) - 1)
+            self._value_histogram += sign * np.bincount(bins, minlength=len(self._value_histogram))
+
+    def _apply_pending_points(self):
+        """
+        Bekleyen noktaları, yalnızca dokundukları karolarda bulanıklaştırarak çalışan haritaya ekler.
+        """
+        if not self._pending_indices:
+            return
+
+        flat_indices = np.concatenate(self._pending_indices)
+        values = np.concatenate(self._pending_values)
+        self._pending_indices = []
+        self._pending_values = []
+
+        cell_y = flat_indices // self.grid_width
+        cell_x = flat_indices % self.grid_width
+        tile_size = self._tile_size
+        tile_ids = (cell_y // tile_size) * self._tiles_x + cell_x // tile_size
+
+        radius = self._live_radius
+        kernel = (self._live_kernel_size, self._live_kernel_size)
+
+        order = np.argsort(tile_ids, kind='stable')
+        sorted_tiles = tile_ids[order]
+        touched_tiles, starts = np.unique(sorted_tiles, return_index=True)
+        ends = np.append(starts[1:], len(order))
+
+        # Aynı karo satırında yan yana dokunulan karolar tek bir bölgede birleştirilir; her bölge
+        # kenar payıyla birlikte bulanıklaştırılır ve etkisi bu bölgenin dışına taşmaz
+        run_breaks = np.flatnonzero((np.diff(touched_tiles) != 1) |
+                                    (np.diff(touched_tiles // self._tiles_x) != 0)) + 1
+        run_first = np.concatenate(([0], run_breaks))
+        run_last = np.concatenate((run_breaks, [len(touched_tiles)])) - 1
+
+        updates = []
+        touched_mask = np.zeros(self.heatmap_matrix.shape, dtype=bool)
+        for first, last in zip(run_first.tolist(), run_last.tolist()):
+            tile_row = int(touched_tiles[first]) // self._tiles_x
+            tile_y0 = tile_row * tile_size
+            tile_x0 = (int(touched_tiles[first]) % self._tiles_x) * tile_size
+            tile_x1 = (int(touched_tiles[last]) % self._tiles_x + 1) * tile_size
+            y0, x0 = max(0, tile_y0 - radius), max(0, tile_x0 - radius)
+            y1 = min(self.grid_height, tile_y0 + tile_size + radius)
+            x1 = min(self.grid_width, tile_x1 + radius)
+            touched_mask[y0:y1, x0:x1] = True
+            updates.append((order[starts[first]:ends[last]], y0, x0, y1, x1))
+
+        # Histogram yalnızca değişen pikseller için güncellenir: önce eski değerler çıkarılır...
+        self._update_histogram(self._live_blurred[touched_mask], -1)
+
+        for members, y0, x0, y1, x1 in updates:
+            delta = np.zeros((y1 - y0, x1 - x0), dtype=np.float32)
+            np.add.at(delta, (cell_y[members] - y0, cell_x[members] - x0), values[members])
+            self._live_blurred[y0:y1, x0:x1] += cv2.GaussianBlur(delta, kernel, self._live_sigma,
+                                                                 borderType=cv2.BORDER_CONSTANT)
+
+        # ...sonra yeni değerler eklenir
+        self._update_histogram(self._live_blurred[touched_mask], +1)
+
+    def _kernel_params(self):
+        """
+        Gauss çekirdeği için (kernel boyutu, sigma) döndürür. Kaba ızgarada, tam
+        çözünürlükteki kernel'in standart sapması hücre boyutuna bölünerek aynı
+        fiziksel yayılım korunur.
+        """
+        kernel_size = self.blur_kernel_size[0]
+        if self.cell_size == 1:
+            return kernel_size, 0
+
+        # OpenCV'nin sigma=0 için kernel boyutundan hesapladığı standart sapma
+        full_res_sigma = 0.3 * ((kernel_size - 1) * 0.5 - 1) + 0.8
+        sigma = full_res_sigma / self.cell_size
+        # OpenCV'nin float görüntülerde sigma'dan seçtiği kernel boyutu
+        return int(round(sigma * 8 + 1)) | 1, sigma
+
+    def _blur(self, matrix):
+        """
+        Gauss bulanıklaştırmasını tüm matrise uygular.
+        """
+        kernel_size, sigma = self._kernel_params()
+        return cv2.GaussianBlur(matrix, (kernel_size, kernel_size), sigma)
@@ -0,0 +1,246 @@
+import hashlib
+import json
+import os
+import zipfile
+
+import numpy as np
+from detections import Detections
+from logger_config import logger
+
+
+class CachedDetections:
+    """
+    Önbellekten okunan bir videonun kare başına takip sonuçları.
+
+    Tüm kareler sütun bazlı tek dizilerde tutulur (ids, boxes); karenin satırları
+    offsets[i]:offsets[i + 1] aralığıdır. cached[i] o kare için bir Detections döndürür.
+    """
+
+    def __init__(self, ids, boxes, counts, frame_shape=None, fps=0.0):
+        self.ids = ids
+        self.boxes = boxes
+        self.offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.offsets[1:])
+        self.frame_shape = tuple(int(v) for v in frame_shape) if frame_shape is not None else None
+        self.fps = float(fps)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, frame_index):
+        start, end = self.offsets[frame_index], self.offsets[frame_index + 1]
+        return Detections(self.ids[start:end], self.boxes[start:end])
+
+    def __iter__(self):
+        for frame_index in range(len(self)):
+            yield self[frame_index]
+
+
+class DetectionRecorder:
+    """
+    İlk analiz sırasında kare başına Detections'ları biriktirir; finish() ile önbelleğe yazar.
+    Yalnızca video sonuna kadar işlenmiş kayıtlar kaydedilmelidir (yarım kayıt, tam oynatma sanılır).
+    """
+
+    def __init__(self, cache, key, frame_shape=None, fps=0.0):
+        self._cache = cache
+        self.key = key
+        self.frame_shape = frame_shape
+        self.fps = fps
+        self._ids = []
+        self._boxes = []
+        self._counts = []
+
+    def append(self, detections):
+        self._ids.append(detections.ids)
+        self._boxes.append(detections.boxes)
+        self._counts.append(len(detections))
+
+    def __len__(self):
+        return len(self._counts)
+
+    def finish(self):
+        """
+        Kaydı önbelleğe yazar.
+
+        Returns:
+            bool: Yazma başarılıysa True.
+        """
+        ids = np.concatenate(self._ids).astype(np.int32) if self._ids else np.zeros(0, dtype=np.int32)
+        boxes = np.concatenate(self._boxes).astype(np.float32) if self._boxes else np.zeros((0, 4), dtype=np.float32)
+        return self._cache.save(self.key, ids, boxes, np.asarray(self._counts, dtype=np.int32),
+                                frame_shape=self.frame_shape, fps=self.fps)
+
+
+class DetectionCache:
+    """
+    Videoların kare başına takip sonuçlarını (ID ve kutular) diskte saklayan önbellek.
+
+    Anahtar; videonun içerik özeti (hash), model dosyasının içerik özeti ve takibin sonucunu
+    etkileyen ayarlardan (tespit aralığı, sınıf, takipçi) üretilir. Böylece çizgi konumu veya
+    ısı haritası ayarları değiştiğinde video YOLO'dan yeniden geçirilmez; sonuçlar saniyeler
+    içinde önbellekten yeniden oynatılır. Sayaç ve ısı haritası ayarları anahtara girmez.
+
+    Her kayıt tek bir sıkıştırılmamış .npz dosyasıdır. Toplam boyut max_bytes'ı aşarsa en uzun
+    süredir kullanılmayan (LRU) kayıtlar silinir; kullanım zamanı dosyanın değiştirilme
+    zamanıyla (mtime) izlenir ve her okumada güncellenir.
+    """
+
+    # Kayıt biçimi değişirse artırılır; eski kayıtlar farklı anahtara düştüğü için kendiliğinden kullanılmaz
+    FORMAT_VERSION = 1
+    FILE_EXTENSION = '.npz'
+
+    def __init__(self, cache_folder='cache/detections', max_bytes=2 * 1024 ** 3):
+        """
+        Args:
+            cache_folder (str): Önbellek dosyalarının klasörü.
+            max_bytes (int): Önbelleğin diskte kaplayabileceği en fazla boyut (bayt).
+        """
+        self.cache_folder = cache_folder
+        self.max_bytes = int(max_bytes)
+        os.makedirs(self.cache_folder, exist_ok=True)
+
+    @staticmethod
+    def file_hash(path, chunk_size=1024 * 1024):
+        """
+        Dosyanın içerik özetini (BLAKE2b) parça parça okuyarak hesaplar.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def make_key(self, video_path, model_path, **config):
+        """
+        Video ve model içeriğinden ve takip ayarlarından önbellek anahtarı üretir.
+
+        Args:
+            video_path (str): Video dosyası.
+            model_path (str): Model dosyası (varsa içeriği, yoksa adı anahtara girer).
+            **config: Takip çıktısını etkileyen diğer ayarlar (örn. detect_interval, tracker).
+
+        Returns:
+            str: Dosya adı olarak kullanılabilecek anahtar.
+        """
+        model_id = self.file_hash(model_path) if os.path.isfile(model_path) else os.path.basename(model_path)
+        description = json.dumps({
+            'format': self.FORMAT_VERSION,
+            'video': self.file_hash(video_path),
+            'model': model_id,
+            'config': config,
+        }, sort_keys=True)
+        return hashlib.blake2b(description.encode('utf-8'), digest_size=16).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_folder, f"{key}{self.FILE_EXTENSION}")
+
+    def load(self, key):
+        """
+        Anahtara ait kaydı okur ve kullanım zamanını günceller.
+
+        Returns:
+            CachedDetections | None: Kayıt yoksa veya okunamıyorsa None.
+        """
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                cached = CachedDetections(data['ids'], data['boxes'], data['counts'],
+                                          frame_shape=data['frame_shape'] if data['frame_shape'].size else None,
+                                          fps=float(data['fps']))
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile, EOFError) as e:
+            # Yarım kalmış/bozuk kayıt (kesik veya boş .npz) silinir; çağıran inference ile devam eder
+            logger.warning(f"Tespit önbelleği okunamadı, kayıt siliniyor ({path}): {e}")
+            self._remove(path)
+            return None
+        os.utime(path)
+        logger.info(f"Tespit önbelleğinden {len(cached)} kare okundu: {key}")
+        return cached
+
+    def recorder(self, key, frame_shape=None, fps=0.0):
+        return DetectionRecorder(self, key, frame_shape=frame_shape, fps=fps)
+
+    def save(self, key, ids, boxes, counts, frame_shape=None, fps=0.0):
+        """
+        Sütun bazlı kaydı atomik olarak yazar (önce geçici dosya, sonra yeniden adlandırma)
+        ve boyut sınırını uygular.
+        """
+        path = self._path(key)
+        temp_path = f"{path}.tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                np.savez(f, ids=ids, boxes=boxes, counts=counts,
+                         frame_shape=np.asarray(frame_shape if frame_shape is not None else [], dtype=np.int64),
+                         fps=np.float64(fps or 0.0))
+                # Yeniden adlandırmadan önce veri diske yazılır; aksi halde çökme sonrası son adla boş kayıt kalabilir
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.error(f"Tespit önbelleği yazılamadı ({path}): {e}")
+            self._remove(temp_path)
+            return False
+        logger.info(f"Tespit önbelleğine {len(counts)} kare yazıldı: {key}")
+        self.evict(keep=key)
+        return True
+
+    def entries(self):
+        """
+        Returns:
+            list: (yol, boyut, son_kullanım) üçlüleri, en eski kullanılan başta.
+        """
+        entries = []
+        for name in os.listdir(self.cache_folder):
+            if not name.endswith(self.FILE_EXTENSION):
+                continue
+            path = os.path.join(self.cache_folder, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        entries.sort(key=lambda entry: entry[2])
+        return entries
+
+    def total_bytes(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, keep=None):
+        """
+        Toplam boyut max_bytes'ın altına inene kadar en uzun süredir kullanılmayan kayıtları siler.
+
+        Args:
+            keep (str | None): Sınırı tek başına aşsa bile silinmeyecek kaydın anahtarı.
+
+        Returns:
+            int: Silinen kayıt sayısı.
+        """
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        keep_path = self._path(keep) if keep is not None else None
+        removed = 0
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep_path:
+                continue
+            if self._remove(path):
+                total -= size
+                removed += 1
+        if removed:
+            logger.info(f"Tespit önbelleğinden {removed} eski kayıt silindi.")
+        return removed
+
+    def clear(self):
+        for path, _, _ in self.entries():
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
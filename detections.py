@@ -0,0 +1,140 @@
+import numpy as np
+
+
+class Detection:
+    """
+    Detections içindeki tek bir satıra sözlük benzeri, salt okunur erişim sağlayan hafif görünüm.
+
+    Eski kodla uyumluluk için obj['id'], obj['box'], obj['center'] ve
+    'center' in obj kullanımlarını destekler; veri kopyalanmaz.
+    """
+
+    __slots__ = ('_detections', '_index')
+
+    KEYS = ('id', 'box', 'center')
+
+    def __init__(self, detections, index):
+        self._detections = detections
+        self._index = index
+
+    def __getitem__(self, key):
+        if key == 'id':
+            return int(self._detections.ids[self._index])
+        if key == 'box':
+            return tuple(float(v) for v in self._detections.boxes[self._index])
+        if key == 'center':
+            return tuple(int(v) for v in self._detections.centers[self._index])
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self.KEYS
+
+    def get(self, key, default=None):
+        return self[key] if key in self.KEYS else default
+
+    def keys(self):
+        return self.KEYS
+
+    def to_dict(self):
+        return {key: self[key] for key in self.KEYS}
+
+    def __repr__(self):
+        return f"Detection({self.to_dict()})"
+
+
+class Detections:
+    """
+    Bir karedeki takip edilen nesneleri sütun bazlı (columnar) NumPy dizileriyle tutan yapı.
+
+    Attributes:
+        ids (np.ndarray): (N,) int64 takip ID'leri.
+        boxes (np.ndarray): (N, 4) float32 kutular (x1, y1, x2, y2).
+        centers (np.ndarray): (N, 2) int32 kutu merkezleri (x, y).
+    """
+
+    __slots__ = ('ids', 'boxes', 'centers')
+
+    def __init__(self, ids=None, boxes=None, centers=None):
+        self.ids = np.asarray(ids if ids is not None else [], dtype=np.int64).reshape(-1)
+        self.boxes = np.asarray(boxes if boxes is not None else [], dtype=np.float32).reshape(-1, 4)
+        if centers is None:
+            # int() ile aynı davranış: merkez koordinatları aşağı yuvarlanır (pozitif değerler için)
+            centers = (self.boxes[:, :2] + self.boxes[:, 2:]) / 2
+        self.centers = np.asarray(centers).astype(np.int32, copy=False).reshape(-1, 2)
+
+    @classmethod
+    def empty(cls):
+        return cls()
+
+    @classmethod
+    def from_dicts(cls, tracked_objects):
+        """
+        Eski biçimdeki sözlük listesinden Detections oluşturur. 'box' isteğe bağlıdır (sayaç eskiden
+        yalnızca 'id' ve 'center' bekliyordu); verilmeyen nesnelerin kutusu merkezdeki sıfır boyutlu kutudur.
+        """
+        tracked_objects = list(tracked_objects)
+        if not tracked_objects:
+            return cls.empty()
+        ids = [obj['id'] for obj in tracked_objects]
+        centers = [obj['center'] for obj in tracked_objects]
+        boxes = [obj.get('box') or (x, y, x, y) for obj, (x, y) in zip(tracked_objects, centers)]
+        return cls(ids, boxes, centers)
+
+    @property
+    def areas(self):
+        """
+        Kutu alanları (N,); ısı haritasında nokta ağırlığı olarak kullanılabilir.
+        """
+        return (self.boxes[:, 2] - self.boxes[:, 0]) * (self.boxes[:, 3] - self.boxes[:, 1])
+
+    def to_dicts(self):
+        """
+        Sözlük listesi biçimine çevirir (JSON çıktısı veya eski API'ler için).
+        """
+        return [detection.to_dict() for detection in self]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return Detection(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield Detection(self, index)
+
+    def __repr__(self):
+        return f"Detections(n={len(self)})"
+
+
+def as_detections(tracked_objects):
+    """
+    Detections nesnesini olduğu gibi döndürür; sözlük listesi verilirse Detections'a çevirir.
+    """
+    if isinstance(tracked_objects, Detections):
+        return tracked_objects
+    return Detections.from_dicts(tracked_objects)
+
+
+def match_ids(query_ids, reference_ids):
+    """
+    query_ids içindeki her ID'nin reference_ids içindeki satırını vektörel olarak bulur.
+
+    Returns:
+        tuple: (found, rows) - found: (N,) bool maske, rows: (N,) satır indeksleri
+            (found False olan yerlerde anlamsızdır).
+    """
+    query_ids = np.asarray(query_ids)
+    reference_ids = np.asarray(reference_ids)
+    if len(reference_ids) == 0 or len(query_ids) == 0:
+        return np.zeros(len(query_ids), dtype=bool), np.zeros(len(query_ids), dtype=np.intp)
+
+    order = np.argsort(reference_ids, kind='stable')
+    sorted_ids = reference_ids[order]
+    positions = np.minimum(np.searchsorted(sorted_ids, query_ids), len(sorted_ids) - 1)
+    found = sorted_ids[positions] == query_ids
+    return found, order[positions]
@@ -1,76 +1,264 @@
-import collections
+from collections import deque
 from datetime import datetime
 
+import numpy as np
+from detections import as_detections
+from track_state import TrackStateStore
+
+# Yalnızca Y konumuyla verilen yatay çizginin iki yana uzantısı (piksel). Eski tek çizgili sayaç gibi
+# kare genişliğinden bağımsız, fiilen sonsuz bir çizgi elde edilir.
+HORIZONTAL_LINE_EXTENT = 1e9
+
+# Kaybolan bir izin durumunun (son konum, sayıldı bilgisi) korunacağı kare sayısı; BoT-SORT'un
+# kayıp izleri bekletme süresiyle (track_buffer) aynı
+LOST_TRACK_GRACE_FRAMES = 30
+
+# Bellekte tutulan son giriş/çıkış logu sayısı (her biri için); daha eskileri yalnızca event_sink'e gider
+MAX_KEPT_LOGS = 10000
+
+
+class CountingLine:
+    """
+    Sayım çizgisi: iki noktalı bir doğru parçası veya çok noktalı kırık çizgi (polyline), piksel koordinatlarında.
+
+    Geçiş yönü çizginin çiziliş yönüne (ilk noktadan son noktaya) göre belirlenir: çizgi boyunca
+    ilerleyen birinin solundan sağına geçiş giriş, sağından soluna geçiş çıkıştır. Soldan sağa
+    çizilmiş yatay bir çizgide bu, yukarıdan aşağı geçişin giriş sayıldığı eski davranışın aynısıdır.
+    """
+
+    def __init__(self, points, name=None):
+        """
+        Args:
+            points (list): En az iki (x, y) noktası.
+            name (str | None): Raporlarda ve loglarda görünen ad.
+        """
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if len(self.points) < 2:
+            raise ValueError(f"Sayım çizgisinin en az iki noktası olmalıdır: {self.points.tolist()}")
+        self.name = name
+
+    @classmethod
+    def horizontal(cls, y, name=None):
+        """
+        Karenin bir ucundan diğerine uzanan, soldan sağa çizilmiş yatay çizgi.
+        """
+        return cls([(-HORIZONTAL_LINE_EXTENT, y), (HORIZONTAL_LINE_EXTENT, y)], name=name)
+
+    @classmethod
+    def parse(cls, text, name=None):
+        """
+        "x1,y1 x2,y2 ..." biçimindeki metinden çizgi oluşturur (komut satırı ve arayüz ayarları için).
+        """
+        try:
+            points = [tuple(float(value) for value in point.split(',')) for point in text.split()]
+        except ValueError:
+            points = None
+        if not points or any(len(point) != 2 for point in points):
+            raise ValueError(f"Geçersiz sayım çizgisi: '{text}'. Beklenen biçim: 'x1,y1 x2,y2 ...'")
+        return cls(points, name=name)
+
+    def drawing_points(self, frame_shape):
+        """
+        Çizim için kare sınırlarına kırpılmış tamsayı noktalar ((K, 2) int32).
+        """
+        height, width = frame_shape[:2]
+        return np.clip(self.points, 0, [width, height]).astype(np.int32)
+
 
 class EntryExitCounter:
     """
-    Belirlenen bir sanal çizgiyi geçen nesnelerin yönüne göre
+    Bir veya birden fazla sanal çizgiyi (doğru parçası veya kırık çizgi) geçen nesnelerin yönüne göre
     giriş ve çıkışlarını sayan ve yeni olayları bildiren sınıf.
+
+    Her karede tüm izlerin önceki ve şimdiki merkezini birleştiren hareket parçası, tüm çizgilerin
+    tüm parçalarıyla tek seferde (vektörel) kesiştirilir; iz ve çizgi sayısı arttıkça Python döngüsü
+    büyümez. Bir iz, takipte kaldığı sürece her çizgide en fazla bir kez sayılır.
+
+    İz durumu slot tabanlı TrackStateStore'da tutulur: kaybolan iz lost_track_grace kare bekletilir,
+    sonra slotu yeniden kullanılır. Loglar sınırlı kuyruklarda tutulur ve event_sink'e aktarılır;
+    böylece 7/24 çalışmada bellek sabit kalır.
     """
 
-    def __init__(self, line_y_position):
+    def __init__(self, line_y_position=None, lines=None, lost_track_grace=LOST_TRACK_GRACE_FRAMES,
+                 max_logs=MAX_KEPT_LOGS, event_sink=None):
+        """
+        Args:
+            line_y_position (int | None): Tek yatay sayım çizgisinin Y konumu (piksel). lines ile birlikte
+                verilirse ilk çizgi (line_id 0) olur.
+            lines (list of CountingLine | None): Sayım çizgileri. Çizginin numarası (line_id, veritabanında
+                olaylarla birlikte saklanır) tüm çizgiler içindeki sırasıdır.
+            lost_track_grace (int): Görünmeyen bir izin durumunun korunacağı kare sayısı. Bu süre içinde
+                aynı ID ile geri gelen iz kaldığı konumdan devam eder ve yeniden sayılmaz. 0: hemen sil.
+            max_logs (int | None): entry_logs ve exit_logs'ta tutulacak en fazla log sayısı. None: sınırsız.
+            event_sink (callable | None): Her olayda sink(event_type, track_id, line_id, log_text) ile
+                çağrılır; tüm logların kalıcı olarak yazılması (dosya, veritabanı) için kullanılır.
+        """
         self.line_y = line_y_position
+        self.lines = []
+        if line_y_position is not None:
+            self.lines.append(CountingLine.horizontal(line_y_position))
+        self.lines.extend(lines or [])
+        if not self.lines:
+            raise ValueError("En az bir sayım çizgisi verilmelidir.")
+
         self.entries = 0
         self.exits = 0
+        self.line_entries = np.zeros(len(self.lines), dtype=np.int64)
+        self.line_exits = np.zeros(len(self.lines), dtype=np.int64)
 
-        # Streamlit arayüzünde anlık logları göstermek için bu listeleri koruyoruz.
-        self.entry_logs = []
-        self.exit_logs = []
+        # Streamlit arayüzünde ve raporlarda gösterilen son loglar (sınırlı kuyruk)
+        self._entry_logs = deque(maxlen=max_logs)
+        self._exit_logs = deque(maxlen=max_logs)
+        self.event_sink = event_sink
+        # Son update çağrısının döndürdüğü olayların çizgi numaraları (olay listesiyle aynı sırada)
+        self.last_event_line_ids = []
 
-        self.track_history = collections.defaultdict(lambda: collections.deque(maxlen=2))
-        self.counted_ids = set()
+        # Tüm çizgilerin parçaları tek dizide, bileşen bileşen: başlangıç noktası (x, y) ve yön vektörü.
+        # Parçalar çizgi sırasıyla dizildiği için her çizginin ilk parçasının indeksi np.add.reduceat ile
+        # çizgi bazında toplamaya yeter.
+        starts = [line.points[:-1] for line in self.lines]
+        ends = [line.points[1:] for line in self.lines]
+        segment_starts = np.concatenate(starts)
+        segment_vectors = np.concatenate(ends) - segment_starts
+        self._start_x, self._start_y = segment_starts[:, 0].copy(), segment_starts[:, 1].copy()
+        self._vector_x, self._vector_y = segment_vectors[:, 0].copy(), segment_vectors[:, 1].copy()
+        # Çapraz çarpımın iz konumundan bağımsız kısmı: cross(v, p - a) = p_y*v_x - p_x*v_y - (a_y*v_x - a_x*v_y)
+        self._side_offset = self._start_y * self._vector_x - self._start_x * self._vector_y
+        self._line_first_segment = np.cumsum([0] + [len(segment) for segment in starts[:-1]])
+
+        # İz başına son görülen merkez ve her çizgi için olay sayılıp sayılmadığı
+        self._tracks = TrackStateStore(grace_frames=lost_track_grace)
+        self._tracks.add_field('center', shape=(2,), dtype=np.int32)
+        self._tracks.add_field('counted', shape=(len(self.lines),), dtype=bool, fill=False)
+
+    @property
+    def entry_logs(self):
+        return list(self._entry_logs)
+
+    @property
+    def exit_logs(self):
+        return list(self._exit_logs)
+
+    def _crossing_directions(self, prev_centers, centers):
+        """
+        Her hareket parçasının (önceki merkez -> şimdiki merkez) her çizgiyi hangi yönde geçtiğini bulur.
+
+        Returns:
+            np.ndarray: (N, çizgi sayısı) int: +1 giriş, -1 çıkış, 0 geçiş yok.
+        """
+        prev_x, prev_y = (prev_centers[:, i:i + 1].astype(np.float64) for i in (0, 1))
+        now_x, now_y = (centers[:, i:i + 1].astype(np.float64) for i in (0, 1))
+
+        # Önceki ve şimdiki merkezin her parçanın hangi tarafında olduğu: cross(v, p - a) işareti (<0: sol).
+        # (N, 1) x (S,) yayınlamasıyla tüm iz-parça çiftleri tek seferde hesaplanır.
+        side_prev = prev_y * self._vector_x - prev_x * self._vector_y - self._side_offset
+        side_now = now_y * self._vector_x - now_x * self._vector_y - self._side_offset
+
+        # Yatay çizgideki eski kuralın genellemesi: giriş prev < çizgi <= şimdiki, çıkış prev > çizgi >= şimdiki
+        entering = (side_prev < 0) & (side_now >= 0)
+        exiting = (side_prev > 0) & (side_now <= 0)
+
+        # Çizginin doğrusunu geçen az sayıdaki aday çift için parçanın kendisinin kesildiğini doğrula:
+        # parçanın uçları hareket doğrusunun farklı taraflarında (veya üzerinde) olmalı
+        rows, segments = np.nonzero(entering | exiting)
+        if len(rows):
+            motion_x = now_x[rows, 0] - prev_x[rows, 0]
+            motion_y = now_y[rows, 0] - prev_y[rows, 0]
+            to_start_x = self._start_x[segments] - prev_x[rows, 0]
+            to_start_y = self._start_y[segments] - prev_y[rows, 0]
+            side_start = motion_x * to_start_y - motion_y * to_start_x
+            side_end = (motion_x * (to_start_y + self._vector_y[segments])
+                        - motion_y * (to_start_x + self._vector_x[segments]))
+            outside = side_start * side_end > 0
+            entering[rows[outside], segments[outside]] = False
+            exiting[rows[outside], segments[outside]] = False
+
+        signed = entering.astype(np.int32) - exiting.astype(np.int32)
+        # Kırık çizginin ortak köşesinden geçen hareket iki parçayı aynı yönde keser; tek olay sayılır
+        return np.sign(np.add.reduceat(signed, self._line_first_segment, axis=1))
 
     def update(self, tracked_objects):
         """
-        Takip edilen nesneleri günceller, çizgiyi geçenleri sayar ve
+        Takip edilen nesneleri günceller, çizgileri geçenleri sayar ve
         yeni gerçekleşen olayların bir listesini döndürür.
 
         Args:
-            tracked_objects (list of dicts): Her nesnenin 'id' ve 'center' bilgilerini içeren liste.
+            tracked_objects (Detections | list of dicts): Her nesnenin 'id' ve 'center' bilgilerini içeren yapı.
 
         Returns:
             list: O anki karede yeni gerçekleşen olayların listesi (örn: ['Giriş', 'Çıkış']).
+                Olayların çizgi numaraları aynı sırayla last_event_line_ids'dedir.
         """
-        # YENİ: Bu fonksiyonda gerçekleşen yeni olayları tutmak için boş bir liste
-        new_events_this_frame = []
-
-        current_ids = {obj['id'] for obj in tracked_objects}
+        detections = as_detections(tracked_objects)
+        ids = detections.ids
+        centers = detections.centers
+        num_lines = len(self.lines)
 
-        for obj in tracked_objects:
-            obj_id = obj['id']
-            center_y = obj['center'][1]
+        # Her izin slotunu vektörel olarak bul (yeni izlere slot ayrılır, sayıldı bilgisi sıfırdır)
+        slots, known = self._tracks.observe(ids)
+        last_centers = self._tracks.field('center')
+        counted = self._tracks.field('counted')
+        already_counted = counted[slots]
+        directions = np.zeros((len(ids), num_lines), dtype=np.int32)
+        if known.any():
+            # YÖN KONTROLÜ (yalnızca daha önce görülmüş izler için, son görüldüğü konumdan)
+            directions[known] = self._crossing_directions(last_centers[slots[known]], centers[known])
 
-            self.track_history[obj_id].append(center_y)
+        entry_mask = (directions > 0) & ~already_counted
+        exit_mask = (directions < 0) & ~already_counted
 
-            if len(self.track_history[obj_id]) == 2 and obj_id not in self.counted_ids:
-                prev_y = self.track_history[obj_id][0]
-
-                # YÖN KONTROLÜ
-                if prev_y < self.line_y and center_y >= self.line_y:
+        # Bu fonksiyonda gerçekleşen yeni olaylar, nesnelerin kare içindeki sırasıyla
+        # (aynı nesnede çizgi sırasıyla) raporlanır
+        new_events_this_frame = []
+        self.last_event_line_ids = []
+        event_rows, event_lines = np.nonzero(entry_mask | exit_mask)
+        if len(event_rows):
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            for index, line_id in zip(event_rows.tolist(), event_lines.tolist()):
+                obj_id = int(ids[index])
+                # Tek çizgide log metni eski biçimle aynı kalır
+                suffix = f" ({self.line_label(line_id)})" if num_lines > 1 else ""
+                if entry_mask[index, line_id]:
                     # GİRİŞ olayı
+                    event = 'Giriş'
                     self.entries += 1
-                    self.counted_ids.add(obj_id)
-                    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    self.entry_logs.append(f"{timestamp}: ID {obj_id} giriş yaptı.")
-
-                    # YENİ: Yeni olayı listeye ekle
-                    new_events_this_frame.append('Giriş')
-
-                elif prev_y > self.line_y and center_y <= self.line_y:
+                    self.line_entries[line_id] += 1
+                    log_text = f"{timestamp}: ID {obj_id} giriş yaptı{suffix}."
+                    self._entry_logs.append(log_text)
+                else:
                     # ÇIKIŞ olayı
+                    event = 'Çıkış'
                     self.exits += 1
-                    self.counted_ids.add(obj_id)
-                    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    self.exit_logs.append(f"{timestamp}: ID {obj_id} çıkış yaptı.")
+                    self.line_exits[line_id] += 1
+                    log_text = f"{timestamp}: ID {obj_id} çıkış yaptı{suffix}."
+                    self._exit_logs.append(log_text)
+                new_events_this_frame.append(event)
+                self.last_event_line_ids.append(line_id)
+                if self.event_sink is not None:
+                    self.event_sink(event, obj_id, line_id, log_text)
 
-                    # YENİ: Yeni olayı listeye ekle
-                    new_events_this_frame.append('Çıkış')
+        last_centers[slots] = centers
+        counted[slots] = already_counted | entry_mask | exit_mask
+        # Bekleme süresi dolan izlerin slotları boşaltılır (sayıldı bilgisi de sıfırlanır)
+        self._tracks.expire()
 
-        lost_ids = set(self.track_history.keys()) - current_ids
-        for lost_id in lost_ids:
-            self.counted_ids.discard(lost_id)
-            del self.track_history[lost_id]
-
-        # DEĞİŞTİ: Yeni olayların listesini döndür
         return new_events_this_frame
 
+    def memory_stats(self):
+        """
+        Returns:
+            dict: İz deposunun durumu (capacity, tracks, expired) ve bellekte tutulan log sayısı.
+        """
+        return {**self._tracks.stats(), 'kept_logs': len(self._entry_logs) + len(self._exit_logs)}
+
+    def line_label(self, line_id):
+        return self.lines[line_id].name or f"çizgi {line_id}"
+
+    def line_counts(self):
+        """
+        Returns:
+            list: Çizgi başına {'line_id', 'name', 'entries', 'exits'} sözlükleri.
+        """
+        return [{'line_id': line_id, 'name': self.line_label(line_id),
+                 'entries': int(self.line_entries[line_id]), 'exits': int(self.line_exits[line_id])}
+                for line_id in range(len(self.lines))]
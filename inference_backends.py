@@ -0,0 +1,198 @@
+import glob
+import os
+
+import cv2
+import numpy as np
+from logger_config import logger
+
+# Desteklenen çıkarım arka uçları
+BACKEND_TORCH = 'torch'            # PyTorch (.pt), varsayılan
+BACKEND_ONNX = 'onnx'              # ONNX Runtime, CPU
+BACKEND_ONNX_INT8 = 'onnx_int8'    # ONNX Runtime, INT8 nicemlenmiş (quantized) model
+BACKEND_OPENVINO = 'openvino'      # Intel OpenVINO, CPU
+BACKENDS = (BACKEND_TORCH, BACKEND_ONNX, BACKEND_ONNX_INT8, BACKEND_OPENVINO)
+
+# Dışa aktarılan modellerin en uzun kenar boyutu (YOLOv8 eğitim boyutu). Modeller dinamik girişle
+# aktarılır: 16:9 bir kare 640x640 yerine, PyTorch yolundaki gibi 640x384'e sığdırılarak işlenir.
+EXPORT_IMAGE_SIZE = 640
+# Dinamik girişte kenarların katı olması gereken model adımı (stride)
+MODEL_STRIDE = 32
+
+# INT8 kalibrasyonunda kullanılan varsayılan video ve kare sayısı
+DEFAULT_CALIBRATION_VIDEO = os.path.join('video', 'giris_cikis.mp4')
+DEFAULT_CALIBRATION_FRAMES = 64
+
+
+def exported_model_path(model_path, backend):
+    """
+    Bir .pt modelinin verilen arka uç için dışa aktarılmış dosyasının (veya klasörünün) yolunu döndürür.
+    Dosyalar modelin yanına yazılır: yolov8m.onnx, yolov8m_int8.onnx, yolov8m_openvino_model/.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Geçersiz çıkarım arka ucu: {backend}. Geçerli değerler: {BACKENDS}")
+    base, _ = os.path.splitext(model_path)
+    if backend == BACKEND_ONNX:
+        return f"{base}.onnx"
+    if backend == BACKEND_ONNX_INT8:
+        return f"{base}_int8.onnx"
+    if backend == BACKEND_OPENVINO:
+        return f"{base}_openvino_model"
+    return model_path
+
+
+def _is_up_to_date(exported_path, source_path):
+    if not os.path.exists(exported_path):
+        return False
+    if not os.path.exists(source_path):
+        return True
+    return os.path.getmtime(exported_path) >= os.path.getmtime(source_path)
+
+
+def resolve_model(model_path, backend=BACKEND_TORCH, calibration_video=DEFAULT_CALIBRATION_VIDEO,
+                  calibration_frames=DEFAULT_CALIBRATION_FRAMES):
+    """
+    Arka uç için yüklenecek model yolunu döndürür; dışa aktarılmış model yoksa veya .pt dosyasından
+    eskiyse önce dışa aktarır. Sonraki çağrılar diskteki dosyayı kullanır.
+
+    Args:
+        model_path (str): PyTorch (.pt) model dosyası.
+        backend (str): BACKENDS değerlerinden biri.
+        calibration_video (str | None): INT8 statik nicemleme için kalibrasyon karelerinin videosu.
+            None ise veya dosya yoksa dinamik nicemleme (yalnızca ağırlıklar) uygulanır.
+        calibration_frames (int): Kalibrasyonda kullanılacak kare sayısı.
+
+    Returns:
+        str: YOLO(...) ile yüklenebilecek model yolu.
+    """
+    target_path = exported_model_path(model_path, backend)
+    if backend == BACKEND_TORCH or _is_up_to_date(target_path, model_path):
+        return target_path
+
+    from ultralytics import YOLO
+
+    if backend == BACKEND_OPENVINO:
+        logger.info(f"Model OpenVINO biçimine aktarılıyor: {model_path}")
+        exported = YOLO(model_path).export(format='openvino', imgsz=EXPORT_IMAGE_SIZE, dynamic=True)
+        return str(exported)
+
+    onnx_path = exported_model_path(model_path, BACKEND_ONNX)
+    if not _is_up_to_date(onnx_path, model_path):
+        logger.info(f"Model ONNX biçimine aktarılıyor: {model_path}")
+        onnx_path = str(YOLO(model_path).export(format='onnx', imgsz=EXPORT_IMAGE_SIZE, dynamic=True,
+                                                 simplify=True))
+    if backend == BACKEND_ONNX:
+        return onnx_path
+
+    quantize_onnx(onnx_path, target_path, calibration_video, calibration_frames)
+    return target_path
+
+
+def letterbox(frame, size=EXPORT_IMAGE_SIZE, stride=MODEL_STRIDE):
+    """
+    Kareyi en-boy oranını koruyarak en uzun kenarı size olacak şekilde küçültür ve kenarları stride'ın
+    katına tamamlanana kadar gri (114) ile doldurur; Ultralytics'in dinamik girişli modellerde
+    uyguladığı dikdörtgen (rect) ön işlemenin aynısıdır.
+
+    Returns:
+        np.ndarray: (1, 3, H, W) float32, RGB, 0-1 aralığında.
+    """
+    height, width = frame.shape[:2]
+    scale = min(size / height, size / width)
+    new_width, new_height = int(round(width * scale)), int(round(height * scale))
+    resized = cv2.resize(frame, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+    padded_height = -(-new_height // stride) * stride
+    padded_width = -(-new_width // stride) * stride
+    canvas = np.full((padded_height, padded_width, 3), 114, dtype=np.uint8)
+    top, left = (padded_height - new_height) // 2, (padded_width - new_width) // 2
+    canvas[top:top + new_height, left:left + new_width] = resized
+    return np.ascontiguousarray(canvas[:, :, ::-1].transpose(2, 0, 1))[None].astype(np.float32) / 255.0
+
+
+class _VideoCalibrationReader:
+    """
+    ONNX Runtime statik nicemlemesi için videodan eşit aralıklı kareler sağlayan kalibrasyon okuyucu.
+    """
+
+    def __init__(self, video_path, input_name, num_frames):
+        cap = cv2.VideoCapture(video_path)
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or num_frames
+        wanted = set(np.linspace(0, max(0, total - 1), num_frames).astype(int).tolist())
+        self._samples = []
+        frame_index = 0
+        while len(self._samples) < len(wanted):
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if frame_index in wanted:
+                self._samples.append({input_name: letterbox(frame)})
+            frame_index += 1
+        cap.release()
+        self._iterator = iter(self._samples)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def get_next(self):
+        return next(self._iterator, None)
+
+
+def quantize_onnx(onnx_path, output_path, calibration_video=DEFAULT_CALIBRATION_VIDEO,
+                  calibration_frames=DEFAULT_CALIBRATION_FRAMES):
+    """
+    ONNX modelini INT8'e nicemler. Kalibrasyon videosu varsa aktivasyonlar da nicemlenir (statik, QDQ);
+    yoksa yalnızca ağırlıklar nicemlenir (dinamik).
+    """
+    try:
+        from onnxruntime.quantization import (CalibrationMethod, QuantFormat, QuantType, quantize_dynamic,
+                                              quantize_static)
+        import onnxruntime
+    except ImportError as e:
+        raise ImportError("INT8 nicemleme için 'onnxruntime' paketi gerekli: pip install onnxruntime") from e
+
+    if calibration_video and os.path.exists(calibration_video):
+        input_name = onnxruntime.InferenceSession(onnx_path, providers=['CPUExecutionProvider']).get_inputs()[0].name
+        reader = _VideoCalibrationReader(calibration_video, input_name, calibration_frames)
+        logger.info(f"ONNX modeli {len(reader)} kalibrasyon karesiyle INT8'e nicemleniyor: {output_path}")
+        quantize_static(onnx_path, output_path, reader, quant_format=QuantFormat.QDQ, per_channel=True,
+                        activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8,
+                        calibrate_method=CalibrationMethod.MinMax)
+    else:
+        logger.warning("Kalibrasyon videosu bulunamadı; yalnızca ağırlıklar nicemleniyor (dinamik INT8).")
+        quantize_dynamic(onnx_path, output_path, weight_type=QuantType.QUInt8)
+
+
+def configure_threads(model, model_path, num_threads):
+    """
+    Yüklenmiş ve ısıtılmış (predictor'ı kurulmuş) bir YOLO modelinin çıkarım thread sayısını ayarlar.
+
+    PyTorch'ta süreç geneli torch.set_num_threads kullanılır. ONNX Runtime ve OpenVINO oturumları
+    Ultralytics tarafından thread ayarı verilmeden oluşturulduğu için, aynı model dosyasından
+    thread sayısı belirtilmiş yeni bir oturum açılıp eskisinin yerine konur.
+    """
+    if not num_threads:
+        return
+    backend_model = getattr(getattr(model, 'predictor', None), 'model', None)
+    # Yeni Ultralytics sürümlerinde oturum AutoBackend.backend altında, eskilerde AutoBackend'in kendisindedir
+    runtime = getattr(backend_model, 'backend', backend_model)
+
+    try:
+        if hasattr(runtime, 'session'):
+            import onnxruntime
+            options = onnxruntime.SessionOptions()
+            options.intra_op_num_threads = num_threads
+            options.inter_op_num_threads = 1
+            runtime.session = onnxruntime.InferenceSession(model_path, sess_options=options,
+                                                           providers=['CPUExecutionProvider'])
+        elif hasattr(runtime, 'ov_compiled_model'):
+            import openvino as ov
+            xml_files = glob.glob(os.path.join(model_path, '*.xml')) if os.path.isdir(model_path) else [model_path]
+            core = ov.Core()
+            runtime.ov_compiled_model = core.compile_model(
+                core.read_model(xml_files[0]), 'CPU',
+                {'INFERENCE_NUM_THREADS': num_threads, 'PERFORMANCE_HINT': 'LATENCY'}
+            )
+        else:
+            import torch
+            torch.set_num_threads(num_threads)
+    except (ImportError, AttributeError, IndexError, RuntimeError) as e:
+        logger.warning(f"Çıkarım thread sayısı ayarlanamadı, varsayılan kullanılıyor: {e}")
@@ -1,10 +1,18 @@
 # main.py (Tüm Özellikleri İçeren Tam Kod)
 
+import time
+
 import cv2
 from video_stream_manager import VideoStreamManager
 from person_detect_and_tracking_engine import PersonTrackingEngine
 from density_map_generator import DensityMapGenerator
-from entry_exit_counter import EntryExitCounter
+from entry_exit_counter import CountingLine, EntryExitCounter
+from annotation_renderer import AnnotationRenderer
+from region_of_interest import RegionOfInterest
+from adaptive_image_size import AdaptiveImageSize
+from motion_gate import MotionGate
+from zone_analytics import ZoneAnalyzer
+from profiler import profiler
 
 def main():
     # --- PROJE AYARLARI: Buradaki değerleri kendi videonuza göre değiştirin ---
@@ -18,72 +26,177 @@ def main():
     # Videonuzdaki sayım çizgisinin Y-eksenindeki piksel konumu.
     # Bu çizgiyi videonuzun en uygun yerine (örn: kapı eşiği) yerleştirin.
     GIRIS_CIKIS_CIZGISI_Y = 450
+    # Yatay çizgiye ek sayım çizgileri: piksel köşelerinden oluşan doğru parçası veya kırık çizgi.
+    # Çizginin çiziliş yönünün solundan sağına geçiş giriş sayılır. Örn: [[(100, 400), (600, 400), (900, 250)]]
+    EK_SAYIM_CIZGILERI = []
 
     # 3. Yoğunluk Haritası Ayarları
     # Isının ne kadar geniş bir alana yayılacağını belirler. Daha büyük değerler daha yayvan alanlar oluşturur. (Tek sayı olmalı)
     HEATMAP_BLUR_KERNEL = 61
     # Haritanın kontrastını ayarlar. Düşük değerler daha fazla alanı 'sıcak' gösterir. (%90-99 arası idealdir)
     HEATMAP_CLIPPING_PERCENTILE = 98
+    # Isı matrisinin hücre boyutu (piksel). 1: tam çözünürlük. Örn. 8 ile bellek 64 kat azalır,
+    # harita yalnızca çizilirken kare boyutuna büyütülür.
+    HEATMAP_CELL_SIZE = 4
+    # Haritanın zaman modu: 'cumulative' (tüm oturum), 'window' (son HEATMAP_PENCERE_SN saniye)
+    # veya 'decay' (HEATMAP_YARI_OMUR_SN yarı ömrüyle üstel sönüm).
+    HEATMAP_MODU = 'cumulative'
+    HEATMAP_PENCERE_SN = 15 * 60
+    HEATMAP_YARI_OMUR_SN = 5 * 60
+    # Analiz sürerken canlı ısı haritası penceresinin kaç saniyede bir yenileneceği. 0: kapalı.
+    CANLI_HEATMAP_YENILEME_SN = 0
+
+    # 4. Kare Ön Yükleme (Prefetch) Ayarları
+    # Kareler arka planda çözülerek tampona alınır; böylece çözme ve model çıkarımı paralel çalışır.
+    ON_YUKLEME_AKTIF = True
+    ON_YUKLEME_TAMPON_BOYUTU = 8
+
+    # 5. Kare Atlama Ayarları
+    # Tam tespit kaç karede bir yapılsın? 1: her kare. Daha büyük değerlerde aradaki kareler
+    # için izler son hızlarına göre ilerletilir (daha hızlı, biraz daha az hassas).
+    TESPIT_ARALIGI = 1
+
+    # 6. Önizleme Ayarları
+    # Canlı pencere saniyede en fazla kaç kez çizilsin? None: her kare, 0: çizim kapalı.
+    ONIZLEME_FPS = None
+
+    # 7. Profil (Performans Ölçümü) Ayarları
+    # Aşama sürelerini (kare çözme, model.track, sayaç, ısı haritası...) ölçer ve p50/p95/p99 değerlerini
+    # raporlar. Metrikler Prometheus metin formatında PROFIL_METRIK_DOSYASI'na yazılır (None: yazılmaz).
+    PROFIL_AKTIF = False
+    PROFIL_METRIK_DOSYASI = None
+
+    # 8. Çıkarım Arka Ucu Ayarları
+    # 'torch' (PyTorch), 'onnx' (ONNX Runtime), 'onnx_int8' (INT8 nicemlenmiş ONNX) veya 'openvino'.
+    # GPU'suz sunucularda 'onnx' ya da 'openvino' genellikle daha hızlıdır; model ilk çalıştırmada
+    # dışa aktarılıp modelin yanına kaydedilir. Thread sayısı None ise arka ucun varsayılanı kullanılır.
+    CIKARIM_ARKA_UCU = 'torch'
+    CIKARIM_THREAD_SAYISI = None
+
+    # 9. İlgi Bölgesi (ROI) ve Giriş Çözünürlüğü Ayarları
+    # Model karenin tamamı yerine yalnızca bu bölgeleri kapsayan kesit üzerinde çalışır; geniş açılı
+    # kameralarda işlenen piksel sayısı ve CPU süresi büyük ölçüde azalır. Çokgen köşeleri kare
+    # genişliğinin/yüksekliğinin kesridir (0-1). Örn. alt yarı: [[(0, 0.5), (1, 0.5), (1, 1), (0, 1)]]
+    ROI_POLIGONLARI = None
+    # Sayım çizgisinin altında ve üstünde bu kadar piksellik şerit de bölgeye eklenir. None: eklenmez.
+    ROI_CIZGI_BANDI_PIKSEL = None
+    # Modelin giriş çözünürlüğü sahnedeki kişi sayısına göre değişsin mi? (boş sahnede 320, kalabalıkta 640)
+    UYARLANIR_GIRIS_BOYUTU = False
+
+    # 10. Hareket Kapısı Ayarları
+    # Sahne (ROI varsa yalnızca bölge) son işlenen kareden beri değişmediyse YOLO çalıştırılmaz ve son
+    # takip sonuçları kullanılır; gece ve yoğun olmayan saatlerde CPU kullanımı büyük ölçüde düşer.
+    # Hareket olmasa da en geç HAREKET_KAPISI_EN_FAZLA_ATLAMA karede bir tespit yapılır.
+    HAREKET_KAPISI_AKTIF = False
+    HAREKET_KAPISI_EN_FAZLA_ATLAMA = 30
+
+    # 11. Bölge (Doluluk ve Kalış Süresi) Ayarları
+    # Anlık kişi sayısı ve kalış süresi dağılımı raporlanacak bölgeler (kuyruk alanı, kasa önü vb.).
+    # Köşeler kare boyutunun kesri (0-1). Örn: [[(0.0, 0.6), (0.4, 0.6), (0.4, 1.0), (0.0, 1.0)]]
+    BOLGELER = []
 
     # --- AYARLARIN SONU ---
 
 
+    if PROFIL_AKTIF:
+        profiler.enable()
+        if PROFIL_METRIK_DOSYASI:
+            profiler.start_file_exporter(PROFIL_METRIK_DOSYASI)
+
     # Gerekli modüllerden nesneleri oluşturma
-    stream_manager = VideoStreamManager(source=video_source)
+    stream_manager = VideoStreamManager(source=video_source, prefetch=ON_YUKLEME_AKTIF,
+                                        buffer_size=ON_YUKLEME_TAMPON_BOYUTU)
     if not stream_manager.start_stream():
         return
 
-    # Hız için 'yolov8n.pt' veya 'yolov8s.pt' modelini kullanmanızı tavsiye ederim.
-    # Bu ayarı person_detect_and_tracking_engine.py dosyasından yapabilirsiniz.
-    tracking_engine = PersonTrackingEngine()
-
     ret, first_frame = stream_manager.get_frame()
     if not ret:
         print("Video başlatılamadı veya ilk kare okunamadı.")
         stream_manager.stop_stream()
         return
 
+    # Çizgi şeridi piksel olarak verildiği için bölge ilk karenin yüksekliğine göre oluşturulur
+    roi_poligonlari = list(ROI_POLIGONLARI or [])
+    if ROI_CIZGI_BANDI_PIKSEL:
+        kare_yuksekligi = first_frame.shape[0]
+        roi_poligonlari += RegionOfInterest.band(GIRIS_CIKIS_CIZGISI_Y / kare_yuksekligi,
+                                                 ROI_CIZGI_BANDI_PIKSEL / kare_yuksekligi).polygons
+    roi = RegionOfInterest(roi_poligonlari) if roi_poligonlari else None
+
+    # Hız için 'yolov8n.pt' veya 'yolov8s.pt' modelini kullanmanızı tavsiye ederim.
+    # Bu ayarı person_detect_and_tracking_engine.py dosyasından yapabilirsiniz.
+    # Motor başsız çalışır; görselleştirme AnnotationRenderer ile ayrıca yapılır.
+    tracking_engine = PersonTrackingEngine(detect_interval=TESPIT_ARALIGI, render=False,
+                                           backend=CIKARIM_ARKA_UCU, num_threads=CIKARIM_THREAD_SAYISI,
+                                           roi=roi,
+                                           adaptive_imgsz=AdaptiveImageSize() if UYARLANIR_GIRIS_BOYUTU else None,
+                                           motion_gate=MotionGate(max_skip_frames=HAREKET_KAPISI_EN_FAZLA_ATLAMA)
+                                           if HAREKET_KAPISI_AKTIF else None)
+    renderer = AnnotationRenderer(max_fps=ONIZLEME_FPS)
+
     # Sınıfları ilgili parametrelerle başlat
     density_generator = DensityMapGenerator(
         frame_shape=first_frame.shape,
         blur_kernel_size=HEATMAP_BLUR_KERNEL,
-        clipping_percentile=HEATMAP_CLIPPING_PERCENTILE
+        clipping_percentile=HEATMAP_CLIPPING_PERCENTILE,
+        cell_size=HEATMAP_CELL_SIZE,
+        incremental=CANLI_HEATMAP_YENILEME_SN > 0,
+        mode=HEATMAP_MODU,
+        window_seconds=HEATMAP_PENCERE_SN,
+        half_life_seconds=HEATMAP_YARI_OMUR_SN
     )
-    counter = EntryExitCounter(line_y_position=GIRIS_CIKIS_CIZGISI_Y)
+    counter = EntryExitCounter(line_y_position=GIRIS_CIKIS_CIZGISI_Y,
+                               lines=[CountingLine(noktalar) for noktalar in EK_SAYIM_CIZGILERI])
+    bolge_analizi = ZoneAnalyzer(first_frame.shape, BOLGELER) if BOLGELER else None
 
     # Analize başlamak için video akışını başa al
     stream_manager.stop_stream()
     stream_manager.start_stream()
 
     print("Video işleniyor... (Durdurmak için 'q' tuşuna basın)")
+    son_canli_heatmap_zamani = time.perf_counter()
+    # Video dosyalarında zaman pencereli ısı haritası video zamanına göre ilerler
+    video_fps = stream_manager.cap.get(cv2.CAP_PROP_FPS)
+    kare_sayisi = 0
 
     # Ana video işleme döngüsü
     while True:
-        ret, frame = stream_manager.get_frame()
+        with profiler.stage('decode'):
+            ret, frame = stream_manager.get_frame()
         if not ret:
             print("Video işleme tamamlandı.")
             break
 
-        # 1. Kareyi işle: İnsanları takip et, kutuları ve ID'leri çiz
-        annotated_frame, person_count, tracked_objects = tracking_engine.process_frame(frame.copy())
+        # 1. Kareyi işle: İnsanları takip et (başsız mod, çizim yapılmaz)
+        _, person_count, detections = tracking_engine.process_frame(frame)
 
-        # 2. Yoğunluk haritası verilerini güncelle
-        # 'center' anahtarı olmayan nesneleri filtrele (nadiren de olsa olabilir)
-        points = [obj['center'] for obj in tracked_objects if 'center' in obj]
-        density_generator.add_points(points)
+        # 2. Yoğunluk haritası verilerini güncelle (merkezler doğrudan (N, 2) dizi olarak aktarılır)
+        kare_sayisi += 1
+        video_zamani = kare_sayisi / video_fps if video_fps > 0 and not stream_manager.is_live_source(video_source) else None
+        with profiler.stage('heatmap_add'):
+            density_generator.add_points(detections.centers, timestamp=video_zamani)
 
         # 3. Giriş/Çıkış sayacını güncelle
-        counter.update(tracked_objects)
-
-        # 4. Anlık sonuçları ekrana çizdir
-        # Sanal sayım çizgisi
-        cv2.line(annotated_frame, (0, GIRIS_CIKIS_CIZGISI_Y), (frame.shape[1], GIRIS_CIKIS_CIZGISI_Y), (0, 255, 255), 2)
-        # Sayaçlar
-        cv2.putText(annotated_frame, f"Giris: {counter.entries}", (50, 80), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 255, 0), 3)
-        cv2.putText(annotated_frame, f"Cikis: {counter.exits}", (50, 140), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 255), 3)
-
-        # Anlık işlenmiş görüntüyü göster
-        cv2.imshow("Canli Analiz", annotated_frame)
+        with profiler.stage('counter_update'):
+            counter.update(detections)
+        if bolge_analizi is not None:
+            with profiler.stage('zone_update'):
+                bolge_analizi.update(detections, timestamp=video_zamani)
+
+        # 4. Anlık sonuçları ekrana çizdir (hız sınırına göre; kapalıysa hiç çizilmez)
+        if renderer.should_render():
+            annotated_frame = renderer.render(frame, detections, counter)
+            if roi is not None:
+                roi.draw(annotated_frame)
+            if bolge_analizi is not None:
+                bolge_analizi.draw(annotated_frame)
+            cv2.imshow("Canli Analiz", annotated_frame)
+
+        # 5. Canlı yoğunluk haritasını belirli aralıklarla artımlı olarak yenile
+        if CANLI_HEATMAP_YENILEME_SN > 0 and time.perf_counter() - son_canli_heatmap_zamani >= CANLI_HEATMAP_YENILEME_SN:
+            son_canli_heatmap_zamani = time.perf_counter()
+            canli_heatmap = density_generator.generate_live_heatmap_image()
+            cv2.imshow("Canli Yogunluk Haritasi", cv2.addWeighted(first_frame, 0.2, canli_heatmap, 0.8, 0))
 
         if cv2.waitKey(1) & 0xFF == ord('q'):
             print("İşlem kullanıcı tarafından durduruldu.")
@@ -105,13 +218,33 @@ def main():
     print(f"\n--- Analiz Sonucu ---")
     print(f"Toplam Giris Yapan Sayisi: {counter.entries}")
     print(f"Toplam Cikis Yapan Sayisi: {counter.exits}")
+    if len(counter.lines) > 1:
+        for cizgi in counter.line_counts():
+            print(f"  {cizgi['name']}: giris {cizgi['entries']}, cikis {cizgi['exits']}")
+    if bolge_analizi is not None:
+        bolge_analizi.close_open_visits()
+        for bolge in bolge_analizi.zone_stats():
+            print(f"  {bolge['name']}: {bolge['visits']} ziyaret, kalis ort. {bolge['mean_dwell']:.1f} s, "
+                  f"p50 {bolge['p50_dwell']:.1f} s, p90 {bolge['p90_dwell']:.1f} s")
+    if tracking_engine.motion_gate is not None:
+        hareket = tracking_engine.motion_gate.stats()
+        print(f"Hareket kapısı: {hareket['skipped']}/{hareket['frames']} karede inference atlandı "
+              f"(%{hareket['skip_ratio'] * 100:.1f})")
     print("--------------------")
 
+    if profiler.enabled:
+        print("\n--- Aşama Süreleri (ms) ---")
+        print(profiler.format_summary())
+        profiler.stop_exporters()
+        if PROFIL_METRIK_DOSYASI:
+            profiler.write_metrics_file(PROFIL_METRIK_DOSYASI)
+
     # Sonuç penceresinin kapanmaması için bir tuşa basılmasını bekle
     cv2.waitKey(0)
 
     # Tüm kaynakları serbest bırak
     stream_manager.stop_stream()
+    tracking_engine.close()
     cv2.destroyAllWindows()
 
 
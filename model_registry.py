@@ -0,0 +1,155 @@
+import threading
+import time
+
+import numpy as np
+from inference_backends import configure_threads
+from logger_config import logger
+
+
+class ModelRegistry:
+    """
+    YOLO modellerini süreç başına bir kez yükleyip ısıtan (warm-up) ve oturumlar arasında paylaşan kayıt.
+
+    Model ağırlıkları her analizde diskten yeniden okunmaz: PersonTrackingEngine modeli acquire ile
+    alır, işi bitince release ile geri verir. Takipçi (tracker) durumu modelin üzerinde tutulduğu
+    için aynı model nesnesi aynı anda tek bir motor tarafından kullanılır; eşzamanlı ikinci bir
+    analiz için ayrı bir kopya yüklenir ve o da havuza eklenir. Geri verilen modelin takipçisi
+    sıfırlanır, böylece sonraki analiz önceki videonun izlerini devralmaz.
+
+    Havuz (model yolu, thread sayısı) çiftine göre tutulur; ONNX/OpenVINO modelleri de dışa aktarılmış
+    dosya yoluyla aynı şekilde paylaşılır. ultralytics içe aktarımı (torch dahil) ilk yüklemeye kadar ertelenir.
+    """
+
+    def __init__(self, warmup=True, warmup_size=640):
+        """
+        Args:
+            warmup (bool): Yüklenen modeli sahte bir kareyle bir kez çalıştırarak ilk çıkarımın
+                tembel başlatma maliyetlerini (predictor kurulumu, katman birleştirme, cihaz aktarımı)
+                yükleme anına taşır.
+            warmup_size (int): Isıtma karesinin kenar uzunluğu (piksel).
+        """
+        self.warmup = warmup
+        self.warmup_size = warmup_size
+        self._idle = {}
+        self._pending = {}
+        self._stats = {}
+        self._condition = threading.Condition()
+
+    def acquire(self, model_path, num_threads=None):
+        """
+        Kullanımda olmayan, ısıtılmış bir model döndürür; havuzda yoksa yükler.
+        Aynı model arka planda yükleniyorsa (preload) onun bitmesini bekler.
+
+        Args:
+            model_path (str): Model dosyası (.pt, .onnx veya OpenVINO klasörü).
+            num_threads (int | None): Çıkarım thread sayısı. None: arka ucun varsayılanı.
+        """
+        key = (model_path, num_threads)
+        with self._condition:
+            stats = self._model_stats(key)
+            while True:
+                idle = self._idle.get(key)
+                if idle:
+                    stats['hits'] += 1
+                    return idle.pop()
+                if not self._pending.get(key):
+                    break
+                self._condition.wait()
+            self._pending[key] = self._pending.get(key, 0) + 1
+
+        try:
+            return self._load(model_path, num_threads)
+        finally:
+            with self._condition:
+                self._pending[key] -= 1
+                self._condition.notify_all()
+
+    def release(self, model_path, model, num_threads=None):
+        """
+        Modeli havuza geri verir ve takipçi durumunu sıfırlar.
+        """
+        self._reset_tracker(model)
+        with self._condition:
+            self._idle.setdefault((model_path, num_threads), []).append(model)
+            self._condition.notify_all()
+
+    def preload(self, model_path, num_threads=None, background=False):
+        """
+        Modeli önceden yükleyip havuza koyar (örn. uygulama açılışında). Havuzda zaten varsa bir şey yapmaz.
+
+        Args:
+            background (bool): True ise yükleme ayrı bir thread'de yapılır; bu sırada gelen
+                acquire çağrıları yüklemenin bitmesini bekler.
+        """
+        key = (model_path, num_threads)
+        with self._condition:
+            if self._idle.get(key) or self._pending.get(key):
+                return
+            self._pending[key] = 1
+
+        def load():
+            try:
+                model = self._load(model_path, num_threads)
+            except Exception as e:
+                logger.error(f"Model önceden yüklenemedi ({model_path}): {e}")
+                model = None
+            with self._condition:
+                self._pending[key] -= 1
+                if model is not None:
+                    self._idle.setdefault(key, []).append(model)
+                self._condition.notify_all()
+
+        if background:
+            threading.Thread(target=load, name="ModelPreload", daemon=True).start()
+        else:
+            load()
+
+    def stats(self):
+        """
+        Returns:
+            dict: {(model_yolu, thread_sayısı): {'loads', 'hits', 'load_seconds', 'warmup_seconds'}}
+        """
+        with self._condition:
+            return {key: dict(stats) for key, stats in self._stats.items()}
+
+    def clear(self):
+        with self._condition:
+            self._idle.clear()
+
+    def _model_stats(self, key):
+        return self._stats.setdefault(key, {'loads': 0, 'hits': 0, 'load_seconds': 0.0, 'warmup_seconds': 0.0})
+
+    def _load(self, model_path, num_threads=None):
+        from ultralytics import YOLO
+
+        start = time.perf_counter()
+        # Dışa aktarılmış modellerde görev dosyadan okunamadığı için açıkça verilir
+        model = YOLO(model_path, task='detect')
+        load_seconds = time.perf_counter() - start
+
+        warmup_seconds = 0.0
+        # Thread ayarı predictor'ın oturumu üzerinde yapıldığı için thread sayısı verildiyse ısıtma şarttır
+        if self.warmup or num_threads:
+            start = time.perf_counter()
+            dummy = np.zeros((self.warmup_size, self.warmup_size, 3), dtype=np.uint8)
+            model.predict(dummy, verbose=False)
+            warmup_seconds = time.perf_counter() - start
+        configure_threads(model, model_path, num_threads)
+
+        with self._condition:
+            stats = self._model_stats((model_path, num_threads))
+            stats['loads'] += 1
+            stats['load_seconds'] += load_seconds
+            stats['warmup_seconds'] += warmup_seconds
+        logger.info(f"Model yüklendi: {model_path} (yükleme {load_seconds:.2f} s, ısıtma {warmup_seconds:.2f} s)")
+        return model
+
+    @staticmethod
+    def _reset_tracker(model):
+        predictor = getattr(model, 'predictor', None)
+        for tracker in getattr(predictor, 'trackers', None) or []:
+            tracker.reset()
+
+
+# Uygulamanın tamamında (Streamlit oturumları dahil) paylaşılan tek kayıt
+model_registry = ModelRegistry()
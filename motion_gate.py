@@ -0,0 +1,86 @@
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """
+    Kare modele gönderilmeden önce sahnede hareket olup olmadığına bakan ucuz ön filtre.
+
+    Kare küçültülmüş, gri tonlamalı ve bulanıklaştırılmış bir kopyaya çevrilir (1280x720 bir kare
+    için ~0.1 ms) ve modelin en son işlediği karenin kopyasıyla karşılaştırılır. Değişen piksellerin
+    oranı min_changed_ratio'nun altındaysa kare "durağan" sayılır ve inference atlanır. Karşılaştırma
+    bir önceki kareyle değil son işlenen kareyle yapıldığı için yavaş hareketler birikerek eşiği
+    aşar ve kaçırılmaz. Hareket görülmese de her max_skip_frames karede bir inference yapılır;
+    böylece çok az değişen bir sahneye giren kişi en geç bu süre sonunda tespit edilir.
+    """
+
+    def __init__(self, width=160, pixel_threshold=25, min_changed_ratio=0.001, max_skip_frames=30):
+        """
+        Args:
+            width (int): Karşılaştırma kopyasının genişliği (piksel); yükseklik en-boy oranından hesaplanır.
+            pixel_threshold (int): Bir pikselin "değişmiş" sayılması için gri ton farkı (0-255).
+            min_changed_ratio (float): Karenin hareketli sayılması için değişen piksellerin en az oranı.
+            max_skip_frames (int): Art arda en fazla kaç karenin atlanabileceği. 0: sınırsız.
+        """
+        self.width = max(16, int(width))
+        self.pixel_threshold = int(pixel_threshold)
+        self.min_changed_ratio = float(min_changed_ratio)
+        self.max_skip_frames = max(0, int(max_skip_frames))
+        self.reset()
+
+    def reset(self):
+        self._reference = None
+        self._skip_streak = 0
+        self.frames = 0
+        self.skipped = 0
+
+    def _small_gray(self, frame):
+        height = max(1, int(round(frame.shape[0] * self.width / frame.shape[1])))
+        small = cv2.resize(frame, (self.width, height), interpolation=cv2.INTER_LINEAR)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(small, (5, 5), 0)
+
+    def should_infer(self, frame):
+        """
+        Kare için inference yapılıp yapılmayacağına karar verir. True dönerse kare, sonraki
+        karşılaştırmaların referansı olur (çağıran modeli bu karede çalıştırmalıdır).
+
+        Args:
+            frame (np.ndarray): Modele gidecek kare (ROI varsa yalnızca kesit).
+        """
+        self.frames += 1
+        small = self._small_gray(frame)
+        if self._reference is None or self._reference.shape != small.shape:
+            infer = True
+        elif self.max_skip_frames and self._skip_streak >= self.max_skip_frames:
+            infer = True
+        else:
+            changed = np.count_nonzero(cv2.absdiff(small, self._reference) > self.pixel_threshold)
+            infer = changed >= self.min_changed_ratio * small.size
+
+        if infer:
+            self._reference = small
+            self._skip_streak = 0
+        else:
+            self._skip_streak += 1
+            self.skipped += 1
+        return infer
+
+    @property
+    def skip_ratio(self):
+        return self.skipped / self.frames if self.frames else 0.0
+
+    def stats(self):
+        """
+        Returns:
+            dict: {'frames': kontrol edilen kare, 'skipped': atlanan kare, 'skip_ratio': atlanma oranı}
+        """
+        return {'frames': self.frames, 'skipped': self.skipped, 'skip_ratio': self.skip_ratio}
+
+    def config(self):
+        """
+        Tespit önbelleği anahtarında kullanılan ayar özeti.
+        """
+        return {'width': self.width, 'pixel_threshold': self.pixel_threshold,
+                'min_changed_ratio': self.min_changed_ratio, 'max_skip_frames': self.max_skip_frames}
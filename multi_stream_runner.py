@@ -0,0 +1,514 @@
+import argparse
+import multiprocessing as mp
+import os
+import queue
+import signal
+import time
+
+import cv2
+from adaptive_image_size import AdaptiveImageSize
+from data_manager import DataManager
+from inference_backends import BACKEND_TORCH, BACKENDS, resolve_model
+from density_map_generator import DensityMapGenerator
+from entry_exit_counter import CountingLine, EntryExitCounter
+from logger_config import logger
+from motion_gate import MotionGate
+from region_of_interest import RegionOfInterest
+
+
+class StreamConfig:
+    """
+    Çoklu kamera çalıştırıcısında tek bir video kaynağının ayarları.
+    İşçi sürecine gönderildiği için yalnızca basit (pickle edilebilir) değerler tutar.
+    """
+
+    def __init__(self, source, name=None, line_y=450, model_path="Model/yolov8m.pt", detect_interval=1,
+                 heatmap_cell_size=8, blur_kernel_size=61, clipping_percentile=98, buffer_size=8,
+                 cpu_affinity=None, num_threads=None, backend=BACKEND_TORCH, roi_polygons=None,
+                 adaptive_imgsz=False, motion_gate=False, lines=None):
+        """
+        Args:
+            source (int | str): Kamera indeksi, akış URL'si veya video dosyası yolu.
+            name (str | None): Kameranın adı (loglarda ve veritabanında oturum adı). None: kaynak.
+            line_y (int): Giriş/çıkış çizgisinin Y konumu (piksel).
+            model_path (str): YOLO model dosyası.
+            detect_interval (int): Tam tespitin kaç karede bir yapılacağı.
+            heatmap_cell_size (int): Isı haritası ızgara hücre boyutu (piksel).
+            blur_kernel_size (int): Sonuç ısı haritasının bulanıklık çekirdeği.
+            clipping_percentile (int): Sonuç ısı haritasının kontrast yüzdeliği.
+            buffer_size (int): Kare ön yükleme tamponu.
+            cpu_affinity (list | None): İşçinin sabitleneceği CPU çekirdekleri. None: sınırlama yok
+                (veya çalıştırıcının auto_affinity ayarı).
+            num_threads (int | None): İşçi içinde PyTorch/ONNX Runtime/OpenVINO/OpenCV'nin kullanacağı thread sayısı.
+            backend (str): Çıkarım arka ucu (inference_backends.BACKENDS).
+            roi_polygons (list | None): Tespitin yapılacağı bölge çokgenleri (köşeler kare boyutunun
+                kesri, 0-1). None: karenin tamamı.
+            adaptive_imgsz (bool): Model giriş çözünürlüğünü kişi sayısına göre ayarla.
+            motion_gate (bool): Sahnede hareket yoksa inference'ı atla.
+            lines (list | None): Yatay çizgiye ek sayım çizgileri; her biri piksel (x, y) köşelerinin listesi
+                (doğru parçası veya kırık çizgi). Olaylar veritabanına çizgi numarasıyla (line_id 1, 2, ...) yazılır.
+        """
+        self.source = source
+        self.name = name or str(source)
+        self.line_y = line_y
+        self.model_path = model_path
+        self.detect_interval = detect_interval
+        self.heatmap_cell_size = heatmap_cell_size
+        self.blur_kernel_size = blur_kernel_size
+        self.clipping_percentile = clipping_percentile
+        self.buffer_size = buffer_size
+        self.cpu_affinity = list(cpu_affinity) if cpu_affinity else None
+        self.num_threads = num_threads
+        self.backend = backend
+        self.roi_polygons = [list(map(tuple, polygon)) for polygon in roi_polygons] if roi_polygons else None
+        self.adaptive_imgsz = adaptive_imgsz
+        self.motion_gate = motion_gate
+        self.lines = [list(map(tuple, points)) for points in lines] if lines else None
+
+
+# İşçilerden koordinatöre giden mesaj tipleri
+MSG_PROGRESS = 'progress'
+MSG_DONE = 'done'
+MSG_FAILED = 'failed'
+
+
+def _configure_worker_process(config):
+    """
+    İşçi sürecini ağır kütüphaneler yüklenmeden önce yapılandırır: CPU sabitleme ve thread sayıları.
+    """
+    # Ctrl+C yalnızca koordinatörde işlenir; işçiler stop_event ile düzgünce kapatılır
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    if config.cpu_affinity and hasattr(os, 'sched_setaffinity'):
+        try:
+            os.sched_setaffinity(0, config.cpu_affinity)
+        except OSError as e:
+            logger.warning(f"[{config.name}] CPU sabitleme başarısız ({config.cpu_affinity}): {e}")
+
+    if config.num_threads:
+        # OpenMP/MKL thread havuzları ilk importta oluşturulduğu için ortam değişkenleri önce ayarlanır
+        for variable in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+            os.environ[variable] = str(config.num_threads)
+        cv2.setNumThreads(config.num_threads)
+
+
+def _stream_worker(config, start_frame, report_interval, result_queue, stop_event):
+    """
+    İşçi süreci: tek bir kaynağı kendi motoru, sayacı ve ısı haritasıyla işler.
+
+    Koordinatöre report_interval saniyede bir tek bir MSG_PROGRESS mesajı gönderir. Mesaj, o ana
+    kadarki kare konumunu, aradaki olayları ve seyrek ısı farkını birlikte taşır; böylece işçi
+    çökerse koordinatör son mesajdaki kareden, olayları çift saymadan yeniden başlatabilir.
+    """
+    _configure_worker_process(config)
+
+    # Ağır modüller (ultralytics/torch) thread ayarlarından sonra ve yalnızca işçide yüklenir
+    from video_stream_manager import VideoStreamManager
+    from person_detect_and_tracking_engine import PersonTrackingEngine
+
+    if config.num_threads:
+        try:
+            import torch
+            torch.set_num_threads(config.num_threads)
+        except ImportError:
+            pass
+
+    stream_manager = VideoStreamManager(source=config.source, prefetch=True, buffer_size=config.buffer_size)
+    if not stream_manager.start_stream(start_frame=start_frame):
+        result_queue.put((MSG_FAILED, config.name, {'error': f"Video kaynağı açılamadı: {config.source}"}))
+        return
+
+    tracking_engine = PersonTrackingEngine(model_path=config.model_path, detect_interval=config.detect_interval,
+                                           render=False, backend=config.backend, num_threads=config.num_threads,
+                                           roi=RegionOfInterest(config.roi_polygons) if config.roi_polygons else None,
+                                           adaptive_imgsz=AdaptiveImageSize() if config.adaptive_imgsz else None,
+                                           motion_gate=MotionGate() if config.motion_gate else None)
+    # Olaylar koordinatöre gönderildiği için işçide log metni tutulmaz (7/24 çalışmada bellek sabit kalır)
+    counter = EntryExitCounter(line_y_position=config.line_y,
+                               lines=[CountingLine(points) for points in config.lines or []], max_logs=0)
+    density_delta = None
+
+    frame_index = start_frame
+    pending_events = []
+    interval_frames = 0
+    interval_start = time.monotonic()
+
+    def send_progress():
+        nonlocal pending_events, interval_frames, interval_start
+        now = time.monotonic()
+        heat_indices, heat_values = density_delta.take_sparse_delta() if density_delta is not None else ((), ())
+        result_queue.put((MSG_PROGRESS, config.name, {
+            'frame_index': frame_index,
+            'frame_shape': frame_shape,
+            'events': pending_events,
+            'heat_indices': heat_indices,
+            'heat_values': heat_values,
+            'frames': interval_frames,
+            'fps': interval_frames / max(now - interval_start, 1e-9),
+            'motion_skip_ratio': tracking_engine.motion_gate.skip_ratio if tracking_engine.motion_gate else None,
+        }))
+        pending_events = []
+        interval_frames = 0
+        interval_start = now
+
+    frame_shape = None
+    try:
+        while not stop_event.is_set():
+            ret, frame = stream_manager.get_frame()
+            if not ret:
+                break
+
+            if density_delta is None:
+                # İşçideki harita yalnızca iki rapor arasındaki farkı biriktirir
+                frame_shape = frame.shape
+                density_delta = DensityMapGenerator(frame_shape=frame_shape, cell_size=config.heatmap_cell_size)
+
+            _, _, detections = tracking_engine.process_frame(frame)
+            new_events = counter.update(detections)
+            if new_events:
+                timestamp_ms = DataManager._now_ms()
+                pending_events.extend((timestamp_ms, event, line_id)
+                                      for event, line_id in zip(new_events, counter.last_event_line_ids))
+            density_delta.add_points(detections.centers)
+
+            frame_index += 1
+            interval_frames += 1
+            if time.monotonic() - interval_start >= report_interval:
+                send_progress()
+
+        send_progress()
+        result_queue.put((MSG_DONE, config.name, {'stopped': stop_event.is_set()}))
+    finally:
+        stream_manager.stop_stream()
+        tracking_engine.close()
+
+
+class _WorkerState:
+    """
+    Koordinatörün bir işçi için tuttuğu durum.
+    """
+
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+
+    def __init__(self, config):
+        self.config = config
+        self.process = None
+        self.status = self.STATUS_RUNNING
+        self.session_id = None
+        self.frame_index = 0
+        self.frames = 0
+        self.fps = 0.0
+        self.motion_skip_ratio = None
+        self.entries = 0
+        self.exits = 0
+        self.restarts = 0
+        self.density_generator = None
+        self.error = None
+
+
+class MultiStreamRunner:
+    """
+    Birden fazla kamerayı/videoyu her biri ayrı bir süreçte (process) çalışan işçilerle paralel işler.
+
+    Her işçi kendi PersonTrackingEngine, EntryExitCounter ve DensityMapGenerator nesnelerine sahiptir.
+    İşçiler koordinatöre yalnızca küçük mesajlar gönderir: olay listesi ve seyrek ısı haritası farkı.
+    Koordinatör olayları DataManager üzerinden yazar, her kamera için sonuç ısı haritasını birleştirir,
+    işçi başına fps raporlar ve çöken işçileri kaldıkları kareden yeniden başlatır.
+    """
+
+    def __init__(self, configs, db_manager=None, report_interval=1.0, stats_log_interval=10.0,
+                 max_restarts=3, auto_affinity=False, start_method='spawn'):
+        """
+        Args:
+            configs (list of StreamConfig): Kamera ayarları; adlar benzersiz olmalıdır.
+            db_manager (DataManager | None): Olayların yazılacağı veritabanı. None: yazılmaz.
+            report_interval (float): İşçilerin koordinatöre kaç saniyede bir rapor göndereceği.
+            stats_log_interval (float): İşçi başına fps özetinin kaç saniyede bir loglanacağı.
+            max_restarts (int): Bir işçinin çöktükten sonra en fazla kaç kez yeniden başlatılacağı.
+            auto_affinity (bool): True ise cpu_affinity verilmemiş işçilere mevcut çekirdekler
+                eşit bloklar halinde dağıtılır.
+            start_method (str): multiprocessing başlatma yöntemi. 'spawn', PyTorch ve thread'lerle
+                güvenli olan seçenektir.
+        """
+        names = [config.name for config in configs]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Kamera adları benzersiz olmalıdır: {names}")
+
+        self.db_manager = db_manager
+        self.report_interval = report_interval
+        self.stats_log_interval = stats_log_interval
+        self.max_restarts = max_restarts
+        self._context = mp.get_context(start_method)
+        self._result_queue = self._context.Queue()
+        self._stop_event = self._context.Event()
+
+        if auto_affinity:
+            self._assign_affinity(configs)
+        self.workers = {config.name: _WorkerState(config) for config in configs}
+
+    @staticmethod
+    def _assign_affinity(configs):
+        """
+        Çekirdekleri cpu_affinity verilmemiş işçilere ardışık bloklar halinde dağıtır.
+        Çekirdekten fazla işçi varsa çekirdekler sırayla paylaştırılır.
+        """
+        if not hasattr(os, 'sched_getaffinity'):
+            logger.warning("Bu platformda CPU sabitleme desteklenmiyor; auto_affinity yok sayıldı.")
+            return
+        cpus = sorted(os.sched_getaffinity(0))
+        unpinned = [config for config in configs if not config.cpu_affinity]
+        if not unpinned:
+            return
+        per_worker = max(1, len(cpus) // len(unpinned))
+        for index, config in enumerate(unpinned):
+            start = (index * per_worker) % len(cpus)
+            config.cpu_affinity = cpus[start:start + per_worker]
+
+    def _start_worker(self, state):
+        state.process = self._context.Process(
+            target=_stream_worker,
+            args=(state.config, state.frame_index, self.report_interval, self._result_queue, self._stop_event),
+            name=f"StreamWorker-{state.config.name}",
+            daemon=True
+        )
+        state.process.start()
+        logger.info(f"[{state.config.name}] İşçi başlatıldı (pid={state.process.pid}, kare={state.frame_index}, "
+                    f"çekirdekler={state.config.cpu_affinity or 'tümü'})")
+
+    def run(self, duration=None):
+        """
+        Tüm işçileri başlatır ve hepsi bitene (veya stop çağrılana / süre dolana) kadar bekler.
+
+        Args:
+            duration (float | None): En fazla kaç saniye çalışılacağı. None: kaynaklar bitene kadar.
+
+        Returns:
+            dict: get_stats() çıktısı.
+        """
+        # Dışa aktarma (ONNX/OpenVINO) işçiler başlamadan bir kez yapılır; işçiler aynı dosyayı
+        # aynı anda yazmaya çalışmaz, hazır dosyayı yükler
+        for model_path, backend in {(state.config.model_path, state.config.backend) for state in self.workers.values()}:
+            resolve_model(model_path, backend)
+
+        for state in self.workers.values():
+            if self.db_manager is not None:
+                state.session_id = self.db_manager.create_new_session(video_name=state.config.name)
+            self._start_worker(state)
+
+        start_time = time.monotonic()
+        last_stats_log = start_time
+        try:
+            while self._running_workers():
+                self._drain_messages(timeout=0.2)
+                self._check_workers()
+
+                now = time.monotonic()
+                if duration is not None and now - start_time >= duration and not self._stop_event.is_set():
+                    self.stop()
+                if now - last_stats_log >= self.stats_log_interval:
+                    last_stats_log = now
+                    self._log_stats()
+        except KeyboardInterrupt:
+            logger.info("Durdurma isteği alındı, işçiler kapatılıyor...")
+            self.stop()
+            while self._running_workers():
+                self._drain_messages(timeout=0.2)
+                self._check_workers()
+        finally:
+            self._shutdown()
+
+        self._log_stats()
+        return self.get_stats()
+
+    def stop(self):
+        """
+        İşçilere durma sinyali gönderir; her işçi son raporunu gönderip kapanır.
+        """
+        self._stop_event.set()
+
+    def _running_workers(self):
+        return [state for state in self.workers.values() if state.status == _WorkerState.STATUS_RUNNING]
+
+    def _drain_messages(self, timeout):
+        """
+        Kuyruktaki tüm mesajları işler; ilk mesaj için en fazla timeout saniye bekler.
+        """
+        try:
+            message = self._result_queue.get(timeout=timeout)
+        except queue.Empty:
+            return
+        while True:
+            self._handle_message(*message)
+            try:
+                message = self._result_queue.get_nowait()
+            except queue.Empty:
+                return
+
+    def _handle_message(self, kind, name, payload):
+        state = self.workers[name]
+        if kind == MSG_PROGRESS:
+            state.frame_index = payload['frame_index']
+            state.frames += payload['frames']
+            state.fps = payload['fps']
+            state.motion_skip_ratio = payload['motion_skip_ratio']
+
+            for timestamp_ms, event_type, line_id in payload['events']:
+                if event_type == 'Giriş':
+                    state.entries += 1
+                elif event_type == 'Çıkış':
+                    state.exits += 1
+                if self.db_manager is not None:
+                    self.db_manager.log_event(state.session_id, event_type, line_id=line_id, timestamp_ms=timestamp_ms)
+
+            if payload['frame_shape'] is not None:
+                if state.density_generator is None:
+                    state.density_generator = DensityMapGenerator(
+                        frame_shape=payload['frame_shape'],
+                        blur_kernel_size=state.config.blur_kernel_size,
+                        clipping_percentile=state.config.clipping_percentile,
+                        cell_size=state.config.heatmap_cell_size
+                    )
+                state.density_generator.add_sparse(payload['heat_indices'], payload['heat_values'])
+        elif kind == MSG_DONE:
+            state.status = _WorkerState.STATUS_DONE
+            logger.info(f"[{name}] İşçi tamamlandı: {state.frames} kare, {state.entries} giriş, {state.exits} çıkış.")
+        elif kind == MSG_FAILED:
+            state.status = _WorkerState.STATUS_FAILED
+            state.error = payload['error']
+            logger.error(f"[{name}] İşçi başarısız oldu: {state.error}")
+
+    def _check_workers(self):
+        """
+        Beklenmedik şekilde sonlanan işçileri yeniden başlatır.
+        """
+        for state in self._running_workers():
+            if state.process.is_alive():
+                continue
+            # Süreç kapanmadan önce gönderdiği mesajlar kuyrukta kalmış olabilir
+            self._drain_messages(timeout=0)
+            if state.status != _WorkerState.STATUS_RUNNING:
+                continue
+
+            exit_code = state.process.exitcode
+            if self._stop_event.is_set():
+                state.status = _WorkerState.STATUS_DONE
+            elif state.restarts < self.max_restarts:
+                state.restarts += 1
+                logger.warning(f"[{state.config.name}] İşçi çöktü (çıkış kodu {exit_code}); "
+                               f"{state.frame_index}. kareden yeniden başlatılıyor "
+                               f"({state.restarts}/{self.max_restarts}).")
+                self._start_worker(state)
+            else:
+                state.status = _WorkerState.STATUS_FAILED
+                state.error = f"İşçi {state.restarts} yeniden başlatmadan sonra tekrar çöktü (çıkış kodu {exit_code})."
+                logger.error(f"[{state.config.name}] {state.error}")
+
+    def _shutdown(self):
+        self._stop_event.set()
+        for state in self.workers.values():
+            if state.process is None:
+                continue
+            state.process.join(timeout=10)
+            if state.process.is_alive():
+                logger.warning(f"[{state.config.name}] İşçi kapanmadı, sonlandırılıyor.")
+                state.process.terminate()
+                state.process.join()
+        if self.db_manager is not None:
+            self.db_manager.flush()
+
+    def _log_stats(self):
+        for name, stats in self.get_stats().items():
+            logger.info(f"[{name}] {stats['status']}: {stats['fps']:.1f} fps, {stats['frames']} kare, "
+                        f"{stats['entries']} giriş, {stats['exits']} çıkış, {stats['restarts']} yeniden başlatma")
+
+    def get_stats(self):
+        """
+        İşçi başına anlık durum: son rapor aralığındaki fps, işlenen kare, hareket kapısının atladığı kare
+        oranı (kapı kapalıysa None), olay sayıları ve yeniden başlatmalar.
+        """
+        return {
+            name: {
+                'status': state.status,
+                'fps': state.fps,
+                'motion_skip_ratio': state.motion_skip_ratio,
+                'frames': state.frames,
+                'frame_index': state.frame_index,
+                'entries': state.entries,
+                'exits': state.exits,
+                'restarts': state.restarts,
+                'session_id': state.session_id,
+                'cpu_affinity': state.config.cpu_affinity,
+                'error': state.error,
+            }
+            for name, state in self.workers.items()
+        }
+
+    def generate_heatmap_image(self, name):
+        """
+        Bir kameranın işçilerden birleştirilen sonuç ısı haritasını döndürür (henüz kare gelmediyse None).
+        """
+        state = self.workers[name]
+        if state.density_generator is None:
+            return None
+        return state.density_generator.generate_heatmap_image()
+
+
+def parse_line_points(text):
+    """
+    Komut satırındaki sayım çizgisini işçiye gönderilebilecek köşe listesine çevirir.
+    """
+    return [tuple(point) for point in CountingLine.parse(text).points.tolist()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Birden fazla kamerayı paralel süreçlerde analiz eder.")
+    parser.add_argument("sources", nargs='+', help="Video dosyaları, kamera indeksleri veya akış URL'leri")
+    parser.add_argument("--line-y", type=int, default=450, help="Giriş/çıkış çizgisinin Y konumu (piksel)")
+    parser.add_argument("--line", action='append', default=None, type=parse_line_points, metavar="NOKTALAR",
+                        help="Yatay çizgiye ek sayım çizgisi; piksel köşeleri 'x1,y1 x2,y2 ...' (birden fazla verilebilir)")
+    parser.add_argument("--model", default="Model/yolov8m.pt")
+    parser.add_argument("--detect-interval", type=int, default=1)
+    parser.add_argument("--backend", default=BACKEND_TORCH, choices=BACKENDS, help="Çıkarım arka ucu")
+    parser.add_argument("--threads", type=int, default=None, help="İşçi başına çıkarım/OpenCV thread sayısı")
+    parser.add_argument("--roi", action='append', default=None, type=RegionOfInterest.parse_polygon, metavar="ÇOKGEN",
+                        help="Tespitin yapılacağı bölge; köşeler kare boyutunun kesri: 'x1,y1 x2,y2 x3,y3'")
+    parser.add_argument("--adaptive-imgsz", action='store_true',
+                        help="Model giriş çözünürlüğünü kişi sayısına göre ayarla")
+    parser.add_argument("--motion-gate", action='store_true', help="Sahnede hareket yoksa inference'ı atla")
+    parser.add_argument("--auto-affinity", action='store_true', help="İşçileri ayrı CPU çekirdeklerine sabitle")
+    parser.add_argument("--max-restarts", type=int, default=3)
+    parser.add_argument("--duration", type=float, default=None, help="En fazla çalışma süresi (saniye)")
+    parser.add_argument("--heatmap-folder", default=None, help="Kamera başına sonuç ısı haritalarının kaydedileceği klasör")
+    parser.add_argument("--no-db", action='store_true', help="Olayları veritabanına yazma")
+    args = parser.parse_args()
+
+    configs = []
+    for index, source in enumerate(args.sources):
+        source = int(source) if source.isdigit() else source
+        name = f"kamera_{index + 1}_{os.path.basename(str(source))}"
+        configs.append(StreamConfig(source, name=name, line_y=args.line_y, model_path=args.model,
+                                    detect_interval=args.detect_interval, num_threads=args.threads,
+                                    backend=args.backend, roi_polygons=args.roi,
+                                    adaptive_imgsz=args.adaptive_imgsz, motion_gate=args.motion_gate,
+                                    lines=args.line))
+
+    db_manager = None if args.no_db else DataManager(buffered=True)
+    runner = MultiStreamRunner(configs, db_manager=db_manager, max_restarts=args.max_restarts,
+                               auto_affinity=args.auto_affinity)
+    stats = runner.run(duration=args.duration)
+
+    if args.heatmap_folder:
+        os.makedirs(args.heatmap_folder, exist_ok=True)
+        for name in stats:
+            heatmap_image = runner.generate_heatmap_image(name)
+            if heatmap_image is not None:
+                cv2.imwrite(os.path.join(args.heatmap_folder, f"{name}_heatmap.png"), heatmap_image)
+
+    if db_manager is not None:
+        db_manager.close_connection()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,255 @@
-from ultralytics import YOLO
 import cv2
 import numpy as np
+from annotation_renderer import draw_tracked_objects
+from detections import Detections, match_ids
+from inference_backends import BACKEND_TORCH, resolve_model
+from model_registry import model_registry
+from profiler import profiler
 
 
 class PersonTrackingEngine:
-    def __init__(self, model_path="Model/yolov8m.pt"):
-        self.model = YOLO(model_path)
+    # Takip edilen COCO sınıfı (insan) ve takipçi ayarı. Tespit önbelleği anahtarına da girerler.
+    PERSON_CLASS = 0
+    TRACKER_CONFIG = 'botsort.yaml'
+    DEFAULT_MODEL_PATH = "Model/yolov8m.pt"
+
+    def __init__(self, model_path=DEFAULT_MODEL_PATH, batch_size=1, detect_interval=1, render=True,
+                 backend=BACKEND_TORCH, num_threads=None, roi=None, adaptive_imgsz=None, motion_gate=None):
+        """
+        Args:
+            model_path (str): Kullanılacak YOLO model dosyasının yolu.
+            batch_size (int): process_batch çağrısında tek bir ileri geçişte (forward pass)
+                işlenecek en fazla kare sayısı.
+            detect_interval (int): Tam tespitin kaç karede bir yapılacağı. 1'den büyükse
+                aradaki karelerde izler, son tespitlerden kestirilen hızla ilerletilir.
+            render (bool): False ise motor başsız (headless) çalışır: çizim yapılmaz ve
+                annotated_frame yerine None döner. Görselleştirme için AnnotationRenderer kullanılır.
+            backend (str): Çıkarım arka ucu: 'torch', 'onnx', 'onnx_int8' veya 'openvino'
+                (inference_backends.BACKENDS). PyTorch dışındaki arka uçlar için model ilk kullanımda
+                dışa aktarılır; takipçi ve çıktı biçimi tüm arka uçlarda aynıdır.
+            num_threads (int | None): Çıkarım thread sayısı. None: arka ucun varsayılanı.
+            roi (RegionOfInterest | None): Verilirse model karenin tamamı yerine yalnızca bölgeyi
+                kapsayan kesit üzerinde çalışır; kutular tam kare koordinatlarında döner.
+            adaptive_imgsz (AdaptiveImageSize | None): Verilirse modelin giriş çözünürlüğü sahnedeki
+                kişi sayısına göre değiştirilir (boş sahnede düşük, kalabalıkta yüksek).
+            motion_gate (MotionGate | None): Verilirse tespit karelerinde önce hareket kontrolü yapılır;
+                sahne (ROI varsa yalnızca kesit) son işlenen kareden beri değişmediyse inference atlanır
+                ve son bilinen takip sonuçları döndürülür.
+
+        Model, süreç genelindeki model_registry'den alınır (ilk kullanımda yüklenip ısıtılır);
+        analiz bitince close() ile geri verilmelidir.
+        """
+        self.backend = backend
+        self.num_threads = num_threads
+        self.model_path = resolve_model(model_path, backend)
+        self.model = model_registry.acquire(self.model_path, num_threads)
+        # Dışa aktarılan modellerin batch boyutu 1'e sabittir
+        self.batch_size = max(1, int(batch_size)) if backend == BACKEND_TORCH else 1
+        self.detect_interval = max(1, int(detect_interval))
+        self.render = render
+        self.roi = roi
+        self.adaptive_imgsz = adaptive_imgsz
+        self.motion_gate = motion_gate
+        self._last_detections = Detections.empty()
+
+        # Kare atlama modu için durum: her iz için son tespit kutusu, kare başına hız ve tespit karesi
+        self._frame_index = 0
+        self._motion_ids = np.zeros(0, dtype=np.int64)
+        self._motion_boxes = np.zeros((0, 4), dtype=np.float32)
+        self._motion_velocities = np.zeros((0, 4), dtype=np.float32)
+        self._motion_frames = np.zeros(0, dtype=np.int64)
+
+    def close(self):
+        """
+        Modeli kayda geri verir; sonraki analizler modeli yeniden yüklemeden kullanır.
+        """
+        if self.model is not None:
+            model_registry.release(self.model_path, self.model, self.num_threads)
+            self.model = None
+
+    @classmethod
+    def output_config(cls, detect_interval=1, backend=BACKEND_TORCH, roi=None, adaptive_imgsz=None,
+                      motion_gate=None):
+        """
+        Takip çıktısını etkileyen ayarlar (model dosyası hariç); tespit önbelleği anahtarında kullanılır.
+        batch_size, render ve thread sayısı çıktıdaki ID'leri ve kutuları değiştirmediği için dahil edilmez.
+        """
+        config = {'detect_interval': max(1, int(detect_interval)), 'classes': cls.PERSON_CLASS,
+                  'tracker': cls.TRACKER_CONFIG}
+        # Dışa aktarılmış/nicemlenmiş modellerin kutuları PyTorch'tan az da olsa farklıdır
+        if backend != BACKEND_TORCH:
+            config['backend'] = backend
+        if roi is not None:
+            config['roi'] = roi.config()
+        if adaptive_imgsz is not None:
+            config['imgsz'] = adaptive_imgsz.config()
+        if motion_gate is not None:
+            config['motion_gate'] = motion_gate.config()
+        return config
 
     def process_frame(self, frame):
         """
-        Bir kareyi işler, insanları takip eder ve her bir nesne için
-        ID, kutu ve merkez bilgilerini içeren bir SÖZLÜK LİSTESİ döndürür.
+        Bir kareyi işler, insanları takip eder ve ID, kutu ve merkez bilgilerini
+        sütun bazlı bir Detections nesnesi olarak döndürür. Detections üzerinde gezinildiğinde
+        her eleman eski sözlük biçimi gibi (obj['id'], obj['center']) okunabilir.
+        render=False ise annotated_frame None olur ve kare değiştirilmez.
+        Kare, SharedFrameRing'den okunan kopyasız bir görünüm de olabilir: motor çağrıdan sonra
+        kareye referans tutmaz, yuva hemen serbest bırakılabilir.
+        """
+        if not self._is_detection_frame():
+            output = self._propagate_tracks(frame)
+        elif self._has_motion(frame):
+            output = self._parse_result(self._track([frame])[0], frame)
+            self._update_motion_model(output[2])
+        else:
+            output = self._hold_tracks(frame)
+
+        self._last_detections = output[2]
+        self._frame_index += 1
+        return output
+
+    def process_batch(self, frames):
+        """
+        Birden fazla kareyi batch_size'lık gruplar halinde tek ileri geçişte işler.
+
+        Tespit tüm grup için birlikte yapılır; takipçi (tracker) ise sonuçları kare
+        sırasıyla alır. Bu yüzden atanan ID'ler process_frame ile tek tek işlemeyle aynıdır.
+
+        Args:
+            frames (list of np.ndarray): Zaman sırasına göre kareler.
+
+        Returns:
+            list: Her kare için process_frame ile aynı biçimde
+                (annotated_frame, person_count, tracked_objects) demetleri.
+        """
+        outputs = []
+        for start in range(0, len(frames), self.batch_size):
+            chunk = list(frames[start:start + self.batch_size])
+
+            # Kare atlama modunda yalnızca tespit karelerini, hareket kapısı açıksa yalnızca
+            # hareket görülen tespit karelerini modele gönder
+            is_detection = [self._is_detection_frame(offset) for offset in range(len(chunk))]
+            has_motion = [detect and self._has_motion(frame) for frame, detect in zip(chunk, is_detection)]
+            detection_frames = [frame for frame, motion in zip(chunk, has_motion) if motion]
+            results = iter(self._track(detection_frames) if detection_frames else [])
+
+            for frame, detect, motion in zip(chunk, is_detection, has_motion):
+                if not detect:
+                    output = self._propagate_tracks(frame)
+                elif motion:
+                    output = self._parse_result(next(results), frame)
+                    self._update_motion_model(output[2])
+                else:
+                    output = self._hold_tracks(frame)
+                outputs.append(output)
+                self._last_detections = output[2]
+                self._frame_index += 1
+        return outputs
+
+    def _track(self, frames):
+        """
+        Kareleri tek ileri geçişte modele gönderir. ROI varsa modele yalnızca kesitler gider;
+        uyarlanır çözünürlük açıksa güncel imgsz kullanılır.
         """
-        results = self.model.track(frame, persist=True, classes=0, verbose=False)
+        options = {}
+        if self.adaptive_imgsz is not None:
+            options['imgsz'] = self.adaptive_imgsz.imgsz
+        if self.roi is not None:
+            frames = [self.roi.crop(frame) for frame in frames]
+        with profiler.stage('model_track'):
+            return self.model.track(frames, persist=True, classes=self.PERSON_CLASS,
+                                    tracker=self.TRACKER_CONFIG, verbose=False, **options)
 
-        annotated_frame = results[0].plot()
+    def _is_detection_frame(self, offset=0):
+        return (self._frame_index + offset) % self.detect_interval == 0
 
-        tracked_objects = []
+    def _has_motion(self, frame):
+        if self.motion_gate is None:
+            return True
+        with profiler.stage('motion_gate'):
+            return self.motion_gate.should_infer(self.roi.crop(frame) if self.roi is not None else frame)
+
+    def _hold_tracks(self, frame):
+        """
+        Hareket olmayan tespit karesinde son bilinen takip sonuçlarını döndürür.
+        Takipçiye kare verilmez: BoT-SORT izleri kendisine verilen kare sayısıyla yaşlandırdığı için
+        atlanan kareler izlerin kaybolmasına ya da yeni ID almasına yol açmaz. Kare atlama modunda
+        sahne durağan olduğundan izlerin hızı sıfırlanır.
+        """
+        detections = self._last_detections
+        if self.detect_interval > 1:
+            self._motion_ids = detections.ids.copy()
+            self._motion_boxes = detections.boxes.copy()
+            self._motion_velocities = np.zeros_like(detections.boxes)
+            self._motion_frames = np.full(len(detections), self._frame_index, dtype=np.int64)
+
+        annotated_frame = draw_tracked_objects(frame, detections) if self.render else None
+
+        return annotated_frame, len(detections), detections
+
+    def _update_motion_model(self, detections):
+        """
+        Tespit karesindeki kutulardan her iz için kare başına hızı vektörel olarak günceller.
+        Bu karede görünmeyen izler hareket modelinden çıkarılır.
+        """
+        if self.detect_interval == 1:
+            return
+
+        velocities = np.zeros_like(detections.boxes)
+        found, rows = match_ids(detections.ids, self._motion_ids)
+        if found.any():
+            prev_rows = rows[found]
+            elapsed = np.maximum(1, self._frame_index - self._motion_frames[prev_rows])[:, None]
+            measured = (detections.boxes[found] - self._motion_boxes[prev_rows]) / elapsed
+            # Gürültüyü azaltmak için ölçülen hızı önceki tahminle yumuşat
+            velocities[found] = 0.5 * measured + 0.5 * self._motion_velocities[prev_rows]
+
+        self._motion_ids = detections.ids.copy()
+        self._motion_boxes = detections.boxes.copy()
+        self._motion_velocities = velocities
+        self._motion_frames = np.full(len(detections), self._frame_index, dtype=np.int64)
+
+    def _propagate_tracks(self, frame):
+        """
+        Tespit yapılmayan karede izleri sabit hız varsayımıyla ilerletir ve
+        process_frame ile aynı biçimde çıktı üretir.
+        """
+        frame_height, frame_width = frame.shape[:2]
+        limits = np.array([frame_width - 1, frame_height - 1, frame_width - 1, frame_height - 1], dtype=np.float32)
+
+        elapsed = (self._frame_index - self._motion_frames)[:, None]
+        predicted = np.clip(self._motion_boxes + self._motion_velocities * elapsed, 0, limits)
+        detections = Detections(self._motion_ids, predicted)
+
+        annotated_frame = draw_tracked_objects(frame, detections) if self.render else None
+
+        return annotated_frame, len(detections), detections
+
+    def _parse_result(self, result, frame):
+        """
+        Tek bir Ultralytics sonucunu (annotated_frame, person_count, detections) biçimine çevirir.
+        Nesne başına Python döngüsü yoktur; kutular ve ID'ler doğrudan dizi olarak aktarılır.
+        """
         # Takip ID'leri mevcutsa işlemleri yap
-        if results[0].boxes.id is not None:
-            boxes = results[0].boxes.xyxy.cpu().numpy()
-            track_ids = results[0].boxes.id.int().cpu().tolist()
-
-            for box, track_id in zip(boxes, track_ids):
-                x1, y1, x2, y2 = box
-                center_x = int((x1 + x2) / 2)
-                center_y = int((y1 + y2) / 2)
-
-                # --- ANA DÜZELTME BURADA ---
-                # Veriyi demet (tuple) yerine sözlük (dictionary) olarak ekliyoruz.
-                # Bu sayede diğer modüller bu veriye obj['id'] ve obj['center'] gibi
-                # anahtarlarla sorunsuzca erişebilir.
-                tracked_objects.append({
-                    'id': track_id,
-                    'box': (x1, y1, x2, y2),
-                    'center': (center_x, center_y)
-                })
-
-        person_count = len(tracked_objects)
-
-        return annotated_frame, person_count, tracked_objects
+        if result.boxes.id is not None:
+            boxes = result.boxes.xyxy.cpu().numpy()
+            if self.roi is not None:
+                boxes = self.roi.to_frame(boxes)
+            detections = Detections(result.boxes.id.int().cpu().numpy(), boxes)
+        else:
+            detections = Detections.empty()
+
+        if self.adaptive_imgsz is not None:
+            self.adaptive_imgsz.update(len(detections))
+
+        # Başsız modda çizim (plot) adımı tamamen atlanır
+        annotated_frame = None
+        if self.render:
+            with profiler.stage('results_plot'):
+                if self.roi is None:
+                    annotated_frame = result.plot()
+                else:
+                    # Sonuç kesit üzerinde olduğu için çizim tam karenin kopyasına yapılır
+                    annotated_frame = self.roi.draw(draw_tracked_objects(frame.copy(), detections))
+
+        return annotated_frame, len(detections), detections
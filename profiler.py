@@ -0,0 +1,283 @@
+import functools
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+from logger_config import logger
+
+
+class _StageTimer:
+    """
+    Profiler.stage() tarafından döndürülen bağlam yöneticisi (context manager).
+    """
+
+    __slots__ = ('_profiler', '_name', '_start')
+
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._profiler.record(self._name, time.perf_counter() - self._start)
+        return False
+
+
+class _NullTimer:
+    """
+    Profil kapalıyken kullanılan, hiçbir şey yapmayan tekil bağlam yöneticisi.
+    """
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _StageStats:
+    """
+    Bir aşamanın son `window` ölçümünü halka tamponda tutar; yüzdelikler bu kayan pencereden hesaplanır.
+    Toplam süre ve sayı ise tüm çalışma boyunca birikir.
+    """
+
+    __slots__ = ('samples', 'index', 'count', 'total', 'max')
+
+    def __init__(self, window):
+        self.samples = [0.0] * window
+        self.index = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.samples[self.index] = seconds
+        self.index = (self.index + 1) % len(self.samples)
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def window_samples(self):
+        return np.asarray(self.samples[:min(self.count, len(self.samples))])
+
+
+class Profiler:
+    """
+    Kare döngüsündeki sıcak noktaları (kare çözme, model.track, results.plot, sayaç, ısı haritası,
+    veritabanı yazımı) ölçen hafif zamanlayıcı katmanı.
+
+    Kullanım:
+        with profiler.stage('model_track'):
+            results = model.track(frame)
+
+        @profiler.timed('db_write')
+        def _write_events(...): ...
+
+    Kapalıyken stage() tek bir paylaşımlı boş bağlam yöneticisi döndürür ve timed() sarmalayıcısı
+    yalnızca bir bayrak kontrolü yapar; ölçüm, kilit veya bellek ayırma yapılmaz.
+    """
+
+    # Prometheus metin formatında raporlanan yüzdelikler
+    QUANTILES = (0.5, 0.95, 0.99)
+
+    def __init__(self, enabled=False, window=2048, metric_prefix='pipeline'):
+        """
+        Args:
+            enabled (bool): Ölçüm açık mı?
+            window (int): Yüzdelikler için aşama başına tutulan son ölçüm sayısı.
+            metric_prefix (str): Dışa aktarılan metrik adlarının öneki.
+        """
+        self.enabled = enabled
+        self.window = max(1, int(window))
+        self.metric_prefix = metric_prefix
+        self._stages = {}
+        self._lock = threading.Lock()
+        self._metrics_server = None
+        self._file_exporter = None
+        self._file_exporter_stop = threading.Event()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def stage(self, name):
+        """
+        Bir kod bloğunun süresini ölçen bağlam yöneticisi döndürür.
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self, name)
+
+    def timed(self, name):
+        """
+        Fonksiyonun her çağrısını verilen aşama adıyla ölçen dekoratör.
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def record(self, name, seconds):
+        """
+        Dışarıda ölçülmüş bir süreyi (saniye) ekler.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self._stages.get(name)
+            if stats is None:
+                stats = self._stages[name] = _StageStats(self.window)
+            stats.add(seconds)
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+    def snapshot(self):
+        """
+        Aşama başına özet: sayı, toplam, ortalama, en büyük ve kayan penceredeki p50/p95/p99 (saniye).
+
+        Returns:
+            dict: {aşama: {'count', 'total', 'mean', 'max', 'p50', 'p95', 'p99'}}
+        """
+        with self._lock:
+            stages = {name: (stats.count, stats.total, stats.max, stats.window_samples())
+                      for name, stats in self._stages.items()}
+
+        summary = {}
+        for name, (count, total, maximum, samples) in stages.items():
+            p50, p95, p99 = np.percentile(samples, [q * 100 for q in self.QUANTILES]) if len(samples) else (0, 0, 0)
+            summary[name] = {
+                'count': count,
+                'total': total,
+                'mean': total / count if count else 0.0,
+                'max': maximum,
+                'p50': float(p50),
+                'p95': float(p95),
+                'p99': float(p99),
+            }
+        return summary
+
+    def format_summary(self):
+        """
+        snapshot() çıktısını milisaniye cinsinden okunabilir bir tablo olarak döndürür.
+        """
+        lines = [f"{'Aşama':<16}{'Sayı':>9}{'Toplam (s)':>12}{'Ort. (ms)':>11}{'p50':>9}{'p95':>9}{'p99':>9}{'Maks':>9}"]
+        for name, stats in sorted(self.snapshot().items()):
+            lines.append(f"{name:<16}{stats['count']:>9}{stats['total']:>12.3f}{stats['mean'] * 1000:>11.2f}"
+                         f"{stats['p50'] * 1000:>9.2f}{stats['p95'] * 1000:>9.2f}{stats['p99'] * 1000:>9.2f}"
+                         f"{stats['max'] * 1000:>9.2f}")
+        return "\n".join(lines)
+
+    def export_prometheus(self):
+        """
+        Ölçümleri Prometheus metin formatında (summary tipi) döndürür.
+        """
+        metric = f"{self.metric_prefix}_stage_seconds"
+        lines = [
+            f"# HELP {metric} Kare döngüsü aşamalarının süresi (yüzdelikler son {self.window} ölçümden).",
+            f"# TYPE {metric} summary",
+        ]
+        for name, stats in sorted(self.snapshot().items()):
+            for quantile in self.QUANTILES:
+                value = stats[f"p{int(round(quantile * 100))}"]
+                lines.append(f'{metric}{{stage="{name}",quantile="{quantile}"}} {value:.9f}')
+            lines.append(f'{metric}_sum{{stage="{name}"}} {stats["total"]:.9f}')
+            lines.append(f'{metric}_count{{stage="{name}"}} {stats["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def write_metrics_file(self, path):
+        """
+        Prometheus metinlerini dosyaya atomik olarak yazar (örn. node_exporter textfile toplayıcısı için).
+        """
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(self.export_prometheus())
+        os.replace(temp_path, path)
+
+    def start_file_exporter(self, path, interval=10.0):
+        """
+        Metrik dosyasını arka planda interval saniyede bir günceller.
+        """
+        if self._file_exporter is not None:
+            return
+
+        def export_loop():
+            while not self._file_exporter_stop.wait(interval):
+                try:
+                    self.write_metrics_file(path)
+                except OSError as e:
+                    logger.warning(f"Metrik dosyası yazılamadı ({path}): {e}")
+
+        self._file_exporter_stop.clear()
+        self._file_exporter = threading.Thread(target=export_loop, name="MetricsFileExporter", daemon=True)
+        self._file_exporter.start()
+
+    def start_metrics_server(self, port, host='0.0.0.0'):
+        """
+        /metrics adresinde Prometheus metin formatı sunan küçük bir HTTP sunucusu başlatır.
+        """
+        if self._metrics_server is not None:
+            return
+        profiler = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = profiler.export_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._metrics_server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=self._metrics_server.serve_forever, name="MetricsServer", daemon=True).start()
+        logger.info(f"Metrik sunucusu başlatıldı: http://{host}:{port}/metrics")
+
+    def stop_exporters(self):
+        """
+        Arka plan dosya yazıcısını ve HTTP sunucusunu durdurur.
+        """
+        if self._file_exporter is not None:
+            self._file_exporter_stop.set()
+            self._file_exporter.join()
+            self._file_exporter = None
+        if self._metrics_server is not None:
+            self._metrics_server.shutdown()
+            self._metrics_server.server_close()
+            self._metrics_server = None
+
+
+# Uygulamanın her yerinden kullanılan tek profil nesnesi. PROFILING=1 ortam değişkeniyle
+# ya da profiler.enable() ile açılır.
+profiler = Profiler(enabled=os.environ.get('PROFILING') == '1')
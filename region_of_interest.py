@@ -0,0 +1,136 @@
+import cv2
+import numpy as np
+
+# Çizim rengi (BGR)
+ROI_COLOR = (255, 0, 255)
+
+
+class RegionOfInterest:
+    """
+    Tespitin yalnızca ilgilenilen bölgelerde (sayım çizgisinin çevresi, yürünebilir zemin vb.)
+    yapılması için kareyi kırpıp maskeleyen yardımcı.
+
+    Bölgeler, köşeleri kare genişliğinin/yüksekliğinin kesri (0-1) olarak verilen çokgenlerdir;
+    böylece aynı ayar farklı çözünürlükteki kameralarda da geçerlidir. Modele karenin tamamı
+    yerine tüm çokgenleri kapsayan dikdörtgen kesit gönderilir. mask_outside True ise kesitin
+    çokgenlerin dışında kalan kısmı siyaha boyanır ve orada tespit yapılmaz. Model kesit üzerinde
+    çalıştığı için kutular to_frame ile tam kare koordinatlarına geri taşınır.
+    """
+
+    def __init__(self, polygons, mask_outside=True):
+        """
+        Args:
+            polygons (list): Çokgen listesi; her çokgen en az 3 (x, y) köşesinden oluşur (0-1 aralığında).
+            mask_outside (bool): Kesit içinde çokgenlerin dışında kalan pikselleri maskele.
+        """
+        self.polygons = [np.asarray(polygon, dtype=np.float32).reshape(-1, 2) for polygon in polygons]
+        if not self.polygons:
+            raise ValueError("En az bir ROI çokgeni verilmelidir.")
+        for polygon in self.polygons:
+            if len(polygon) < 3:
+                raise ValueError(f"ROI çokgeninin en az 3 köşesi olmalıdır: {polygon.tolist()}")
+            if (polygon < 0).any() or (polygon > 1).any():
+                raise ValueError(f"ROI köşeleri kare boyutunun kesri (0-1) olmalıdır: {polygon.tolist()}")
+        self.mask_outside = mask_outside
+
+        # Kare boyutuna göre hesaplanan kesit sınırları ve maske (boyut değişmedikçe yeniden kullanılır)
+        self._frame_size = None
+        self._bounds = None
+        self._offset = None
+        self._mask = None
+        self._pixel_points = None
+
+    @classmethod
+    def band(cls, center_y, half_height, mask_outside=True):
+        """
+        Kare genişliği boyunca uzanan yatay bir şerit (örn. giriş/çıkış çizgisinin çevresi).
+
+        Args:
+            center_y (float): Şeridin ortasının Y konumu (kare yüksekliğinin kesri, 0-1).
+            half_height (float): Şeridin yarı yüksekliği (kare yüksekliğinin kesri).
+        """
+        top = min(1.0, max(0.0, center_y - half_height))
+        bottom = min(1.0, max(0.0, center_y + half_height))
+        return cls([[(0.0, top), (1.0, top), (1.0, bottom), (0.0, bottom)]], mask_outside=mask_outside)
+
+    @staticmethod
+    def parse_polygon(text):
+        """
+        "x1,y1 x2,y2 x3,y3" biçimindeki metni köşe listesine çevirir (komut satırı ayarları için; bölge
+        analizindeki çokgenler de aynı biçimdedir).
+        """
+        try:
+            points = [tuple(float(value) for value in point.split(',')) for point in text.split()]
+        except ValueError:
+            points = None
+        if not points or any(len(point) != 2 for point in points):
+            raise ValueError(f"Geçersiz çokgen: '{text}'. Beklenen biçim: 'x1,y1 x2,y2 x3,y3'")
+        return points
+
+    def config(self):
+        """
+        Tespit önbelleği anahtarında kullanılan, kare boyutundan bağımsız ayar özeti.
+        """
+        return {'polygons': [np.round(polygon.astype(np.float64), 4).tolist() for polygon in self.polygons],
+                'mask_outside': self.mask_outside}
+
+    def _prepare(self, frame_shape):
+        height, width = frame_shape[:2]
+        if self._frame_size == (height, width):
+            return
+        scale = np.array([width, height], dtype=np.float32)
+        self._pixel_points = [np.round(polygon * scale).astype(np.int32) for polygon in self.polygons]
+        all_points = np.concatenate(self._pixel_points)
+        x0, y0 = all_points.min(axis=0)
+        x1, y1 = np.minimum(all_points.max(axis=0) + 1, [width, height])
+        self._bounds = (int(x0), int(y0), int(x1), int(y1))
+        self._offset = np.array([x0, y0, x0, y0], dtype=np.float32)
+
+        self._mask = None
+        if self.mask_outside:
+            mask = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+            cv2.fillPoly(mask, [points - [x0, y0] for points in self._pixel_points], 255)
+            # Dikdörtgen bölgelerde maske kesitin tamamını kapsar; kopya ve maskeleme gereksizdir
+            if not mask.all():
+                self._mask = mask
+        self._frame_size = (height, width)
+
+    def crop(self, frame):
+        """
+        Modele gönderilecek kesiti döndürür. Maske gerekmiyorsa kesit karenin kopyasız bir görünümüdür.
+        """
+        self._prepare(frame.shape)
+        x0, y0, x1, y1 = self._bounds
+        region = frame[y0:y1, x0:x1]
+        if self._mask is not None:
+            region = cv2.bitwise_and(region, region, mask=self._mask)
+        return region
+
+    def to_frame(self, boxes):
+        """
+        Kesit koordinatlarındaki (N, 4) kutuları tam kare koordinatlarına taşır.
+        """
+        return boxes + self._offset
+
+    def bounds(self, frame_shape):
+        """
+        Returns:
+            tuple: Verilen kare boyutunda kesitin (x1, y1, x2, y2) piksel sınırları.
+        """
+        self._prepare(frame_shape)
+        return self._bounds
+
+    def pixel_ratio(self, frame_shape):
+        """
+        Kesitin piksel sayısının tam kareye oranı (modele giden piksel payı).
+        """
+        x0, y0, x1, y1 = self.bounds(frame_shape)
+        return (x1 - x0) * (y1 - y0) / float(frame_shape[0] * frame_shape[1])
+
+    def draw(self, frame):
+        """
+        Bölge sınırlarını kare üzerine (yerinde) çizer.
+        """
+        self._prepare(frame.shape)
+        cv2.polylines(frame, self._pixel_points, isClosed=True, color=ROI_COLOR, thickness=2)
+        return frame
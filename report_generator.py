@@ -1,7 +1,6 @@
 import os
 import json
 from datetime import datetime
-import pandas as pd
 import cv2
 import numpy as np
 
@@ -72,6 +71,8 @@ class ReportGenerator:
                 all_logs.append({'Zaman Damgası': time_str, 'Olay': details, 'Tip': 'Çıkış'})
 
             if all_logs:
+                # pandas yalnızca CSV raporu yazılırken gerekir; içe aktarımı açılışı yavaşlatmasın diye ertelenir
+                import pandas as pd
                 df = pd.DataFrame(all_logs)
                 csv_filepath = os.path.join(self.report_folder, f"{base_filename}.csv")
                 df.to_csv(csv_filepath, index=False, encoding='utf-8-sig')
@@ -0,0 +1,257 @@
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+from logger_config import logger
+
+
+class SharedFrameRing:
+    """
+    Süreçler arasında kareleri kopyalamadan (zero-copy) taşıyan, paylaşımlı bellekte sabit yuvalı halka tampon.
+
+    Tek üretici (kare çözen süreç) ve tek tüketici (inference süreci) için tasarlanmıştır. Kareler
+    multiprocessing.Queue'daki gibi pickle edilmez: üretici kareyi doğrudan bir yuvaya çözer, tüketici
+    aynı yuvayı NumPy görünümü (view) olarak okur. Yuvalar sırayla yeniden kullanılır; her yuvanın
+    başlığında yazılan karenin sıra numarası tutulur.
+
+    Paylaşımlı bellek düzeni:
+        [başlık: yuva başına sıra numarası (int64) + kapatıldı bayrağı + yazılan kare sayısı]
+        [yuva 0][yuva 1]...[yuva N-1]   (her biri frame_shape boyutunda)
+    """
+
+    # Başlıktan sonra kare verisinin başladığı hizalama (bellek sayfası)
+    DATA_ALIGNMENT = 4096
+
+    def __init__(self, frame_shape, slots=8, dtype=np.uint8, context=None):
+        """
+        Args:
+            frame_shape (tuple): Kare boyutu, örn. (1080, 1920, 3).
+            slots (int): Halka tampondaki yuva sayısı. Üretici en fazla bu kadar kare öne geçebilir.
+            dtype: Kare veri tipi.
+            context: multiprocessing bağlamı (semaforlar bununla oluşturulur). None: 'spawn'.
+        """
+        self.frame_shape = tuple(frame_shape)
+        self.slots = max(1, int(slots))
+        self.dtype = np.dtype(dtype)
+        self._owner = True
+
+        context = context or mp.get_context('spawn')
+        # free_slots: üreticinin yazabileceği boş yuvalar, filled_slots: tüketicinin okuyabileceği kareler
+        self._free_slots = context.Semaphore(self.slots)
+        self._filled_slots = context.Semaphore(0)
+
+        self._shm = shared_memory.SharedMemory(create=True, size=self._required_size())
+        self._attach_views()
+        self._header[:] = -1
+        self._header[self.slots] = 0        # kapatıldı bayrağı
+        self._header[self.slots + 1] = 0    # yazılan kare sayısı
+        self._reset_cursors()
+
+    def _header_length(self):
+        return self.slots + 2
+
+    def _data_offset(self):
+        header_bytes = self._header_length() * 8
+        return -(-header_bytes // self.DATA_ALIGNMENT) * self.DATA_ALIGNMENT
+
+    def _required_size(self):
+        frame_bytes = int(np.prod(self.frame_shape)) * self.dtype.itemsize
+        return self._data_offset() + self.slots * frame_bytes
+
+    def _attach_views(self):
+        self._header = np.ndarray((self._header_length(),), dtype=np.int64, buffer=self._shm.buf)
+        self._frames = np.ndarray((self.slots,) + self.frame_shape, dtype=self.dtype, buffer=self._shm.buf,
+                                  offset=self._data_offset())
+
+    def _reset_cursors(self):
+        self._write_seq = 0
+        self._read_seq = 0
+        self._release_seq = 0
+        self._writing = False
+
+    # --- Süreçler arası aktarım (pickle) ---
+
+    def __getstate__(self):
+        # Yalnızca paylaşımlı belleğin adı gönderilir; alıcı süreç aynı bloğa bağlanır
+        return {
+            'name': self._shm.name,
+            'frame_shape': self.frame_shape,
+            'slots': self.slots,
+            'dtype': self.dtype.str,
+            'free_slots': self._free_slots,
+            'filled_slots': self._filled_slots,
+        }
+
+    def __setstate__(self, state):
+        self.frame_shape = state['frame_shape']
+        self.slots = state['slots']
+        self.dtype = np.dtype(state['dtype'])
+        self._free_slots = state['free_slots']
+        self._filled_slots = state['filled_slots']
+        self._owner = False
+        # Süreç argümanı olarak aktarılan halka, sahibi ile aynı resource_tracker'ı paylaşır;
+        # blok sahibi unlink edene kadar yaşar
+        self._shm = shared_memory.SharedMemory(name=state['name'])
+        self._attach_views()
+        self._reset_cursors()
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    @property
+    def nbytes(self):
+        return self._shm.size
+
+    # --- Üretici tarafı ---
+
+    def acquire_write_slot(self, timeout=None):
+        """
+        Yazılacak bir sonraki yuvayı ayırır ve NumPy görünümünü döndürür.
+        Kare bu diziye yazıldıktan sonra commit_write çağrılmalıdır.
+
+        Returns:
+            np.ndarray | None: Yuva görünümü; timeout dolduysa None.
+        """
+        if not self._free_slots.acquire(timeout=timeout):
+            return None
+        self._writing = True
+        return self._frames[self._write_seq % self.slots]
+
+    def commit_write(self):
+        """
+        acquire_write_slot ile alınan yuvayı tüketiciye yayınlar.
+
+        Returns:
+            int: Yazılan karenin sıra numarası.
+        """
+        seq = self._write_seq
+        self._header[seq % self.slots] = seq
+        self._header[self.slots + 1] = seq + 1
+        self._write_seq += 1
+        self._writing = False
+        self._filled_slots.release()
+        return seq
+
+    def write(self, frame, timeout=None):
+        """
+        Hazır bir kareyi bir yuvaya kopyalar (kareyi doğrudan yuvaya çözemeyen üreticiler için).
+
+        Returns:
+            int | None: Sıra numarası; timeout dolduysa None.
+        """
+        slot = self.acquire_write_slot(timeout)
+        if slot is None:
+            return None
+        np.copyto(slot, frame)
+        return self.commit_write()
+
+    def close(self):
+        """
+        Akışın bittiğini bildirir. Tüketici kalan kareleri okuduktan sonra read None döndürür.
+        """
+        if self._writing:
+            # Ayrılıp yazılmayan yuva boşa geri verilir
+            self._writing = False
+            self._free_slots.release()
+        self._header[self.slots] = 1
+        self._filled_slots.release()
+
+    # --- Tüketici tarafı ---
+
+    def read(self, timeout=None):
+        """
+        Sıradaki kareyi kopyalamadan döndürür. Görünüm, release çağrılana kadar geçerlidir;
+        sonrasında üretici aynı yuvaya yeni kare yazabilir.
+
+        Returns:
+            tuple | None: (sıra_numarası, kare_görünümü). Akış kapatılıp tüm kareler okunduysa
+                veya timeout dolduysa None (ayırmak için closed özelliğine bakılabilir).
+        """
+        if not self._filled_slots.acquire(timeout=timeout):
+            return None
+
+        if self._read_seq >= self._header[self.slots + 1]:
+            # Kapatma sinyali: diğer okuma çağrıları da uyansın diye semafor geri bırakılır
+            self._filled_slots.release()
+            return None
+
+        seq = self._read_seq
+        slot_index = seq % self.slots
+        if self._header[slot_index] != seq:
+            raise RuntimeError(f"Halka tampon sırası bozuk: yuva {slot_index} için {seq} beklenirken "
+                               f"{self._header[slot_index]} bulundu.")
+        self._read_seq += 1
+        return seq, self._frames[slot_index]
+
+    def release(self):
+        """
+        Okunmuş en eski yuvayı üreticiye geri verir (yuvalar okundukları sırayla serbest bırakılır).
+        """
+        if self._release_seq >= self._read_seq:
+            raise RuntimeError("Serbest bırakılacak okunmuş bir yuva yok.")
+        self._release_seq += 1
+        self._free_slots.release()
+
+    def frames(self, timeout=None):
+        """
+        Akış bitene kadar (sıra_numarası, kare_görünümü) üreten yardımcı; her kare, bir sonraki
+        istendiğinde serbest bırakılır.
+        """
+        while True:
+            item = self.read(timeout)
+            if item is None:
+                return
+            try:
+                yield item
+            finally:
+                self.release()
+
+    @property
+    def closed(self):
+        return bool(self._header[self.slots])
+
+    def detach(self):
+        """
+        Bu süreçteki bağlantıyı kapatır; sahibi olan süreç ayrıca bloğu siler (unlink).
+        """
+        self._header = None
+        self._frames = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+def decode_to_ring(source, ring, start_frame=0, stop_event=None):
+    """
+    Kare çözme süreci için hedef fonksiyon: kaynağı açar ve her kareyi doğrudan halka tamponun
+    bir yuvasına çözer (OpenCV hedef diziye yazar, ara kopya yoktur). Akış bitince halka kapatılır.
+
+    Args:
+        source (int | str): Video kaynağı.
+        ring (SharedFrameRing): Kareler için halka tampon (süreç argümanı olarak aktarılabilir).
+        start_frame (int): Video dosyalarında başlangıç karesi.
+        stop_event (multiprocessing.Event | None): Ayarlandığında okuma durur.
+    """
+    from video_stream_manager import VideoStreamManager
+
+    stream_manager = VideoStreamManager(source=source, prefetch=False)
+    try:
+        if not stream_manager.start_stream(start_frame=start_frame):
+            return
+        frame_shape = stream_manager.get_frame_shape()
+        if frame_shape != ring.frame_shape:
+            logger.error(f"Kare boyutu {frame_shape} halka tamponun boyutuyla {ring.frame_shape} uyuşmuyor.")
+            return
+
+        while stop_event is None or not stop_event.is_set():
+            slot = ring.acquire_write_slot(timeout=0.5)
+            if slot is None:
+                continue
+            if not stream_manager.read_into(slot):
+                break
+            ring.commit_write()
+    finally:
+        ring.close()
+        stream_manager.stop_stream()
+        ring.detach()
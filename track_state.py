@@ -0,0 +1,154 @@
+import numpy as np
+
+# Boş slotların ID değeri; hiçbir takip ID'siyle eşleşmez
+EMPTY_ID = np.iinfo(np.int64).min
+# Boş slotların son görülme karesi; süre aşımı kontrolünde boş slotlar tek karşılaştırmayla elenir
+NEVER_EXPIRES = np.iinfo(np.int64).max
+
+
+class TrackStateStore:
+    """
+    İz başına durumu sabit boyutlu NumPy dizilerinde (slotlarda) tutan, belleği sınırlı depo.
+
+    Her iz bir slota yerleşir; ID'den slota eşleme, slot ID'lerinin sıralı kopyası üzerinde
+    vektörel ikili arama ile yapılır (sıralama yalnızca slotlar değiştiğinde yenilenir). Karede
+    görülmeyen izler hemen silinmez: grace_frames kare boyunca slotlarında kalır, böylece bir iki
+    kare kaybolup aynı ID ile geri gelen kişinin durumu (son konumu, sayıldı bilgisi) korunur.
+    Süresi dolan slot boş listeye döner ve nesil (generation) sayacı artırılır; slot numarası ile
+    nesil birlikte saklanırsa, slot başka bir ize verildikten sonra eski referans geçersiz anlaşılır.
+
+    Kapasite yalnızca boş slot kalmadığında iki katına çıkar; ID'ler sonsuza kadar artsa da bellek,
+    aynı anda görünen ve bekleme süresindeki iz sayısıyla sınırlıdır.
+    """
+
+    def __init__(self, grace_frames=30, initial_capacity=64):
+        """
+        Args:
+            grace_frames (int): Görülmeyen bir izin silinmeden önce bekletileceği kare sayısı. 0: hemen sil.
+            initial_capacity (int): Başlangıçtaki slot sayısı.
+        """
+        self.grace_frames = max(0, int(grace_frames))
+        self._capacity = max(1, int(initial_capacity))
+        self.ids = np.full(self._capacity, EMPTY_ID, dtype=np.int64)
+        self.generations = np.zeros(self._capacity, dtype=np.uint32)
+        self.last_seen = np.full(self._capacity, NEVER_EXPIRES, dtype=np.int64)
+        # Ek alanlar: ad -> (dizi, yeni slotta başlangıç değeri)
+        self._fields = {}
+        # Boş slot yığını; pop() en küçük numaralı slotu verir
+        self._free_slots = list(range(self._capacity - 1, -1, -1))
+        # ID -> slot eşlemesi için sıralı ID'ler ve karşılık gelen slotlar (None: yeniden hesaplanmalı)
+        self._sorted_ids = None
+        self._sorted_slots = None
+        self.frame_index = -1
+        self.expired_total = 0
+
+    def add_field(self, name, shape=(), dtype=np.float64, fill=0):
+        """
+        Slot başına ek bir durum dizisi tanımlar ((kapasite,) + shape). Kapasite büyüdüğünde dizi de büyütülür.
+        """
+        self._fields[name] = (np.full((self._capacity,) + tuple(shape), fill, dtype=dtype), fill)
+
+    def field(self, name):
+        """
+        Alanın güncel dizisi. Kapasite büyüdüğünde dizi yeniden oluşturulduğu için observe'den sonra alınmalıdır.
+        """
+        return self._fields[name][0]
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    def __len__(self):
+        """
+        Dolu slot sayısı (görünen ve bekleme süresindeki izler).
+        """
+        return self._capacity - len(self._free_slots)
+
+    def _grow(self, needed):
+        old_capacity = self._capacity
+        self._capacity = max(needed, old_capacity * 2)
+        extra = self._capacity - old_capacity
+        self.ids = np.concatenate([self.ids, np.full(extra, EMPTY_ID, dtype=np.int64)])
+        self.generations = np.concatenate([self.generations, np.zeros(extra, dtype=np.uint32)])
+        self.last_seen = np.concatenate([self.last_seen, np.full(extra, NEVER_EXPIRES, dtype=np.int64)])
+        for name, (array, fill) in self._fields.items():
+            padding = np.full((extra,) + array.shape[1:], fill, dtype=array.dtype)
+            self._fields[name] = (np.concatenate([array, padding]), fill)
+        self._free_slots = list(range(self._capacity - 1, old_capacity - 1, -1)) + self._free_slots
+        self._sorted_ids = None
+
+    def lookup(self, ids):
+        """
+        ID'lerin slotlarını vektörel olarak bulur.
+
+        Returns:
+            tuple: (found, slots) - found: (N,) bool maske, slots: (N,) slot numaraları
+                (found False olan yerlerde anlamsızdır).
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        if self._sorted_ids is None:
+            self._sorted_slots = np.argsort(self.ids, kind='stable')
+            self._sorted_ids = self.ids[self._sorted_slots]
+        positions = np.minimum(np.searchsorted(self._sorted_ids, ids), self._capacity - 1)
+        found = self._sorted_ids[positions] == ids
+        return found, self._sorted_slots[positions]
+
+    def observe(self, ids):
+        """
+        Yeni bir kareyi başlatır: bilinen izlerin slotlarını bulur, yeni izlere slot ayırır (ek alanlar
+        başlangıç değerine döner) ve hepsinin son görülme karesini günceller.
+
+        Args:
+            ids (np.ndarray): Karede görülen (tekil) takip ID'leri.
+
+        Returns:
+            tuple: (slots, known) - slots: (N,) slot numaraları, known: (N,) bool; iz bu kareden önce
+                de depodaydı (görünüyordu veya bekleme süresindeydi).
+        """
+        self.frame_index += 1
+        ids = np.asarray(ids, dtype=np.int64)
+        known, slots = self.lookup(ids)
+        if not known.all():
+            new_rows = np.flatnonzero(~known)
+            if len(new_rows) > len(self._free_slots):
+                self._grow(len(self) + len(new_rows))
+            new_slots = np.array([self._free_slots.pop() for _ in range(len(new_rows))], dtype=np.intp)
+            self.ids[new_slots] = ids[new_rows]
+            for array, fill in self._fields.values():
+                array[new_slots] = fill
+            slots[new_rows] = new_slots
+            self._sorted_ids = None
+        self.last_seen[slots] = self.frame_index
+        return slots, known
+
+    def expire(self):
+        """
+        grace_frames kareden uzun süredir görülmeyen izlerin slotlarını boşaltır ve nesillerini artırır.
+
+        Returns:
+            np.ndarray: Boşaltılan slotlar. Ek alanlar bir sonraki kullanıma kadar temizlenmez;
+                çağıran son değerleri okuyabilir.
+        """
+        stale = np.flatnonzero(self.last_seen < self.frame_index - self.grace_frames)
+        if len(stale):
+            self.ids[stale] = EMPTY_ID
+            self.last_seen[stale] = NEVER_EXPIRES
+            self.generations[stale] += 1
+            self._free_slots.extend(stale[::-1].tolist())
+            self._sorted_ids = None
+            self.expired_total += len(stale)
+        return stale
+
+    def is_current(self, slots, generations):
+        """
+        Daha önce saklanan (slot, nesil) referanslarının hâlâ aynı ize ait olup olmadığı ((N,) bool).
+        """
+        slots = np.asarray(slots, dtype=np.intp)
+        return (self.ids[slots] != EMPTY_ID) & (self.generations[slots] == np.asarray(generations))
+
+    def stats(self):
+        """
+        Returns:
+            dict: {'capacity': slot sayısı, 'tracks': dolu slot, 'expired': toplam silinen iz}
+        """
+        return {'capacity': self._capacity, 'tracks': len(self), 'expired': self.expired_total}
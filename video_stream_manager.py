@@ -1,31 +1,135 @@
+import collections
+import threading
+import time
+
 import cv2
+import numpy as np
 from logger_config import logger  # YENİ: Merkezi logger'ı import ediyoruz
 
 
 class VideoStreamManager:
     """
     Video kaynağından (dosya veya kamera) görüntü akışını yöneten sınıf.
+
+    prefetch=True verildiğinde kareler arka planda çalışan bir okuyucu thread
+    tarafından çözülür (decode) ve sınırlı boyutlu bir halka tampona (ring buffer)
+    yazılır. Böylece kare çözme işlemi ile model çıkarımı (inference) paralel yürür.
     """
 
-    def __init__(self, source):
+    # Tampon dolduğunda uygulanacak politikalar
+    POLICY_BLOCK = 'block'              # Okuyucu, tamponda yer açılana kadar bekler (video dosyaları)
+    POLICY_DROP_OLDEST = 'drop_oldest'  # En eski kare atılır, yenisi eklenir (canlı kameralar)
+
+    def __init__(self, source, prefetch=False, buffer_size=8, full_policy=None):
+        """
+        Args:
+            source (int | str): Kamera indeksi, akış URL'si veya video dosyası yolu.
+            prefetch (bool): Kareleri arka plan thread'inde önceden çözmek için True.
+            buffer_size (int): Halka tamponun en fazla tutacağı kare sayısı.
+            full_policy (str | None): 'block' veya 'drop_oldest'. None ise kaynağa göre
+                otomatik seçilir: canlı kaynaklar için 'drop_oldest', dosyalar için 'block'.
+        """
         self.source = source
         self.cap = None
         self.is_running = False
 
-    def start_stream(self):
+        self.prefetch = prefetch
+        self.buffer_size = max(1, int(buffer_size))
+        if full_policy is None:
+            full_policy = self.POLICY_DROP_OLDEST if self.is_live_source(source) else self.POLICY_BLOCK
+        if full_policy not in (self.POLICY_BLOCK, self.POLICY_DROP_OLDEST):
+            raise ValueError(f"Geçersiz tampon politikası: {full_policy}")
+        self.full_policy = full_policy
+
+        self._buffer = collections.deque()
+        self._condition = threading.Condition()
+        self._reader_thread = None
+        self._stop_event = threading.Event()
+        self._reader_finished = False
+        self._reset_stats()
+
+    @staticmethod
+    def is_live_source(source):
+        """
+        Kaynağın canlı bir kamera/akış olup olmadığını tahmin eder.
+        """
+        if isinstance(source, int):
+            return True
+        source_str = str(source).strip().lower()
+        return source_str.isdigit() or source_str.startswith(('rtsp://', 'rtmp://', 'http://', 'https://'))
+
+    def _reset_stats(self):
+        self._frames_decoded = 0
+        self._dropped_frames = 0
+        self._total_decode_time = 0.0
+        self._last_decode_time = 0.0
+        self._total_wait_time = 0.0
+        self._max_queue_depth = 0
+
+    def start_stream(self, start_frame=0):
         """
         Video akışını başlatır ve bağlantıyı kontrol eder.
+
+        Args:
+            start_frame (int): Video dosyalarında okumaya başlanacak kare (örn. çöken bir işçinin
+                kaldığı yerden devam etmek için). Canlı kaynaklarda yok sayılır.
         """
         self.cap = cv2.VideoCapture(self.source)
         if not self.cap.isOpened():
             logger.error(f"Hata: Video kaynağı açılamadı -> {self.source}")  # DEĞİŞTİ
             self.is_running = False
             return False
+        if start_frame > 0 and not self.is_live_source(self.source):
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
 
         self.is_running = True
+        self._reset_stats()
+
+        if self.prefetch:
+            self._buffer.clear()
+            self._stop_event.clear()
+            self._reader_finished = False
+            self._reader_thread = threading.Thread(target=self._reader_loop, name="VideoPrefetch", daemon=True)
+            self._reader_thread.start()
+
         logger.info(f"Video akışı başarıyla başlatıldı: {self.source}")  # DEĞİŞTİ
         return True
 
+    def _reader_loop(self):
+        """
+        Arka plan thread'i: kareleri çözer ve halka tampona yazar.
+        """
+        try:
+            while not self._stop_event.is_set():
+                decode_start = time.perf_counter()
+                ret, frame = self.cap.read()
+                decode_time = time.perf_counter() - decode_start
+                if not ret:
+                    break
+
+                with self._condition:
+                    self._frames_decoded += 1
+                    self._total_decode_time += decode_time
+                    self._last_decode_time = decode_time
+
+                    if len(self._buffer) >= self.buffer_size:
+                        if self.full_policy == self.POLICY_DROP_OLDEST:
+                            self._buffer.popleft()
+                            self._dropped_frames += 1
+                        else:
+                            while len(self._buffer) >= self.buffer_size and not self._stop_event.is_set():
+                                self._condition.wait(timeout=0.1)
+                            if self._stop_event.is_set():
+                                break
+
+                    self._buffer.append(frame)
+                    self._max_queue_depth = max(self._max_queue_depth, len(self._buffer))
+                    self._condition.notify_all()
+        finally:
+            with self._condition:
+                self._reader_finished = True
+                self._condition.notify_all()
+
     def get_frame(self):
         """
         Akıştan bir sonraki kareyi (frame) okur.
@@ -33,14 +137,107 @@ class VideoStreamManager:
         if not self.is_running or self.cap is None:
             return False, None
 
-        ret, frame = self.cap.read()
-        return ret, frame
+        if not self.prefetch:
+            decode_start = time.perf_counter()
+            ret, frame = self.cap.read()
+            decode_time = time.perf_counter() - decode_start
+            if ret:
+                self._frames_decoded += 1
+                self._total_decode_time += decode_time
+                self._last_decode_time = decode_time
+            return ret, frame
+
+        wait_start = time.perf_counter()
+        with self._condition:
+            while not self._buffer and not self._reader_finished:
+                self._condition.wait(timeout=0.1)
+            self._total_wait_time += time.perf_counter() - wait_start
+
+            if not self._buffer:
+                return False, None
+
+            frame = self._buffer.popleft()
+            self._condition.notify_all()
+        return True, frame
+
+    def read_into(self, buffer):
+        """
+        Bir sonraki kareyi verilen diziye yazar (örn. paylaşımlı bellekteki bir halka tampon yuvası).
+        Ön yükleme kapalıyken kare doğrudan hedef diziye çözülür, ara kopya oluşmaz.
+
+        Args:
+            buffer (np.ndarray): Karenin boyutunda (yükseklik, genişlik, 3) uint8 dizi.
+
+        Returns:
+            bool: Kare okunduysa True.
+        """
+        if self.prefetch:
+            ret, frame = self.get_frame()
+            if ret:
+                np.copyto(buffer, frame)
+            return ret
+
+        if not self.is_running or self.cap is None:
+            return False
+        decode_start = time.perf_counter()
+        ret, frame = self.cap.read(buffer)
+        decode_time = time.perf_counter() - decode_start
+        if not ret:
+            return False
+        if frame is not buffer:
+            # Kare boyutu hedeften farklıysa OpenCV yeni bir dizi ayırır
+            np.copyto(buffer, frame)
+        self._frames_decoded += 1
+        self._total_decode_time += decode_time
+        self._last_decode_time = decode_time
+        return True
+
+    def get_frame_shape(self):
+        """
+        Açık kaynağın kare boyutunu (yükseklik, genişlik, 3) döndürür; kaynak açık değilse None.
+        """
+        if self.cap is None or not self.cap.isOpened():
+            return None
+        return int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), 3
+
+    def get_stats(self):
+        """
+        Kare çözme hattının anlık istatistiklerini döndürür.
+
+        'consumer_wait_ms' değerinin yüksek olması, tüketicinin (inference döngüsü)
+        sürekli boş tampon beklediğini, yani darboğazın kare çözmede olduğunu gösterir.
+
+        Returns:
+            dict: Tampon doluluğu, çözme gecikmesi ve atılan kare sayaçları.
+        """
+        with self._condition:
+            frames = self._frames_decoded
+            return {
+                'queue_depth': len(self._buffer),
+                'max_queue_depth': self._max_queue_depth,
+                'buffer_size': self.buffer_size if self.prefetch else 0,
+                'frames_decoded': frames,
+                'dropped_frames': self._dropped_frames,
+                'avg_decode_ms': (self._total_decode_time / frames * 1000) if frames else 0.0,
+                'last_decode_ms': self._last_decode_time * 1000,
+                'consumer_wait_ms': self._total_wait_time * 1000,
+            }
 
     def stop_stream(self):
         """
         Video akışını durdurur ve kaynakları serbest bırakır.
         """
+        if self._reader_thread is not None:
+            self._stop_event.set()
+            with self._condition:
+                self._condition.notify_all()
+            self._reader_thread.join()
+            self._reader_thread = None
+            self._buffer.clear()
+
         if self.cap is not None:
             self.cap.release()
         self.is_running = False
+        if self._frames_decoded:
+            logger.info(f"Kare çözme istatistikleri: {self.get_stats()}")
         logger.info("Video akışı durduruldu.")  # DEĞİŞTİ
@@ -0,0 +1,222 @@
+import time
+
+import cv2
+import numpy as np
+from detections import as_detections
+from track_state import EMPTY_ID, TrackStateStore
+
+# Çizim rengi (BGR)
+ZONE_COLOR = (0, 200, 255)
+
+# Etiket maskesinde her bölge bir bit olduğu için en fazla 64 bölge desteklenir
+MAX_ZONES = 64
+
+# Kalış süresi histogramının bölme alt sınırları (saniye): ilk bölme [0, 1), sonra 1 sn - 4 saat arası
+# logaritmik (her bölme ~%20 genişlikte); son bölme 4 saat ve üzeridir
+DWELL_BIN_EDGES = np.concatenate([[0.0], np.geomspace(1.0, 4 * 3600.0, 49)])
+
+
+class ZoneAnalyzer:
+    """
+    Bölge (kuyruk alanı, kasa önü vb.) başına anlık doluluğu ve kalış süresi dağılımını hesaplayan sınıf.
+
+    Bölgeler, köşeleri kare boyutunun kesri (0-1) olan çokgenlerdir (RegionOfInterest ile aynı biçim).
+    Kurulumda tüm bölgeler cell_size piksellik hücrelerden oluşan tek bir etiket maskesine çizilir;
+    her hücrede, içinde bulunduğu bölgelerin bitleri tutulur (bölgeler örtüşebilir). Böylece bir karede
+    tüm izlerin tüm bölgelerdeki üyeliği, merkezlerin maskeden tek indekslemeyle okunup bitlere
+    açılmasıyla bulunur; çokgen testi kare başına hiç yapılmaz.
+
+    İzlerin bölgeye giriş zamanı TrackStateStore slotlarında tutulur. Bölgeden çıkan veya bekleme
+    süresi (grace_frames) dolup silinen izin kalış süresi, bölge başına sabit bölmeli bir histograma,
+    toplam ve en büyük değere eklenir; bellek oturum süresinden bağımsızdır.
+    """
+
+    def __init__(self, frame_shape, zones, names=None, cell_size=4, grace_frames=30):
+        """
+        Args:
+            frame_shape (tuple): Kare boyutu (yükseklik, genişlik[, kanal]).
+            zones (list): Çokgen listesi; her çokgen en az 3 (x, y) köşesinden oluşur (0-1 aralığında).
+            names (list | None): Bölge adları. None: "bölge 0", "bölge 1", ...
+            cell_size (int): Etiket maskesinin hücre boyutu (piksel). Bölge sınırı bu çözünürlükte örneklenir.
+            grace_frames (int): Görünmeyen bir izin bölgeden çıkmış sayılmadan önce beklenecek kare sayısı.
+        """
+        self.polygons = self.validate_zones(zones)
+        num_zones = len(self.polygons)
+        self.names = list(names) if names else [f"bölge {zone_id}" for zone_id in range(num_zones)]
+        if len(self.names) != num_zones:
+            raise ValueError("Bölge adlarının sayısı bölge sayısıyla aynı olmalıdır.")
+
+        self.frame_height, self.frame_width = frame_shape[:2]
+        self.cell_size = max(1, int(cell_size))
+        self._build_label_mask()
+
+        self._tracks = TrackStateStore(grace_frames=grace_frames)
+        self._tracks.add_field('inside', shape=(num_zones,), dtype=bool, fill=False)
+        self._tracks.add_field('enter_time', shape=(num_zones,), dtype=np.float64)
+        self._tracks.add_field('last_time', dtype=np.float64)
+
+        self.occupancy = np.zeros(num_zones, dtype=np.int64)
+        self.entries = np.zeros(num_zones, dtype=np.int64)
+        self.visits = np.zeros(num_zones, dtype=np.int64)
+        self.dwell_histogram = np.zeros((num_zones, len(DWELL_BIN_EDGES)), dtype=np.int64)
+        self.dwell_total = np.zeros(num_zones, dtype=np.float64)
+        self.dwell_max = np.zeros(num_zones, dtype=np.float64)
+
+    @staticmethod
+    def validate_zones(zones):
+        """
+        Bölge çokgenlerini doğrular (kare boyutu bilinmeden, örn. komut satırı ayarları okunurken).
+
+        Returns:
+            list: (K, 2) float64 köşe dizileri.
+        """
+        polygons = [np.asarray(polygon, dtype=np.float64).reshape(-1, 2) for polygon in zones]
+        if not polygons:
+            raise ValueError("En az bir bölge verilmelidir.")
+        if len(polygons) > MAX_ZONES:
+            raise ValueError(f"En fazla {MAX_ZONES} bölge desteklenir: {len(polygons)}")
+        for polygon in polygons:
+            if len(polygon) < 3:
+                raise ValueError(f"Bölge çokgeninin en az 3 köşesi olmalıdır: {polygon.tolist()}")
+            if (polygon < 0).any() or (polygon > 1).any():
+                raise ValueError(f"Bölge köşeleri kare boyutunun kesri (0-1) olmalıdır: {polygon.tolist()}")
+        return polygons
+
+    def _build_label_mask(self):
+        num_zones = len(self.polygons)
+        dtype = next(dtype for dtype in (np.uint8, np.uint16, np.uint32, np.uint64)
+                     if np.iinfo(dtype).bits >= num_zones)
+        self.grid_height = -(-self.frame_height // self.cell_size)
+        self.grid_width = -(-self.frame_width // self.cell_size)
+        self._labels = np.zeros((self.grid_height, self.grid_width), dtype=dtype)
+        scale = np.array([self.frame_width, self.frame_height], dtype=np.float64) / self.cell_size
+        zone_mask = np.zeros((self.grid_height, self.grid_width), dtype=np.uint8)
+        for zone_id, polygon in enumerate(self.polygons):
+            zone_mask.fill(0)
+            cv2.fillPoly(zone_mask, [np.round(polygon * scale).astype(np.int32)], 1)
+            self._labels |= zone_mask.astype(dtype) << dtype(zone_id)
+        self._bit_shifts = np.arange(num_zones, dtype=dtype)
+        self._pixel_points = [np.round(polygon * [self.frame_width, self.frame_height]).astype(np.int32)
+                              for polygon in self.polygons]
+
+    def memberships(self, centers):
+        """
+        Merkezlerin hangi bölgelerde olduğu ((N, bölge sayısı) bool).
+        """
+        centers = np.asarray(centers).reshape(-1, 2)
+        grid_x = np.clip(centers[:, 0] // self.cell_size, 0, self.grid_width - 1)
+        grid_y = np.clip(centers[:, 1] // self.cell_size, 0, self.grid_height - 1)
+        labels = self._labels[grid_y, grid_x]
+        return ((labels[:, None] >> self._bit_shifts) & 1).astype(bool)
+
+    def update(self, tracked_objects, timestamp=None):
+        """
+        Karedeki izlere göre bölge giriş/çıkışlarını ve doluluğu günceller.
+
+        Args:
+            tracked_objects (Detections | list of dicts): Her nesnenin 'id' ve 'center' bilgilerini içeren yapı.
+            timestamp (float | None): Saniye cinsinden zaman (örn. video zamanı). None ise
+                time.monotonic() kullanılır. Aynı oturumda tek bir zaman kaynağı kullanılmalıdır.
+
+        Returns:
+            np.ndarray: Bölge başına o anda görünen kişi sayısı.
+        """
+        now = time.monotonic() if timestamp is None else float(timestamp)
+        detections = as_detections(tracked_objects)
+        inside_now = self.memberships(detections.centers)
+
+        slots, _ = self._tracks.observe(detections.ids)
+        inside = self._tracks.field('inside')
+        enter_time = self._tracks.field('enter_time')
+        last_time = self._tracks.field('last_time')
+        was_inside = inside[slots]
+
+        entered_rows, entered_zones = np.nonzero(inside_now & ~was_inside)
+        if len(entered_rows):
+            enter_time[slots[entered_rows], entered_zones] = now
+            self.entries += np.bincount(entered_zones, minlength=len(self.polygons))
+
+        left_rows, left_zones = np.nonzero(was_inside & ~inside_now)
+        if len(left_rows):
+            left_slots = slots[left_rows]
+            self._record_dwells(left_zones, now - enter_time[left_slots, left_zones])
+
+        inside[slots] = inside_now
+        last_time[slots] = now
+
+        # Bekleme süresi dolan izler, son görüldükleri anda bulundukları bölgelerden çıkmış sayılır
+        expired = self._tracks.expire()
+        if len(expired):
+            self._close_visits(expired)
+
+        self.occupancy = inside_now.sum(axis=0)
+        return self.occupancy
+
+    def _close_visits(self, slots):
+        inside = self._tracks.field('inside')
+        rows, zones = np.nonzero(inside[slots])
+        if len(rows):
+            closed_slots = slots[rows]
+            dwells = self._tracks.field('last_time')[closed_slots] - self._tracks.field('enter_time')[closed_slots, zones]
+            self._record_dwells(zones, dwells)
+            inside[closed_slots, zones] = False
+
+    def _record_dwells(self, zones, dwells):
+        dwells = np.maximum(dwells, 0.0)
+        bins = np.searchsorted(DWELL_BIN_EDGES, dwells, side='right') - 1
+        np.add.at(self.dwell_histogram, (zones, bins), 1)
+        np.add.at(self.dwell_total, zones, dwells)
+        np.maximum.at(self.dwell_max, zones, dwells)
+        self.visits += np.bincount(zones, minlength=len(self.polygons))
+
+    def close_open_visits(self):
+        """
+        Oturum sonunda hâlâ bölgede olan izlerin ziyaretlerini son görüldükleri anda kapatır.
+        """
+        occupied = np.flatnonzero(self._tracks.ids != EMPTY_ID)
+        self._close_visits(occupied)
+        self.occupancy[:] = 0
+
+    def dwell_percentile(self, zone_id, percentile):
+        """
+        Histogramdan kalış süresi yüzdelik tahmini (saniye): hedef sıraya ulaşılan bölmenin üst sınırı.
+        Son (açık uçlu) bölme için gözlenen en büyük süre kullanılır. Ziyaret yoksa 0.
+        """
+        histogram = self.dwell_histogram[zone_id]
+        total = histogram.sum()
+        if total == 0:
+            return 0.0
+        target_rank = max(1, np.ceil(total * percentile / 100.0))
+        bin_index = int(np.searchsorted(np.cumsum(histogram), target_rank))
+        if bin_index + 1 >= len(DWELL_BIN_EDGES):
+            return float(self.dwell_max[zone_id])
+        return float(min(DWELL_BIN_EDGES[bin_index + 1], self.dwell_max[zone_id]))
+
+    def zone_stats(self):
+        """
+        Returns:
+            list: Bölge başına {'zone_id', 'name', 'occupancy', 'entries', 'visits', 'mean_dwell',
+                'p50_dwell', 'p90_dwell', 'max_dwell'} sözlükleri (süreler saniye).
+        """
+        return [{
+            'zone_id': zone_id,
+            'name': self.names[zone_id],
+            'occupancy': int(self.occupancy[zone_id]),
+            'entries': int(self.entries[zone_id]),
+            'visits': int(self.visits[zone_id]),
+            'mean_dwell': float(self.dwell_total[zone_id] / self.visits[zone_id]) if self.visits[zone_id] else 0.0,
+            'p50_dwell': self.dwell_percentile(zone_id, 50),
+            'p90_dwell': self.dwell_percentile(zone_id, 90),
+            'max_dwell': float(self.dwell_max[zone_id]),
+        } for zone_id in range(len(self.polygons))]
+
+    def draw(self, frame):
+        """
+        Bölge sınırlarını ve anlık doluluğu kare üzerine (yerinde) çizer.
+        """
+        cv2.polylines(frame, self._pixel_points, isClosed=True, color=ZONE_COLOR, thickness=2)
+        for zone_id, points in enumerate(self._pixel_points):
+            x, y = points.min(axis=0)
+            cv2.putText(frame, f"{zone_id}: {int(self.occupancy[zone_id])}", (int(x) + 5, int(y) + 25),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, ZONE_COLOR, 2)
+        return frame